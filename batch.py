@@ -0,0 +1,174 @@
+import os
+from array import array
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+
+from geometry import Point
+from triangulation import Delaunay
+
+# At most 2n - 5 triangles are made from n points, so each tile gets 6 index
+# slots per point in the triangle buffer
+SLOTS_PER_POINT = 6
+
+# The shared buffers, as attached in each worker process
+worker_buffers = {}
+
+
+def check_offsets(coordinates, offsets):
+    if len(offsets) == 0 or offsets[0] != 0:
+        raise ValueError("The offsets must start at 0.")
+    for start, end in zip(offsets, offsets[1:]):
+        if end < start:
+            raise ValueError("The offsets must not decrease.")
+    if 2 * offsets[-1] != len(coordinates):
+        raise ValueError("The offsets must end at the number of points, half "
+                         "the number of coordinates.")
+
+
+def triangulate_tile(coordinates, start, end, legalize):
+    """
+    Triangulates the points start to end of coordinates, a flat buffer of
+    x, y pairs. Returns the triangles as an array of index triples into the
+    tile's points, in the order they were given.
+    """
+    points = [Point(coordinates[2 * i], coordinates[2 * i + 1])
+              for i in range(start, end)]
+    delaunay = Delaunay(points, legalize=legalize)
+    input_indices = delaunay.input_indices
+    return array('l', [input_indices[vertex] for vertex in delaunay.mesh.triangles])
+
+
+def triangulate_chunk(coordinates, triangles, tiles, legalize):
+    """
+    Triangulates each (tile, start, end) of tiles, writing its triangles
+    into triangles from SLOTS_PER_POINT * start on. Returns the number of
+    indices written for each tile and the message of the ValueError it
+    failed with, or None.
+    """
+    results = []
+    for tile, start, end in tiles:
+        try:
+            tile_triangles = triangulate_tile(coordinates, start, end, legalize)
+        except ValueError as error:
+            results.append((tile, 0, str(error)))
+            continue
+        first = SLOTS_PER_POINT * start
+        triangles[first:first + len(tile_triangles)] = tile_triangles
+        results.append((tile, len(tile_triangles), None))
+    return results
+
+
+def attach_buffers(coordinates_name, triangles_name):
+    """
+    Pool initializer attaching a worker to the shared buffers
+    """
+    for key, name, typecode in (('coordinates', coordinates_name, 'd'),
+                                ('triangles', triangles_name, 'l')):
+        memory = SharedMemory(name=name)
+        worker_buffers[key + '_memory'] = memory
+        worker_buffers[key] = memory.buf.cast(typecode)
+
+
+def run_chunk(arguments):
+    tiles, legalize = arguments
+    return triangulate_chunk(worker_buffers['coordinates'],
+                             worker_buffers['triangles'], tiles, legalize)
+
+
+def triangulate_tiles(coordinates, offsets, legalize=True, processes=None,
+                      chunk_size=None):
+    """
+    Triangulates every tile of points in coordinates, a flat buffer of x, y
+    pairs. Tile i is the points offsets[i] to offsets[i + 1].
+
+    The tiles are handed to processes worker processes, os.cpu_count() by
+    default, chunk_size tiles at a time. The coordinates are copied once
+    into shared memory rather than pickled to the workers, and the workers
+    write their triangles back the same way. With one process they are
+    triangulated here, without a pool.
+
+    Returns an array of the triangles of every tile one after another, as
+    index triples into the tile's points, an array of offsets where tile i's
+    triangles are triangles[triangle_offsets[i]:triangle_offsets[i + 1]],
+    and a dict from the tiles that couldn't be triangulated, such as those
+    with all their points on one line, to the message of the ValueError
+    they failed with. Their triangles are left empty.
+    """
+    check_offsets(coordinates, offsets)
+    tile_count = len(offsets) - 1
+    point_count = offsets[-1]
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, tile_count // (4 * processes))
+    tiles = [(tile, offsets[tile], offsets[tile + 1]) for tile in range(tile_count)]
+    chunks = [tiles[i:i + chunk_size] for i in range(0, tile_count, chunk_size)]
+
+    if processes == 1 or len(chunks) < 2 or point_count == 0:
+        output = array('l', [0]) * (SLOTS_PER_POINT * point_count)
+        results = []
+        for chunk in chunks:
+            results.extend(triangulate_chunk(coordinates, output, chunk, legalize))
+    else:
+        output, results = run_pool(coordinates, point_count, chunks, legalize,
+                                   processes)
+
+    triangles = array('l')
+    triangle_offsets = array('l', [0])
+    failures = {}
+    for tile, count, error in sorted(results):
+        if error is not None:
+            failures[tile] = error
+        first = SLOTS_PER_POINT * offsets[tile]
+        triangles.extend(output[first:first + count])
+        triangle_offsets.append(len(triangles))
+    return triangles, triangle_offsets, failures
+
+
+def write_coordinates(memory, coordinates):
+    """
+    Copies coordinates straight into the shared memory as doubles, without
+    an array of them in between
+    """
+    values = memory.buf.cast('d')
+    try:
+        values[:len(coordinates)] = coordinates
+    except (TypeError, ValueError):
+        # Not a buffer of doubles, such as a list
+        for index, value in enumerate(coordinates):
+            values[index] = value
+    finally:
+        # The memory can't be closed while a view of it is held
+        values.release()
+
+
+def run_pool(coordinates, point_count, chunks, legalize, processes):
+    """
+    Triangulates the chunks of tiles in a pool of processes over shared
+    memory. Returns the triangle buffer and every tile's result.
+    """
+    output = array('l')
+    coordinates_memory = SharedMemory(create=True,
+                                      size=len(coordinates) * array('d').itemsize)
+    triangles_memory = SharedMemory(
+        create=True, size=SLOTS_PER_POINT * point_count * output.itemsize)
+    try:
+        write_coordinates(coordinates_memory, coordinates)
+        pool = Pool(processes, initializer=attach_buffers,
+                    initargs=(coordinates_memory.name, triangles_memory.name))
+        try:
+            results = []
+            for chunk_results in pool.imap_unordered(
+                    run_chunk, [(chunk, legalize) for chunk in chunks]):
+                results.extend(chunk_results)
+        finally:
+            pool.terminate()
+            pool.join()
+        output.frombytes(
+            triangles_memory.buf[:SLOTS_PER_POINT * point_count * output.itemsize])
+    finally:
+        coordinates_memory.close()
+        coordinates_memory.unlink()
+        triangles_memory.close()
+        triangles_memory.unlink()
+    return output, results
@@ -0,0 +1,65 @@
+import unittest
+from array import array
+from random import Random
+from unittest import TestCase
+
+from batch import triangulate_tiles
+from geometry import Point
+from triangulation import Delaunay
+
+
+class TriangulateTilesTest(TestCase):
+    def setUp(self):
+        random = Random(1)
+        self.tiles = [
+            [(random.random(), random.random()) for _ in range(50)],
+            # All on one line
+            [(i, 2 * i) for i in range(5)],
+            [(0, 0), (1, 0), (0, 1), (0, 1)],
+            # Too few points
+            [(0, 0), (1, 1)],
+            [],
+            [(random.random(), random.random()) for _ in range(200)],
+        ]
+        self.coordinates = array('d', [value for tile in self.tiles
+                                        for point in tile for value in point])
+        self.offsets = array('l', [0])
+        for tile in self.tiles:
+            self.offsets.append(self.offsets[-1] + len(tile))
+
+    def assert_tiles(self, triangles, triangle_offsets, failures):
+        self.assertEqual(len(triangle_offsets), len(self.tiles) + 1)
+        self.assertEqual(sorted(failures), [1, 3, 4])
+        self.assertIn('collinear', failures[1])
+        for index, tile in enumerate(self.tiles):
+            indices = triangles[triangle_offsets[index]:triangle_offsets[index + 1]]
+            if index in failures:
+                self.assertEqual(len(indices), 0)
+                continue
+            points = [Point(*point) for point in tile]
+            delaunay = Delaunay(points, legalize=True)
+            self.assertEqual(
+                [points[vertex] for vertex in indices],
+                [delaunay.points[vertex] for vertex in delaunay.mesh.triangles])
+
+    def test_in_process(self):
+        self.assert_tiles(*triangulate_tiles(self.coordinates, self.offsets,
+                                             processes=1))
+
+    def test_pool(self):
+        self.assert_tiles(*triangulate_tiles(self.coordinates, self.offsets,
+                                             processes=2, chunk_size=2))
+        self.assert_tiles(*triangulate_tiles(list(self.coordinates), self.offsets,
+                                             processes=2, chunk_size=2))
+
+    def test_bad_offsets(self):
+        with self.assertRaises(ValueError):
+            triangulate_tiles(self.coordinates, self.offsets[1:])
+        with self.assertRaises(ValueError):
+            triangulate_tiles(self.coordinates, self.offsets[:-1])
+        with self.assertRaises(ValueError):
+            triangulate_tiles(self.coordinates, array('l', [0, 100, 50, 261]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,292 @@
+import argparse
+import csv
+import json
+import sys
+import tracemalloc
+from math import cos, sin, pi, log
+from random import Random
+from timeit import default_timer
+
+from convex_hull import ConvexHull
+from geometry import (sort_points, sort_coordinates, circumcircles, get_coordinates,
+                      Point, Triangle)
+from stats import Stats
+from triangulation import Delaunay
+
+
+def uniform_points(count, seed=0):
+    """
+    Points spread evenly over the unit square
+    """
+    random = Random(seed)
+    return [Point(random.random(), random.random()) for _ in range(count)]
+
+
+def clustered_points(count, seed=0, clusters=10):
+    """
+    Points gathered in normally distributed clusters around random centers
+    """
+    random = Random(seed)
+    centers = [(random.random(), random.random()) for _ in range(clusters)]
+    points = []
+    for _ in range(count):
+        x, y = random.choice(centers)
+        points.append(Point(random.gauss(x, 0.02), random.gauss(y, 0.02)))
+    return points
+
+
+def grid_points(count, seed=0):
+    """
+    Points on an integer lattice, so most triples are collinear and many
+    quadruples cocircular. The seed shuffles the order they are given in.
+    """
+    side = max(2, int(round(count ** 0.5)))
+    points = [Point(i % side, i // side) for i in range(count)]
+    Random(seed).shuffle(points)
+    return points
+
+
+def circle_points(count, seed=0):
+    """
+    Points on the unit circle, every one of them on the convex hull, which is
+    the worst case for the Jarvis march.
+    """
+    random = Random(seed)
+    points = []
+    for _ in range(count):
+        angle = random.random() * 2 * pi
+        points.append(Point(cos(angle), sin(angle)))
+    return points
+
+
+distributions = {
+    'uniform': uniform_points,
+    'clustered': clustered_points,
+    'grid': grid_points,
+    'circle': circle_points,
+}
+
+
+def get_triangle_indices(points):
+    """
+    Setup for the batch circumcircle case, triangulated outside of the timing
+    """
+    delaunay = Delaunay(points, legalize=True)
+    return get_coordinates(delaunay.points), delaunay.mesh.triangles
+
+
+def get_triangles(points):
+    """
+    Setup for the object circumcircle case
+    """
+    return Delaunay(points, legalize=True).triangles
+
+
+def get_batch_circumcircles(arguments):
+    coordinates, triangles = arguments
+    circumcircles(coordinates, triangles)
+
+
+def get_object_circumcircles(triangles):
+    for triangle in triangles:
+        Triangle.get_circumcircle(triangle.line_1, triangle.line_2)
+
+
+# Every case is a setup run outside of the timing and the timed call, which
+# is given the setup's result
+cases = {
+    'convex_hull_jarvis': (
+        None, lambda points: ConvexHull(points, algorithm='jarvis')),
+    'convex_hull_monotone_chain': (
+        None, lambda points: ConvexHull(points, algorithm='monotone_chain')),
+    'convex_hull_quickhull': (
+        None, lambda points: ConvexHull(points, algorithm='quickhull')),
+    'delaunay': (
+        None, lambda points: Delaunay(points, legalize=True)),
+    'delaunay_sorted_insertion': (
+        None, lambda points: Delaunay(points, legalize=True, insertion_order='sorted')),
+    'delaunay_hilbert': (
+        None, lambda points: Delaunay(points, legalize=True, insertion_order='hilbert')),
+    'delaunay_morton': (
+        None, lambda points: Delaunay(points, legalize=True, insertion_order='morton')),
+    'delaunay_brio': (
+        None, lambda points: Delaunay(points, legalize=True, insertion_order='brio')),
+    'sort_points': (
+        None, sort_points),
+    'sort_coordinates': (
+        get_coordinates, sort_coordinates),
+    'circumcircles': (
+        get_triangle_indices, get_batch_circumcircles),
+    'circumcircles_objects': (
+        get_triangles, get_object_circumcircles),
+}
+
+
+# The insertion order of the incremental cases, whose point location walks
+# are counted
+insertion_orders = {
+    'delaunay_sorted_insertion': 'sorted',
+    'delaunay_hilbert': 'hilbert',
+    'delaunay_morton': 'morton',
+    'delaunay_brio': 'brio',
+}
+
+
+def count_walk_steps(case, points):
+    """
+    The triangles crossed per point walking to each point inserted, for the
+    incremental cases, or None. Python can't count cache misses, but as
+    each step reads a triangle that is likely far from the last one in
+    memory, the steps stand in for them.
+    """
+    if case not in insertion_orders:
+        return None
+    stats = Stats()
+    Delaunay(points, legalize=True, insertion_order=insertion_orders[case],
+             stats=stats)
+    return stats.counts.get('walk_steps', 0) / float(len(points))
+
+
+def measure(case, points, repeat=3):
+    """
+    Runs a case on points. Returns the best time in seconds over repeat runs
+    and the peak memory in bytes of one more run traced with tracemalloc,
+    which is kept out of the timing as it slows everything down.
+    """
+    setup, run = cases[case]
+    argument = setup(points) if setup is not None else points
+
+    best = None
+    for _ in range(repeat):
+        start = default_timer()
+        run(argument)
+        seconds = default_timer() - start
+        if best is None or seconds < best:
+            best = seconds
+
+    tracemalloc.start()
+    try:
+        run(argument)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def fit_exponent(sizes, seconds):
+    """
+    The least squares slope of log(seconds) against log(size), so 1 for
+    linear and about 1.1 for n log n over the usual sizes. None without two
+    distinct sizes to fit.
+    """
+    pairs = [(log(size), log(max(second, 1e-9)))
+             for size, second in zip(sizes, seconds)]
+    if len(set(x for x, _ in pairs)) < 2:
+        return None
+
+    mean_x = sum(x for x, _ in pairs) / len(pairs)
+    mean_y = sum(y for _, y in pairs) / len(pairs)
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in pairs)
+    variance = sum((x - mean_x) ** 2 for x, _ in pairs)
+    return covariance / variance
+
+
+def run_benchmark(sizes, case_names=None, distribution_names=None, seed=0,
+                  repeat=3, max_seconds=10.0):
+    """
+    Measures every case on every distribution at every size. Larger sizes
+    a case is projected to take longer than max_seconds on, from how it has
+    scaled so far, are skipped. Returns one result dict per measurement,
+    each with the exponent fitted over all the sizes measured for its case
+    and distribution. The incremental Delaunay cases also report their
+    walk_steps, so the insertion orders can be compared.
+    """
+    case_names = case_names or sorted(cases)
+    distribution_names = distribution_names or sorted(distributions)
+    for name in case_names:
+        if name not in cases:
+            raise ValueError("Unknown benchmark case {}.".format(name))
+    for name in distribution_names:
+        if name not in distributions:
+            raise ValueError("Unknown distribution {}.".format(name))
+
+    sizes = sorted(sizes)
+    results = []
+    for distribution in distribution_names:
+        for case in case_names:
+            rows = []
+            for i, size in enumerate(sizes):
+                points = distributions[distribution](size, seed)
+                seconds, peak = measure(case, points, repeat)
+                rows.append({
+                    'case': case,
+                    'distribution': distribution,
+                    'size': size,
+                    'seconds': seconds,
+                    'points_per_second': size / seconds if seconds else None,
+                    'peak_memory': peak,
+                    'walk_steps': count_walk_steps(case, points),
+                })
+                if i + 1 == len(sizes):
+                    break
+                exponent = fit_exponent([row['size'] for row in rows],
+                                        [row['seconds'] for row in rows])
+                projected = seconds * (sizes[i + 1] / size) ** (exponent or 1)
+                if projected > max_seconds:
+                    break
+
+            exponent = fit_exponent([row['size'] for row in rows],
+                                    [row['seconds'] for row in rows])
+            for row in rows:
+                row['exponent'] = exponent
+            results.extend(rows)
+    return results
+
+
+fields = ('case', 'distribution', 'size', 'seconds', 'points_per_second',
+          'peak_memory', 'walk_steps', 'exponent')
+
+
+def write_results(results, output, output_format='json'):
+    if output_format == 'json':
+        json.dump(results, output, indent=2)
+        output.write('\n')
+    elif output_format == 'csv':
+        writer = csv.DictWriter(output, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(results)
+    else:
+        raise ValueError("Unknown output format {}.".format(output_format))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Times the hull, triangulation and geometry code over "
+                    "growing inputs from seeded point generators, and fits "
+                    "how each one scales.")
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[100, 1000, 10000, 100000, 1000000])
+    parser.add_argument('--cases', nargs='+', choices=sorted(cases))
+    parser.add_argument('--distributions', nargs='+',
+                        choices=sorted(distributions))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-seconds', type=float, default=10.0,
+                        help="skip the sizes a case is projected to take "
+                             "longer than this on")
+    parser.add_argument('--format', choices=('json', 'csv'), default='json')
+    parser.add_argument('--output', help="file to write to, stdout by default")
+    arguments = parser.parse_args(argv)
+
+    results = run_benchmark(arguments.sizes, arguments.cases,
+                            arguments.distributions, arguments.seed,
+                            arguments.repeat, arguments.max_seconds)
+    if arguments.output:
+        with open(arguments.output, 'w') as output:
+            write_results(results, output, arguments.format)
+    else:
+        write_results(results, sys.stdout, arguments.format)
+
+
+if __name__ == '__main__':
+    main()
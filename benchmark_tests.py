@@ -0,0 +1,58 @@
+import unittest
+from unittest import TestCase
+
+import csv
+import json
+from io import StringIO
+
+from benchmark import (distributions, fit_exponent, run_benchmark,
+                       write_results)
+
+
+class BenchmarkTest(TestCase):
+    def test_generators_are_seeded(self):
+        for name, generator in distributions.items():
+            points = generator(50, seed=3)
+            self.assertEqual(len(points), 50, name)
+            self.assertEqual(points, generator(50, seed=3), name)
+        self.assertNotEqual(distributions['uniform'](50, seed=1),
+                            distributions['uniform'](50, seed=2))
+
+    def test_fit_exponent(self):
+        sizes = [100, 1000, 10000]
+        self.assertAlmostEqual(fit_exponent(sizes, [1, 10, 100]), 1)
+        self.assertAlmostEqual(fit_exponent(sizes, [1, 100, 10000]), 2)
+        self.assertEqual(fit_exponent([100], [1]), None)
+
+    def test_run_benchmark(self):
+        results = run_benchmark([20, 40], ['delaunay', 'circumcircles'],
+                                ['uniform'], repeat=1)
+        self.assertEqual([(row['case'], row['size']) for row in results],
+                         [('delaunay', 20), ('delaunay', 40),
+                          ('circumcircles', 20), ('circumcircles', 40)])
+        for row in results:
+            self.assertGreater(row['peak_memory'], 0)
+            self.assertIsNotNone(row['exponent'])
+
+        output = StringIO()
+        write_results(results, output, 'json')
+        self.assertEqual(json.loads(output.getvalue()), results)
+        output = StringIO()
+        write_results(results, output, 'csv')
+        self.assertEqual(len(list(csv.DictReader(StringIO(output.getvalue())))), 4)
+
+    def test_walk_steps(self):
+        results = run_benchmark([200], ['delaunay', 'delaunay_sorted_insertion',
+                                        'delaunay_hilbert'], ['uniform'], repeat=1)
+        steps = dict((row['case'], row['walk_steps']) for row in results)
+        self.assertIsNone(steps['delaunay'])
+        self.assertGreater(steps['delaunay_sorted_insertion'], 0)
+        self.assertGreater(steps['delaunay_hilbert'], 0)
+
+    def test_unknown_case(self):
+        with self.assertRaises(ValueError):
+            run_benchmark([10], ['bogus'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import os
+from array import array
+from collections import OrderedDict
+from hashlib import blake2b
+
+from convex_hull import ConvexHull
+from geometry import sort_coordinates, get_coordinates
+from mesh import Mesh
+from mesh_file import MeshFile, get_index_typecode, save_delaunay, to_array, write_blocks
+from triangulation import Delaunay
+
+
+class ResultCache(object):
+    """
+    A cache of triangulations and convex hulls by the points they were made
+    from, for when the same point sets are asked about again and again.
+    Keeps results by a hash of their points, sorted with duplicates removed
+    as Delaunay does, so the same points in any order hit the same entry.
+    Only the result's index arrays are kept, and every call returns new
+    objects built from them, which can be changed without changing the
+    cache.
+
+    Entries are kept in memory up to max_bytes of arrays, dropping the least
+    recently used first. Given a directory, every result is also written
+    there as a mesh file and read back when it isn't in memory.
+
+    counts holds the number of memory hits, disk hits, misses, which were
+    computed, and evictions from memory.
+    """
+    def __init__(self, max_bytes=2 ** 26, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        # Maps keys to (arrays, size in bytes), least recently used first
+        self.entries = OrderedDict()
+        self.size = 0
+        self.counts = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get_key(self, kind, coordinates):
+        """
+        A hash of the kind of result, with its options, and the sorted
+        unique coordinates
+        """
+        digest = blake2b(kind.encode('ascii'), digest_size=16)
+        digest.update(memoryview(coordinates).cast('B'))
+        return digest.hexdigest()
+
+    def get_path(self, key):
+        return os.path.join(self.directory, key + '.mesh')
+
+    def get(self, key, block_names):
+        """
+        The arrays of an entry, from memory or from disk, or None
+        """
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.counts['hits'] += 1
+            return self.entries[key][0]
+
+        if self.directory is not None and os.path.exists(self.get_path(key)):
+            with MeshFile(self.get_path(key)) as mesh_file:
+                arrays = tuple(to_array(mesh_file[name], 'l') for name in block_names)
+            self.counts['disk_hits'] += 1
+            self.add(key, arrays)
+            return arrays
+
+        self.counts['misses'] += 1
+        return None
+
+    def add(self, key, arrays):
+        """
+        Keeps the arrays of an entry in memory, dropping the least recently
+        used entries until they fit. Entries larger than max_bytes are not
+        kept.
+        """
+        size = sum(len(values) * values.itemsize for values in arrays)
+        if size > self.max_bytes:
+            return
+        self.entries[key] = (arrays, size)
+        self.size += size
+        while self.size > self.max_bytes:
+            _, (_, dropped_size) = self.entries.popitem(last=False)
+            self.size -= dropped_size
+            self.counts['evictions'] += 1
+
+    def clear(self):
+        """
+        Empties the memory, leaving the files on disk
+        """
+        self.entries.clear()
+        self.size = 0
+
+    def get_delaunay(self, points, legalize=True):
+        """
+        Delaunay(points, legalize), from the cache if the same points were
+        triangulated before
+        """
+        points = list(points)
+        coordinates, input_indices, point_indices = sort_coordinates(
+            get_coordinates(points))
+        key = self.get_key('delaunay:{}'.format(int(bool(legalize))), coordinates)
+        arrays = self.get(key, ('triangles', 'halfedges'))
+        if arrays is None:
+            delaunay = Delaunay(points, legalize)
+            arrays = (array('l', delaunay.mesh.triangles),
+                      array('l', delaunay.mesh.halfedges))
+            self.add(key, arrays)
+            if self.directory is not None:
+                save_delaunay(delaunay, self.get_path(key))
+            return delaunay
+
+        sorted_points = [points[index] for index in input_indices]
+        mesh = Mesh(len(sorted_points))
+        mesh.triangles = array('l', arrays[0])
+        mesh.halfedges = array('l', arrays[1])
+        delaunay = Delaunay(sorted_points, legalize, mesh=mesh)
+        delaunay.input_indices = input_indices
+        delaunay.point_indices = point_indices
+        return delaunay
+
+    def get_convex_hull(self, points, algorithm='monotone_chain', incremental=False):
+        """
+        ConvexHull(points, algorithm, incremental), from the cache if the hull
+        of the same points was found with the same algorithm before
+        """
+        points = list(points)
+        coordinates, input_indices, _ = sort_coordinates(get_coordinates(points))
+        key = self.get_key('convex_hull:{}'.format(algorithm), coordinates)
+        arrays = self.get(key, ('hull',))
+        if arrays is None:
+            convex_hull = ConvexHull(points, algorithm, incremental)
+            positions = dict((point, index) for index, point in enumerate(convex_hull.points))
+            hull = array('l', [positions[point] for point in convex_hull.hull_points])
+            self.add(key, (hull,))
+            if self.directory is not None:
+                write_blocks(self.get_path(key), [
+                    ('hull', get_index_typecode(len(convex_hull.points)), hull)])
+            return convex_hull
+
+        # The hull of the hull points is the same hull, found quickly
+        sorted_points = [points[index] for index in input_indices]
+        convex_hull = ConvexHull([sorted_points[index] for index in arrays[0]],
+                                 algorithm, incremental)
+        convex_hull.points = sorted_points
+        return convex_hull
@@ -0,0 +1,107 @@
+import os
+import shutil
+import tempfile
+import unittest
+from random import Random
+from unittest import TestCase
+
+from cache import ResultCache
+from convex_hull import ConvexHull
+from geometry import Point
+from triangulation import Delaunay
+
+
+class ResultCacheTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        random = Random(0)
+        self.points = [Point(random.random(), random.random()) for _ in range(100)]
+        self.shuffled = self.points + self.points[:10]
+        random.shuffle(self.shuffled)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def assert_same_delaunay(self, delaunay, expected):
+        self.assertEqual(delaunay.points, expected.points)
+        self.assertEqual(delaunay.mesh.triangles, expected.mesh.triangles)
+        self.assertEqual(delaunay.mesh.halfedges, expected.mesh.halfedges)
+        self.assertEqual(delaunay.hull_next, expected.hull_next)
+        self.assertEqual(list(delaunay.input_indices), list(expected.input_indices))
+        self.assertEqual(list(delaunay.point_indices), list(expected.point_indices))
+
+    def test_delaunay(self):
+        cache = ResultCache()
+        self.assert_same_delaunay(cache.get_delaunay(self.points),
+                                  Delaunay(self.points, legalize=True))
+        self.assertEqual(cache.counts['misses'], 1)
+
+        # The same points in another order and with duplicates hit
+        delaunay = cache.get_delaunay(self.shuffled)
+        self.assert_same_delaunay(delaunay, Delaunay(self.shuffled, legalize=True))
+        self.assertEqual(cache.counts['hits'], 1)
+        # Changing what was returned leaves the cache alone
+        delaunay.insert(Point(0.5, 0.5))
+        self.assert_same_delaunay(cache.get_delaunay(self.points),
+                                  Delaunay(self.points, legalize=True))
+
+        cache.get_delaunay(self.points, legalize=False)
+        self.assertEqual(cache.counts, {'hits': 2, 'disk_hits': 0, 'misses': 2,
+                                        'evictions': 0})
+
+    def test_convex_hull(self):
+        cache = ResultCache()
+        for algorithm in ConvexHull.algorithms:
+            expected = ConvexHull(self.points, algorithm, incremental=True)
+            for points in (self.points, self.shuffled):
+                convex_hull = cache.get_convex_hull(points, algorithm, incremental=True)
+                self.assertEqual(convex_hull.hull_points, expected.hull_points)
+                self.assertEqual(convex_hull.points, expected.points)
+                self.assertEqual(convex_hull.upper_hull, expected.upper_hull)
+        self.assertEqual(cache.counts['misses'], 3)
+        self.assertEqual(cache.counts['hits'], 3)
+
+    def test_eviction(self):
+        cache = ResultCache()
+        cache.get_delaunay(self.points)
+        entry_size = cache.size
+        self.assertGreater(entry_size, 0)
+
+        random = Random(1)
+        others = [[Point(random.random(), random.random()) for _ in range(100)]
+                  for _ in range(3)]
+        cache = ResultCache(max_bytes=int(2.5 * entry_size))
+        for points in [self.points] + others:
+            cache.get_delaunay(points)
+        self.assertEqual(cache.counts['evictions'], 2)
+        self.assertLessEqual(cache.size, cache.max_bytes)
+        # The oldest were dropped, the newest kept
+        cache.get_delaunay(others[-1])
+        self.assertEqual(cache.counts['hits'], 1)
+        cache.get_delaunay(self.points)
+        self.assertEqual(cache.counts['misses'], 5)
+
+        # Too large to keep at all
+        cache = ResultCache(max_bytes=entry_size - 1)
+        cache.get_delaunay(self.points)
+        self.assertEqual(cache.size, 0)
+
+    def test_disk(self):
+        cache = ResultCache(directory=self.directory)
+        cache.get_delaunay(self.points)
+        expected_hull = cache.get_convex_hull(self.points)
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+
+        cache = ResultCache(directory=self.directory)
+        self.assert_same_delaunay(cache.get_delaunay(self.shuffled),
+                                  Delaunay(self.shuffled, legalize=True))
+        self.assertEqual(cache.get_convex_hull(self.points).hull_points,
+                         expected_hull.hull_points)
+        self.assertEqual(cache.counts['disk_hits'], 2)
+        self.assertEqual(cache.counts['misses'], 0)
+        cache.get_delaunay(self.points)
+        self.assertEqual(cache.counts['hits'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
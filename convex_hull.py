@@ -1,20 +1,184 @@
-from random import randint
+from geometry import sort_points, orientation, Triangle
+from stats import timed
 
-from geometry import sort_points, Point, Triangle
+
+def find_insert_index(points, point):
+    """
+    Binary searches a list of points sorted on x, then on y, for the index
+    point would need to be inserted at to keep the list sorted.
+    """
+    key = (point.x, point.y)
+    low = 0
+    high = len(points)
+    while low < high:
+        middle = (low + high) // 2
+        if (points[middle].x, points[middle].y) < key:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def is_upper_obsolete(point_1, point_2, point_3):
+    """
+    point_2 no longer belongs to the upper chain if point_1, point_2, point_3
+    turn counter clockwise. Collinear points are kept.
+    """
+    return orientation(point_1, point_2, point_3) < 0
+
+
+def is_lower_obsolete(point_1, point_2, point_3):
+    """
+    point_2 no longer belongs to the lower chain unless point_1, point_2,
+    point_3 turn counter clockwise. Collinear points are dropped.
+    """
+    return orientation(point_1, point_2, point_3) >= 0
+
+
+def insert_into_chain(chain, point, is_obsolete, stats=None):
+    """
+    Splices point into a chain of hull points sorted left to right, removing
+    the points it makes obsolete. Returns False if the point is inside the
+    chain and was not added. Given a Stats object as stats, its orientation
+    tests are counted.
+    """
+    index = find_insert_index(chain, point)
+    if 0 < index < len(chain):
+        if is_obsolete(chain[index-1], point, chain[index]):
+            if stats is not None:
+                stats.count('orientation')
+            return False
+        tests = 1
+    else:
+        tests = 0
+
+    chain.insert(index, point)
+    size = len(chain)
+
+    # Drop the points to the left that are no longer on the chain
+    while index >= 2 and is_obsolete(chain[index-2], chain[index-1], point):
+        del chain[index-1]
+        index -= 1
+    if index >= 2:
+        tests += 1
+
+    # Drop the points to the right that are no longer on the chain
+    while (index + 2 < len(chain) and
+           is_obsolete(point, chain[index+1], chain[index+2])):
+        del chain[index+1]
+    if index + 2 < len(chain):
+        tests += 1
+
+    if stats is not None:
+        # Every point dropped was tested once, and each loop stopped at a
+        # test unless it ran out of points
+        stats.count('orientation', tests + size - len(chain))
+    return True
+
+
+def quickhull_chain(start, end, candidates, keep_collinear, stats=None):
+    """
+    Finds the hull points left of the line from start to end, in order from
+    start to end. Each edge is split on the candidate farthest from it until
+    no candidates are left outside the edge. keep_collinear also keeps the
+    points lying on an edge. Given a Stats object as stats, its orientation
+    tests are counted.
+    """
+    chain = [start]
+    stack = [(start, end, candidates)]
+    tests = 0
+    while stack:
+        A, B, points = stack.pop()
+        tests += len(points)
+
+        farthest = None
+        farthest_turn = 0
+        for point in points:
+            turn = orientation(A, B, point)
+            if turn < farthest_turn:
+                farthest = point
+                farthest_turn = turn
+
+        if farthest is None:
+            # Nothing is outside the edge AB, so it is part of the hull
+            if keep_collinear:
+                chain += sorted(points, key=lambda p: (p.x, p.y))
+            chain.append(B)
+            continue
+
+        left_points = []
+        right_points = []
+        skipped = 0
+        for point in points:
+            if point == farthest:
+                skipped += 1
+                continue
+            turn = orientation(A, farthest, point)
+            if turn < 0 or (keep_collinear and turn == 0):
+                left_points.append(point)
+                continue
+            turn = orientation(farthest, B, point)
+            if turn < 0 or (keep_collinear and turn == 0):
+                right_points.append(point)
+        # Points going left are only tested against the edge from A
+        tests += 2 * (len(points) - skipped) - len(left_points)
+
+        # The stack is last in first out, so the edge from A is walked first
+        stack.append((farthest, B, right_points))
+        stack.append((A, farthest, left_points))
+
+    if stats is not None:
+        stats.count('orientation', tests)
+    return chain
 
 
 class ConvexHull(object):
     """
     A polygon that wraps around a given set of points.
     """
-    def __init__(self, points):
+    algorithms = ('jarvis', 'monotone_chain', 'quickhull')
+
+    def __init__(self, points, algorithm='jarvis', incremental=False,
+                 stats=None):
+        if algorithm not in self.algorithms:
+            raise ValueError("Unknown convex hull algorithm {}, expected one "
+                             "of {}".format(algorithm, self.algorithms))
+
+        # Counts builds and times them when given a Stats object
+        self.stats = stats
+
         # Sort the points first on x, then on y
         sorted_points = sort_points(points)
         self.points = sorted_points
         self.hull_points = []
+        self.algorithm = algorithm
+
+        # In incremental mode the hull is also kept as an upper and a lower
+        # chain, both running left to right, so add_point can splice new
+        # points in instead of rebuilding.
+        self.incremental = incremental
+        self.upper_hull = []
+        self.lower_hull = []
+
         self.build()
+        if self.incremental and not self.upper_hull:
+            self.split_chains()
 
     def build(self):
+        """
+        Builds hull_points with the algorithm chosen for this hull.
+        """
+        if self.stats is not None:
+            self.stats.count('hull_builds')
+        with timed(self.stats, 'hull_build'):
+            if self.algorithm == 'monotone_chain':
+                self.build_monotone_chain()
+            elif self.algorithm == 'quickhull':
+                self.build_quickhull()
+            else:
+                self.build_jarvis_march()
+
+    def build_jarvis_march(self):
         """
         Loops through self.points, building a Triangle ABC. If the triangle is
         Counter Clockwise, point C is more left of point B and is a better
@@ -35,6 +199,10 @@ class ConvexHull(object):
                 if clockwise == False:
                     B = C
 
+            if self.stats is not None:
+                self.stats.count('triangle_objects', n)
+                self.stats.count('orientation', n)
+
             # Now B is the point most left with respect to A and is a new
             # hull point.
             A = B
@@ -43,13 +211,133 @@ class ConvexHull(object):
                 # We've looped back around and are finished.
                 break
 
+    def build_monotone_chain(self):
+        """
+        Sweeps through the sorted self.points, extending the upper and lower
+        chains with each point. hull_points is the upper chain followed by the
+        lower chain walked back from right to left, which is the same
+        clockwise order the Jarvis march produces.
+        """
+        self.upper_hull = []
+        self.lower_hull = []
+        for point in self.points:
+            self.extend_chains(point)
+        self.hull_points = self.upper_hull + self.lower_hull[-2:0:-1]
+
+    def build_quickhull(self):
+        """
+        Splits the points on the line from the leftmost to the rightmost point
+        and finds the hull above and below it with quickhull_chain. Points
+        lying on the upper chain are kept, as they are by the Jarvis march.
+        """
+        if len(self.points) < 2:
+            self.hull_points = list(self.points)
+            return
+
+        first = self.points[0]
+        last = self.points[-1]
+        above = []
+        below = []
+        for point in self.points[1:-1]:
+            if orientation(first, last, point) <= 0:
+                above.append(point)
+            else:
+                below.append(point)
+
+        if self.stats is not None:
+            self.stats.count('orientation', len(self.points) - 2)
+        upper = quickhull_chain(first, last, above, keep_collinear=True,
+                                stats=self.stats)
+        lower = quickhull_chain(last, first, below, keep_collinear=False,
+                                stats=self.stats)
+        self.hull_points = upper + lower[1:-1]
+
+    def split_chains(self):
+        """
+        Splits hull_points at the rightmost point into the upper and lower
+        chains used by insert_point.
+        """
+        if len(self.points) < 2:
+            self.upper_hull = list(self.hull_points)
+            self.lower_hull = list(self.hull_points)
+            return
+
+        right = self.hull_points.index(self.points[-1])
+        self.upper_hull = self.hull_points[:right+1]
+        self.lower_hull = ([self.hull_points[0]] +
+                           self.hull_points[:right:-1] +
+                           [self.hull_points[right]])
+
+    def extend_chains(self, point):
+        """
+        Adds a point that is right of every other point to the end of both
+        chains, dropping the chain points it makes obsolete.
+        """
+        upper = self.upper_hull
+        lower = self.lower_hull
+        size = len(upper) + len(lower)
+        while len(upper) > 1 and is_upper_obsolete(upper[-2], upper[-1], point):
+            upper.pop()
+        while len(lower) > 1 and is_lower_obsolete(lower[-2], lower[-1], point):
+            lower.pop()
+
+        if self.stats is not None:
+            # Every point dropped was tested once, and each chain stopped at
+            # a test unless it ran down to one point
+            self.stats.count('orientation', size - len(upper) - len(lower) +
+                             (len(upper) > 1) + (len(lower) > 1))
+        upper.append(point)
+        lower.append(point)
+
     def add_point(self, point):
         """
         Given a point, add it to the list of points and rebuild the hull
         """
+        if self.incremental:
+            self.insert_point(point)
+            return
+
         self.points.append(point)
         # The point might already be in the hull
         self.points = sort_points(self.points)
 
         self.hull_points = []
         self.build()
+
+    def insert_point(self, point):
+        """
+        Splices a point into the hull without rebuilding it. Points added in
+        sorted order, as a sweep does, only touch the right end of the chains
+        and take amortized O(1) orientation tests, though splicing them into
+        hull_points still shifts up to h items. Any other point takes
+        O(log h) comparisons to place but O(n) time, as it is inserted into
+        the middle of self.points and hull_points is joined again.
+        """
+        index = find_insert_index(self.points, point)
+        if index < len(self.points) and self.points[index] == point:
+            # The point is already part of the hull
+            return
+        self.points.insert(index, point)
+
+        if index == len(self.points) - 1 and index >= 2:
+            upper_size = len(self.upper_hull)
+            lower_size = len(self.lower_hull)
+            self.extend_chains(point)
+
+            # Only the points around the old rightmost point can have been
+            # dropped, so replace them in place.
+            upper_kept = len(self.upper_hull) - 1
+            lower_kept = len(self.lower_hull) - 1
+            if lower_kept < lower_size:
+                end = len(self.hull_points) - (lower_kept - 1)
+                self.hull_points[upper_kept:end] = [point]
+            else:
+                self.hull_points[upper_kept:upper_size] = [point, self.lower_hull[-2]]
+            return
+
+        upper_changed = insert_into_chain(self.upper_hull, point, is_upper_obsolete,
+                                          self.stats)
+        lower_changed = insert_into_chain(self.lower_hull, point, is_lower_obsolete,
+                                          self.stats)
+        if upper_changed or lower_changed:
+            self.hull_points = self.upper_hull + self.lower_hull[-2:0:-1]
@@ -40,6 +40,58 @@ class ConvexHullTest(TestCase):
         hull = ConvexHull(unsorted_points)
         self.assertEqual(hull.hull_points, self.expected_hull)
 
+    def test_convex_hull_algorithms(self):
+        """
+        Every algorithm should produce the same hull as the Jarvis march.
+        """
+        for algorithm in ConvexHull.algorithms:
+            hull = ConvexHull(self.point_list, algorithm=algorithm)
+            self.assertEqual(hull.hull_points, self.expected_hull)
+
+    def test_convex_hull_algorithms_collinear_points(self):
+        points = [Point(x, y) for x in range(4) for y in range(4)]
+        jarvis_hull = ConvexHull(points, algorithm='jarvis')
+        for algorithm in ('monotone_chain', 'quickhull'):
+            hull = ConvexHull(points, algorithm=algorithm)
+            self.assertEqual(hull.hull_points, jarvis_hull.hull_points)
+
+    def test_convex_hull_unknown_algorithm(self):
+        with self.assertRaises(ValueError):
+            ConvexHull(self.point_list, algorithm='graham_scan')
+
+    def test_incremental_convex_hull(self):
+        hull = ConvexHull(self.point_list, incremental=True)
+        self.assertEqual(hull.hull_points, self.expected_hull)
+
+    def test_incremental_add_point(self):
+        """
+        Splicing points into an incremental hull should give the same hull as
+        rebuilding it, whether the point is right of the hull, left of it,
+        inside it or on one of its edges.
+        """
+        new_points = [Point(3, 1), Point(-1, 1), Point(1, 1), Point(1, 2.5),
+                      Point(3, 3), Point(2, 2)]
+        hull = ConvexHull(self.point_list, incremental=True)
+        rebuilt_hull = ConvexHull(self.point_list)
+        for point in new_points:
+            hull.add_point(point)
+            rebuilt_hull.add_point(point)
+            self.assertEqual(hull.points, rebuilt_hull.points)
+            self.assertEqual(hull.hull_points, rebuilt_hull.hull_points)
+
+    def test_incremental_add_collinear_points(self):
+        """
+        Collinear points are kept in the hull the same way build keeps them.
+        """
+        hull = ConvexHull([Point(0, 0), Point(0, 1), Point(0, 2)], incremental=True)
+        hull.add_point(Point(0, 3))
+        self.assertEqual(hull.hull_points, [Point(0, 0), Point(0, 1),
+                                            Point(0, 2), Point(0, 3)])
+        hull.add_point(Point(1, 0))
+        self.assertEqual(hull.hull_points, [Point(0, 0), Point(0, 1),
+                                            Point(0, 2), Point(0, 3),
+                                            Point(1, 0)])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,259 @@
+from array import array
+from multiprocessing import Pool, cpu_count
+
+from convex_hull import ConvexHull
+from geometry import orientation, in_circle, Point
+from triangulation import Delaunay
+
+
+def triangulate_strip(coordinates):
+    """
+    Triangulates one strip of sorted, unique points given as x, y pairs. Runs
+    in a worker process, so only arrays and a dict of indices into the strip
+    are sent back.
+    """
+    points = [Point(coordinates[i], coordinates[i + 1])
+              for i in range(0, len(coordinates), 2)]
+    delaunay = Delaunay(points, legalize=True)
+    return delaunay.mesh.triangles, delaunay.mesh.halfedges, delaunay.hull_edges
+
+
+def is_between(point, point_1, point_2):
+    """
+    Whether point, on the line through point_1 and point_2, lies strictly
+    between them.
+    """
+    return (min(point_1.x, point_2.x) <= point.x <= max(point_1.x, point_2.x) and
+            min(point_1.y, point_2.y) <= point.y <= max(point_1.y, point_2.y) and
+            point != point_1 and point != point_2)
+
+
+class DivideAndConquer(Delaunay):
+    """
+    Creates the Delaunay triangulation by splitting the sorted points into
+    strips, triangulating the strips in a process pool and merging
+    neighboring strips along the seam between their boundaries.
+
+    By default there is a strip per CPU, but never fewer than
+    min_strip_size points to a strip. With a single strip this is the plain
+    sweep. The strips are triangulated without stats, so only the merges
+    are counted, though the time for all of it goes to the triangulate phase.
+    """
+    def __init__(self, points, strips=None, processes=None,
+                 min_strip_size=10000, stats=None):
+        self.strips = strips
+        self.processes = processes
+        self.min_strip_size = min_strip_size
+        # Start and end index into self.points of every strip
+        self.strip_ranges = []
+        super(DivideAndConquer, self).__init__(points, legalize=True, stats=stats)
+
+    def build_initial(self):
+        self.strip_ranges = self.get_strip_ranges()
+        if len(self.strip_ranges) == 1:
+            super(DivideAndConquer, self).build_initial()
+
+    def get_strip_ranges(self):
+        """
+        Splits the points into strips of about the same size. A strip with
+        all its points on one line can't be triangulated by itself, so it is
+        joined to the strip after it.
+        """
+        count = len(self.points)
+        strips = self.strips
+        if strips is None:
+            strips = min(cpu_count(), count // self.min_strip_size)
+        strips = max(1, min(strips, count // 3))
+
+        bounds = [i * count // strips for i in range(strips + 1)]
+        ranges = []
+        start = 0
+        for end in bounds[1:]:
+            if end == count or not self.is_collinear(start, end):
+                ranges.append((start, end))
+                start = end
+        if start < count:
+            # The last points were all on one line
+            if ranges:
+                ranges[-1] = (ranges[-1][0], count)
+            else:
+                ranges.append((0, count))
+        return ranges
+
+    def is_collinear(self, start, end):
+        """
+        Whether the points from start to end are all on the same line
+        """
+        points = self.points
+        if end - start < 3:
+            return True
+        for index in range(start + 2, end):
+            if orientation(points[start], points[start + 1], points[index]) != 0:
+                return False
+        return True
+
+    def triangulate(self):
+        if len(self.strip_ranges) == 1:
+            super(DivideAndConquer, self).triangulate()
+            return
+
+        strip_coordinates = []
+        for start, end in self.strip_ranges:
+            coordinates = array('d')
+            for point in self.points[start:end]:
+                coordinates.append(point.x)
+                coordinates.append(point.y)
+            strip_coordinates.append(coordinates)
+
+        if self.processes == 1:
+            results = [triangulate_strip(coordinates)
+                       for coordinates in strip_coordinates]
+        else:
+            pool = Pool(self.processes)
+            try:
+                results = pool.map(triangulate_strip, strip_coordinates)
+            finally:
+                pool.close()
+                pool.join()
+
+        for (start, end), result in zip(self.strip_ranges, results):
+            self.add_strip(start, *result)
+            if start > 0:
+                self.merge_strips(start - 1, start)
+
+        self.convex_hull = ConvexHull(self.points, algorithm='monotone_chain',
+                                      stats=self.stats)
+        self.swept = len(self.points)
+        self.mesh.update_vertex_edges()
+        self._triangles = None
+
+    def add_strip(self, start, triangles, halfedges, hull_edges):
+        """
+        Copies a triangulated strip into the mesh, shifting its indices by
+        the strip's start in self.points and its half-edges by the number of
+        half-edges already in the mesh.
+        """
+        mesh = self.mesh
+        offset = len(mesh.triangles)
+        mesh.triangles.extend(array('l', [vertex + start for vertex in triangles]))
+        mesh.halfedges.extend(array('l', [
+            edge + offset if edge != -1 else -1 for edge in halfedges]))
+
+        for vertex, edge in hull_edges.items():
+            vertex += start
+            edge += offset
+            next_vertex = mesh.triangles[edge]
+            self.hull_edges[vertex] = edge
+            self.hull_next[vertex] = next_vertex
+            self.hull_prev[next_vertex] = vertex
+
+    def merge_strips(self, left, right):
+        """
+        Merges the triangulation holding the point at index left, its
+        rightmost point, with the one holding right, its leftmost point.
+
+        The gap between their boundaries is filled by zipping up from the
+        lower common tangent: each triangle takes the next boundary point
+        above the base edge on either side, whichever keeps the triangles
+        from overlapping and is the Delaunay choice when both do. The
+        triangles along the seam are then legalized.
+        """
+        points = self.points
+        hull_next = self.hull_next
+        hull_prev = self.hull_prev
+
+        # Walk down to the lower common tangent. Going down is clockwise on
+        # the left triangulation and counter clockwise on the right one.
+        changed = True
+        while changed:
+            changed = False
+            while True:
+                candidate = hull_next[left]
+                turn = orientation(points[left], points[right], points[candidate])
+                if turn > 0 or (turn == 0 and is_between(
+                        points[candidate], points[left], points[right])):
+                    left = candidate
+                    changed = True
+                else:
+                    break
+            while True:
+                candidate = hull_prev[right]
+                turn = orientation(points[left], points[right], points[candidate])
+                if turn > 0 or (turn == 0 and is_between(
+                        points[candidate], points[left], points[right])):
+                    right = candidate
+                    changed = True
+                else:
+                    break
+
+        mesh = self.mesh
+        bottom_left = left
+        bottom_right = right
+        new_edges = []
+        # Boundary points passed while zipping, which end up inside
+        covered = []
+        # The half-edge running right to left along the current base
+        base_edge = -1
+        while True:
+            left_candidate = hull_prev[left]
+            right_candidate = hull_next[right]
+            left_point = points[left]
+            right_point = points[right]
+            left_valid = orientation(left_point, right_point,
+                                     points[left_candidate]) < 0
+            right_valid = orientation(left_point, right_point,
+                                      points[right_candidate]) < 0
+            if not left_valid and not right_valid:
+                break
+
+            if left_valid and right_valid:
+                # Neither candidate may reach across the other side's
+                # boundary. When both can be taken, take the Delaunay one.
+                left_fits = orientation(right_point, points[right_candidate],
+                                        points[left_candidate]) < 0
+                right_fits = orientation(left_point, points[left_candidate],
+                                         points[right_candidate]) > 0
+                if left_fits and right_fits:
+                    left_valid = in_circle(left_point, right_point,
+                                           points[left_candidate],
+                                           points[right_candidate]) <= 0
+                    if self.stats is not None:
+                        self.stats.count('in_circle')
+                else:
+                    left_valid = left_fits
+
+            if left_valid:
+                edge = mesh.add_triangle(left, right, left_candidate)
+                mesh.link(edge + 2, self.hull_edges[left_candidate])
+                next_base_edge = edge + 1
+                if left != bottom_left:
+                    covered.append(left)
+                left = left_candidate
+            else:
+                edge = mesh.add_triangle(left, right, right_candidate)
+                mesh.link(edge + 1, self.hull_edges[right])
+                next_base_edge = edge + 2
+                if right != bottom_right:
+                    covered.append(right)
+                right = right_candidate
+
+            if base_edge == -1:
+                bottom_edge = edge
+            else:
+                mesh.link(edge, base_edge)
+            base_edge = next_base_edge
+            new_edges.extend((edge, edge + 1, edge + 2))
+
+        for index in covered:
+            del hull_next[index]
+            del hull_prev[index]
+            del self.hull_edges[index]
+
+        hull_next[bottom_right] = bottom_left
+        hull_prev[bottom_left] = bottom_right
+        self.hull_edges[bottom_right] = bottom_edge
+        hull_next[left] = right
+        hull_prev[right] = left
+        self.hull_edges[left] = base_edge
+
+        self.legalize_edges(new_edges)
@@ -0,0 +1,62 @@
+import unittest
+from unittest import TestCase
+
+from random import Random
+
+from divide_and_conquer import DivideAndConquer
+from geometry import Point
+from triangulation import Delaunay
+
+
+def get_triangle_set(delaunay):
+    mesh = delaunay.mesh
+    return set(tuple(sorted(mesh.get_triangle(triangle)))
+               for triangle in range(mesh.triangle_count))
+
+
+class DivideAndConquerTest(TestCase):
+    def setUp(self):
+        random = Random(2)
+        self.points = [Point(random.random(), random.random())
+                       for _ in range(300)]
+
+    def test_matches_sweep(self):
+        sweep = Delaunay(self.points, legalize=True)
+        for strips in (2, 3, 7):
+            delaunay = DivideAndConquer(self.points, strips=strips, processes=1)
+            self.assertEqual(len(delaunay.strip_ranges), strips)
+            self.assertEqual(get_triangle_set(delaunay), get_triangle_set(sweep))
+            self.assertEqual(delaunay.hull_next, sweep.hull_next)
+
+    def test_process_pool(self):
+        sweep = Delaunay(self.points, legalize=True)
+        delaunay = DivideAndConquer(self.points, strips=3, processes=2)
+        self.assertEqual(get_triangle_set(delaunay), get_triangle_set(sweep))
+
+    def test_collinear_strip(self):
+        """
+        The first strip is on a line, so it is joined to the next one
+        """
+        points = [Point(0, y) for y in range(4)] + [Point(1, 0), Point(2, 3),
+                                                    Point(3, 1), Point(4, 2)]
+        delaunay = DivideAndConquer(points, strips=2, processes=1)
+        self.assertEqual(delaunay.strip_ranges, [(0, 8)])
+        sweep = Delaunay(points, legalize=True)
+        self.assertEqual(get_triangle_set(delaunay), get_triangle_set(sweep))
+
+    def test_lattice(self):
+        points = [Point(x, y) for x in range(6) for y in range(5)]
+        delaunay = DivideAndConquer(points, strips=4, processes=1)
+        # A 6 by 5 lattice splits into 40 triangles whichever way the
+        # cocircular squares are cut
+        self.assertEqual(delaunay.mesh.triangle_count, 40)
+        for edge in range(len(delaunay.mesh.halfedges)):
+            self.assertFalse(delaunay.is_illegal(edge))
+
+    def test_all_collinear(self):
+        with self.assertRaises(ValueError):
+            DivideAndConquer([Point(x, x) for x in range(10)], strips=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
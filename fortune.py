@@ -0,0 +1,379 @@
+from heapq import heappush, heappop
+from math import sqrt
+from random import Random
+
+from geometry import sort_points, orientation, Line, LineSegment
+from voronoi import VoronoiDiagram
+
+
+class Arc(object):
+    """
+    The piece of the beach line traced by one point. Arcs link to their
+    neighbors on the beach line and are also the nodes of its treap.
+    """
+    def __init__(self, site, priority):
+        self.site = site
+        self.prev = None
+        self.next = None
+        # The circle event that would remove this arc, if any
+        self.event = None
+
+        self.parent = None
+        self.left = None
+        self.right = None
+        self.priority = priority
+
+
+class CircleEvent(object):
+    """
+    The moment an arc shrinks away, leaving a Voronoi vertex at center.
+    Events are never taken out of the queue, they are marked invalid instead.
+    """
+    def __init__(self, arc, center):
+        self.arc = arc
+        self.center = center
+        self.valid = True
+
+
+class Beachline(object):
+    """
+    The arcs of the beach line, ordered on y, kept in a treap so the arc a
+    new point falls on is found in O(log n) expected time.
+    """
+    def __init__(self, seed=0):
+        self.root = None
+        self.random = Random(seed)
+
+    def new_arc(self, site):
+        return Arc(site, self.random.random())
+
+    def insert_after(self, arc, new_arc):
+        """
+        Places new_arc right above arc, or makes it the first arc if arc is
+        None.
+        """
+        if arc is None:
+            self.root = new_arc
+            return
+
+        new_arc.prev = arc
+        new_arc.next = arc.next
+        if arc.next is not None:
+            arc.next.prev = new_arc
+        arc.next = new_arc
+
+        # The in order successor of arc is its right subtree's first node
+        if arc.right is None:
+            arc.right = new_arc
+        else:
+            arc = arc.right
+            while arc.left is not None:
+                arc = arc.left
+            arc.left = new_arc
+        new_arc.parent = arc
+
+        while (new_arc.parent is not None and
+               new_arc.parent.priority < new_arc.priority):
+            self.rotate_up(new_arc)
+
+    def remove(self, arc):
+        if arc.prev is not None:
+            arc.prev.next = arc.next
+        if arc.next is not None:
+            arc.next.prev = arc.prev
+
+        # Rotate the arc down to a leaf before cutting it off
+        while arc.left is not None or arc.right is not None:
+            if arc.right is None or (arc.left is not None and
+                                     arc.left.priority > arc.right.priority):
+                self.rotate_up(arc.left)
+            else:
+                self.rotate_up(arc.right)
+
+        if arc.parent is None:
+            self.root = None
+        elif arc.parent.left is arc:
+            arc.parent.left = None
+        else:
+            arc.parent.right = None
+
+    def rotate_up(self, node):
+        parent = node.parent
+        grandparent = parent.parent
+        if parent.left is node:
+            parent.left = node.right
+            if node.right is not None:
+                node.right.parent = parent
+            node.right = parent
+        else:
+            parent.right = node.left
+            if node.left is not None:
+                node.left.parent = parent
+            node.left = parent
+        parent.parent = node
+        node.parent = grandparent
+
+        if grandparent is None:
+            self.root = node
+        elif grandparent.left is parent:
+            grandparent.left = node
+        else:
+            grandparent.right = node
+
+
+class Fortune(VoronoiDiagram):
+    """
+    Builds the Voronoi diagram of a set of points directly with Fortune's
+    sweep line algorithm, in O(n log n) and without a triangulation. The
+    sweep line moves left to right so points are taken in sort_points order,
+    which is also the order of the cells, matching Voronoi.
+
+    Site and circle events share one heap. The beach line's arcs are kept in
+    a treap, and circle events made stale by a changing beach line are
+    invalidated rather than removed from the heap.
+    """
+    def __init__(self, points, bounding_box):
+        super(Fortune, self).__init__(sort_points(points), bounding_box)
+
+        self.beachline = Beachline()
+        self.events = []
+        self.event_count = 0
+        self.sweep_x = None
+        # Maps the points (a, b), a < b, of every Voronoi edge to its
+        # [start, end] vertices
+        self.edge_vertices = {}
+        # Whether every point swept so far has the same x
+        self.vertical_start = True
+
+        self.sweep()
+        self.build()
+
+    def sweep(self):
+        # The points are sorted, which already makes a valid heap
+        self.events = [(point.x, point.y, 1, index, None)
+                       for index, point in enumerate(self.points)]
+
+        while self.events:
+            x, y, kind, index, event = heappop(self.events)
+            self.sweep_x = x
+            if kind == 1:
+                self.add_site(index)
+            elif event.valid:
+                self.remove_arc(event)
+
+    def push_circle_event(self, arc, center, x):
+        event = CircleEvent(arc, center)
+        arc.event = event
+        self.event_count += 1
+        # Circle events go before a point at the same spot
+        heappush(self.events, (x, center.y, 0, self.event_count, event))
+
+    def add_site(self, index):
+        """
+        Splits the arc the new point falls on, starting a Voronoi edge between
+        the two points.
+        """
+        point = self.points[index]
+        first = self.points[0]
+        if self.vertical_start and point.x != first.x:
+            self.vertical_start = False
+
+        if self.vertical_start:
+            # Arcs of points on the first vertical line are stacked in order
+            arc = self.beachline.new_arc(index)
+            self.beachline.insert_after(self.get_last_arc(), arc)
+            if arc.prev is not None:
+                self.get_edge(arc.prev.site, index)
+            return
+
+        arc = self.find_arc(point.y)
+        if arc.event is not None:
+            arc.event.valid = False
+            arc.event = None
+
+        new_arc = self.beachline.new_arc(index)
+        split_arc = self.beachline.new_arc(arc.site)
+        self.beachline.insert_after(arc, new_arc)
+        self.beachline.insert_after(new_arc, split_arc)
+        self.get_edge(arc.site, index)
+
+        self.check_circle_event(arc)
+        self.check_circle_event(split_arc)
+
+    def remove_arc(self, event):
+        """
+        Removes an arc that shrank to nothing. Its two edges end at the
+        event's center and a new edge between its neighbors starts there.
+        """
+        arc = event.arc
+        lower = arc.prev
+        upper = arc.next
+        vertex = self.add_vertex(event.center.x, event.center.y)
+
+        self.end_breakpoint(lower.site, arc.site, vertex)
+        self.end_breakpoint(arc.site, upper.site, vertex)
+        self.beachline.remove(arc)
+
+        for neighbor in (lower, upper):
+            if neighbor.event is not None:
+                neighbor.event.valid = False
+                neighbor.event = None
+
+        self.start_breakpoint(lower.site, upper.site, vertex)
+        self.check_circle_event(lower)
+        self.check_circle_event(upper)
+
+    def get_last_arc(self):
+        arc = self.beachline.root
+        if arc is None:
+            return None
+        while arc.right is not None:
+            arc = arc.right
+        return arc
+
+    def find_arc(self, y):
+        """
+        Walks down the treap to the arc covering y on the sweep line.
+        """
+        arc = self.beachline.root
+        while True:
+            if arc.prev is not None and y < self.get_breakpoint(arc.prev.site, arc.site):
+                arc = arc.left
+            elif arc.next is not None and y > self.get_breakpoint(arc.site, arc.next.site):
+                arc = arc.right
+            else:
+                return arc
+
+    def get_breakpoint(self, lower, upper):
+        """
+        The y where the arc of lower meets the arc of upper above it. Each
+        arc is the parabola of points as close to its point as to the sweep
+        line, so this is the root of a quadratic.
+        """
+        point_1 = self.points[lower]
+        point_2 = self.points[upper]
+        if point_1.x == self.sweep_x:
+            if point_2.x == self.sweep_x:
+                return (point_1.y + point_2.y) / 2
+            return point_1.y
+        if point_2.x == self.sweep_x:
+            return point_2.y
+
+        # Solve relative to the sweep line and point_1 to keep precision
+        px = point_1.x - self.sweep_x
+        qx = point_2.x - self.sweep_x
+        qy = point_2.y - point_1.y
+        a = qx - px
+        b = 2 * px * qy
+        c = qx * px * px - px * (qy * qy + qx * qx)
+
+        if a == 0:
+            return point_1.y - c / b
+
+        discriminant = sqrt(max(b * b - 4 * a * c, 0))
+        root_1 = (-b - discriminant) / (2 * a)
+        root_2 = (-b + discriminant) / (2 * a)
+        # The arc of the point closer to the sweep line is the narrower one,
+        # and lies between the two roots
+        if point_1.x > point_2.x:
+            return point_1.y + max(root_1, root_2)
+        return point_1.y + min(root_1, root_2)
+
+    def check_circle_event(self, arc):
+        """
+        Queues the event removing arc if the breakpoints on either side of it
+        are moving towards each other, which is when its neighbors' points
+        and its own turn clockwise.
+        """
+        lower = arc.prev
+        upper = arc.next
+        if lower is None or upper is None or lower.site == upper.site:
+            return
+
+        point_1 = self.points[lower.site]
+        point_2 = self.points[arc.site]
+        point_3 = self.points[upper.site]
+        if orientation(point_1, point_2, point_3) <= 0:
+            return
+
+        # The breakpoints meet where the perpendicular bisectors do
+        line_1 = LineSegment(point_1, point_2)
+        line_2 = LineSegment(point_2, point_3)
+        center = Line.intersect(
+            line_1.get_perpendicular_bisector(line_1.get_midpoint()),
+            line_2.get_perpendicular_bisector(line_2.get_midpoint()))
+        if center is None:
+            return
+
+        x = center.x + center.distance(point_2)
+        # Rounding can put an event that is due now just behind the sweep line
+        self.push_circle_event(arc, center, max(x, self.sweep_x))
+
+    def get_edge(self, a, b):
+        key = (a, b) if a < b else (b, a)
+        if key not in self.edge_vertices:
+            self.edge_vertices[key] = [None, None]
+        return self.edge_vertices[key]
+
+    def end_breakpoint(self, lower, upper, vertex):
+        """
+        The breakpoint between the arcs of lower and upper has reached a
+        vertex. It moves along the edge towards its start when lower < upper.
+        """
+        edge = self.get_edge(lower, upper)
+        if lower < upper:
+            edge[0] = vertex
+        else:
+            edge[1] = vertex
+
+    def start_breakpoint(self, lower, upper, vertex):
+        edge = self.get_edge(lower, upper)
+        if lower < upper:
+            edge[1] = vertex
+        else:
+            edge[0] = vertex
+
+    def build(self):
+        """
+        Clips the edges and chains each cell's edges together at their shared
+        vertices.
+        """
+        cell_edges = [[] for point in self.points]
+        for (a, b), (start, end) in self.edge_vertices.items():
+            clipped = self.clip_edge(a, b, start, end)
+            cell_edges[a].append((start, end, clipped, b))
+            if clipped is not None:
+                clipped = (clipped[1], clipped[0])
+            cell_edges[b].append((end, start, clipped, a))
+
+        for index, edges in enumerate(cell_edges):
+            ordered = self.order_edges(edges)
+            self.add_cell(index,
+                          [clipped for start, end, clipped, neighbor in ordered],
+                          [neighbor for start, end, clipped, neighbor in ordered])
+
+    def order_edges(self, edges):
+        """
+        Orders a cell's edges counter clockwise by following each edge's end
+        to the edge starting there, beginning with an edge coming in from
+        infinity.
+        """
+        by_start = {}
+        unbounded = []
+        for edge in edges:
+            if edge[0] is None:
+                unbounded.append(edge)
+            else:
+                by_start[edge[0]] = edge
+
+        ordered = []
+        while unbounded or by_start:
+            if unbounded:
+                edge = unbounded.pop()
+            else:
+                edge = by_start.pop(next(iter(by_start)))
+            ordered.append(edge)
+            while edge[1] is not None and edge[1] in by_start:
+                edge = by_start.pop(edge[1])
+                ordered.append(edge)
+        return ordered
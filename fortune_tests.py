@@ -0,0 +1,108 @@
+import unittest
+from unittest import TestCase
+from random import Random
+
+from geometry import Point
+from triangulation import Delaunay
+from voronoi import Voronoi
+from fortune import Beachline, Fortune
+
+
+def get_area(polygon):
+    """
+    Area of a counter clockwise polygon
+    """
+    area = 0
+    for i in range(len(polygon)):
+        point_1 = polygon[i]
+        point_2 = polygon[(i + 1) % len(polygon)]
+        area += point_1.x * point_2.y - point_2.x * point_1.y
+    return area / 2
+
+
+class BeachlineTest(TestCase):
+    def test_insert_and_remove(self):
+        """
+        Arcs stay linked in the order they were placed in
+        """
+        beachline = Beachline()
+        arcs = [beachline.new_arc(site) for site in range(20)]
+        beachline.insert_after(None, arcs[0])
+        for i in range(1, 20):
+            beachline.insert_after(arcs[i - 1], arcs[i])
+        for i in range(1, 20, 2):
+            beachline.remove(arcs[i])
+
+        arc = beachline.root
+        while arc.left is not None:
+            arc = arc.left
+        sites = []
+        while arc is not None:
+            sites.append(arc.site)
+            arc = arc.next
+        self.assertEqual(sites, list(range(0, 20, 2)))
+
+
+class FortuneTest(TestCase):
+    def test_fortune_cells(self):
+        points = [
+            Point(0, 0),
+            Point(4, 0),
+            Point(0, 4),
+            Point(4, 4),
+            Point(2, 2)
+        ]
+        fortune = Fortune(points, (0, 0, 4, 4))
+        center = fortune.points.index(Point(2, 2))
+        corner = fortune.points.index(Point(0, 0))
+
+        self.assertCountEqual(fortune.get_cell(center), [
+            Point(2, 0), Point(4, 2), Point(2, 4), Point(0, 2)
+        ])
+        self.assertCountEqual(fortune.get_cell(corner), [
+            Point(0, 0), Point(2, 0), Point(0, 2)
+        ])
+
+    def test_fortune_matches_voronoi(self):
+        """
+        Cells are in the same order and cover the same area as the cells of
+        the Voronoi diagram derived from a Delaunay triangulation.
+        """
+        random = Random(11)
+        points = [Point(random.uniform(0, 10), random.uniform(0, 10))
+                  for i in range(80)]
+        bounding_box = (1, 1, 9, 9)
+        fortune = Fortune(points, bounding_box)
+        voronoi = Voronoi(Delaunay(points, legalize=True), bounding_box)
+
+        self.assertEqual(fortune.points, voronoi.points)
+        self.assertEqual(len(fortune.cell_offsets), len(voronoi.cell_offsets))
+        for index in range(len(points)):
+            self.assertAlmostEqual(get_area(fortune.get_cell(index)),
+                                   get_area(voronoi.get_cell(index)))
+
+    def test_fortune_collinear_points(self):
+        """
+        Collinear points, which can't be triangulated, give strips.
+        """
+        points = [Point(0, 1), Point(0, 3), Point(0, 0), Point(0, 2)]
+        fortune = Fortune(points, (-1, 0, 1, 3))
+        # Each of the three edges is clipped on both sides of the box
+        self.assertEqual(len(fortune.vertices) // 2, 3 * 2 + 4)
+        for index, area in enumerate((0.5, 1, 1, 0.5)):
+            self.assertAlmostEqual(get_area(fortune.get_cell(index)), area * 2)
+
+    def test_fortune_grid(self):
+        """
+        Four points meet at every vertex of a grid's diagram.
+        """
+        points = [Point(x, y) for x in range(5) for y in range(5)]
+        fortune = Fortune(points, (0, 0, 4, 4))
+        for index, point in enumerate(fortune.points):
+            on_side = (point.x in (0, 4)) + (point.y in (0, 4))
+            expected_area = (1, 0.5, 0.25)[on_side]
+            self.assertAlmostEqual(get_area(fortune.get_cell(index)), expected_area)
+
+
+if __name__ == '__main__':
+    unittest.main()
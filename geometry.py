@@ -1,3 +1,5 @@
+from array import array
+from fractions import Fraction
 from math import sqrt
 
 
@@ -9,7 +11,254 @@ def sort_points(points):
     return sorted(unique_points, key=lambda p: (p.x, p.y))
 
 
+def sort_coordinates(coordinates):
+    """
+    Sorts a flat array of x, y pairs on x, then y, and removes duplicates,
+    keeping track of where each pair went. Returns the sorted unique pairs,
+    the input index each of them came from, which is the first of any
+    duplicates, and for every input pair the index of its sorted pair.
+    """
+    xs = coordinates[0::2]
+    ys = coordinates[1::2]
+    # Sorting the indices on y and then, stably, on x sorts them on x, then
+    # y, with duplicates left in input order
+    order = list(range(len(xs)))
+    order.sort(key=ys.__getitem__)
+    order.sort(key=xs.__getitem__)
+
+    sorted_coordinates = array('d')
+    unique = array('l')
+    index_map = array('l', [0]) * len(xs)
+    previous_x = previous_y = None
+    for index in order:
+        x = xs[index]
+        y = ys[index]
+        if x != previous_x or y != previous_y:
+            sorted_coordinates.append(x)
+            sorted_coordinates.append(y)
+            unique.append(index)
+            previous_x = x
+            previous_y = y
+        index_map[index] = len(unique) - 1
+    return sorted_coordinates, unique, index_map
+
+
+# Relative error bounds of the float orientation and in_circle results,
+# from Shewchuk's adaptive predicates. Below them the sign can't be trusted
+# and the result is worked out again exactly.
+EPSILON = 2.0 ** -53
+ORIENTATION_BOUND = (3.0 + 16.0 * EPSILON) * EPSILON
+IN_CIRCLE_BOUND = (10.0 + 96.0 * EPSILON) * EPSILON
+
+
+def orientation(point_1, point_2, point_3):
+    """
+    Determines the turn made by three points without building a Triangle.
+    Positive when clockwise, negative when counter clockwise and 0 when the
+    points are on the same line. The sign is always exact.
+    """
+    left = (point_2.y - point_1.y) * (point_3.x - point_2.x)
+    right = (point_2.x - point_1.x) * (point_3.y - point_2.y)
+    turn = left - right
+    if abs(turn) > ORIENTATION_BOUND * (abs(left) + abs(right)):
+        return turn
+    return exact_orientation(point_1, point_2, point_3)
+
+
+def exact_orientation(point_1, point_2, point_3):
+    """
+    orientation() in exact rational arithmetic, rounded to a float at the end
+    """
+    x_1, y_1 = Fraction(point_1.x), Fraction(point_1.y)
+    x_2, y_2 = Fraction(point_2.x), Fraction(point_2.y)
+    x_3, y_3 = Fraction(point_3.x), Fraction(point_3.y)
+    return float((y_2 - y_1) * (x_3 - x_2) - (x_2 - x_1) * (y_3 - y_2))
+
+
+def in_circle(point_1, point_2, point_3, point):
+    """
+    Determines whether point lies inside the circumcircle of the counter
+    clockwise triangle point_1, point_2, point_3 without finding the circle.
+    Positive when inside, negative when outside and 0 when on the circle.
+    The sign is always exact.
+    """
+    adx = point_1.x - point.x
+    ady = point_1.y - point.y
+    bdx = point_2.x - point.x
+    bdy = point_2.y - point.y
+    cdx = point_3.x - point.x
+    cdy = point_3.y - point.y
+
+    bdxcdy = bdx * cdy
+    cdxbdy = cdx * bdy
+    cdxady = cdx * ady
+    adxcdy = adx * cdy
+    adxbdy = adx * bdy
+    bdxady = bdx * ady
+    a_lift = adx * adx + ady * ady
+    b_lift = bdx * bdx + bdy * bdy
+    c_lift = cdx * cdx + cdy * cdy
+
+    det = (a_lift * (bdxcdy - cdxbdy) +
+           b_lift * (cdxady - adxcdy) +
+           c_lift * (adxbdy - bdxady))
+    permanent = ((abs(bdxcdy) + abs(cdxbdy)) * a_lift +
+                 (abs(cdxady) + abs(adxcdy)) * b_lift +
+                 (abs(adxbdy) + abs(bdxady)) * c_lift)
+    if abs(det) > IN_CIRCLE_BOUND * permanent:
+        return det
+    return exact_in_circle(point_1, point_2, point_3, point)
+
+
+def exact_in_circle(point_1, point_2, point_3, point):
+    """
+    in_circle() in exact rational arithmetic, rounded to a float at the end
+    """
+    x, y = Fraction(point.x), Fraction(point.y)
+    adx, ady = Fraction(point_1.x) - x, Fraction(point_1.y) - y
+    bdx, bdy = Fraction(point_2.x) - x, Fraction(point_2.y) - y
+    cdx, cdy = Fraction(point_3.x) - x, Fraction(point_3.y) - y
+    return float((adx * adx + ady * ady) * (bdx * cdy - cdx * bdy) +
+                 (bdx * bdx + bdy * bdy) * (cdx * ady - adx * cdy) +
+                 (cdx * cdx + cdy * cdy) * (adx * bdy - bdx * ady))
+
+
+def circumcenter(point_1, point_2, point_3):
+    """
+    Finds the center of the circle through three points directly from their
+    coordinates, without building the perpendicular bisectors.
+    """
+    bx = point_2.x - point_1.x
+    by = point_2.y - point_1.y
+    cx = point_3.x - point_1.x
+    cy = point_3.y - point_1.y
+    left = bx * cy
+    right = by * cx
+    cross = left - right
+    if abs(cross) <= ORIENTATION_BOUND * (abs(left) + abs(right)):
+        # Too close to call in floats, the cross product is the negated
+        # orientation
+        cross = -exact_orientation(point_1, point_2, point_3)
+
+    if cross == 0:
+        # Points are on the same line
+        return None
+
+    d = 2 * cross
+    b_squared = bx * bx + by * by
+    c_squared = cx * cx + cy * cy
+    x = point_1.x + (cy * b_squared - by * c_squared) / d
+    y = point_1.y + (bx * c_squared - cx * b_squared) / d
+    return Point(x, y)
+
+
+def crossing_point(point_1, point_2, point_3, point_4):
+    """
+    Finds where the segment from point_1 to point_2 crosses the line through
+    point_3 and point_4, or None if they are parallel. Unlike
+    LineSegment.intersect the point is never rounded off the first segment's
+    ends.
+    """
+    dx = point_2.x - point_1.x
+    dy = point_2.y - point_1.y
+    ex = point_4.x - point_3.x
+    ey = point_4.y - point_3.y
+    denominator = dx * ey - dy * ex
+    if denominator == 0:
+        return None
+
+    t = ((point_3.x - point_1.x) * ey - (point_3.y - point_1.y) * ex) / denominator
+    t = min(max(t, 0.0), 1.0)
+    return Point(point_1.x + t * dx, point_1.y + t * dy)
+
+
+def get_coordinates(points):
+    """
+    Packs Point objects into a flat array of x, y pairs, the layout the batch
+    functions below work on.
+    """
+    return array('d', [value for point in points for value in (point.x, point.y)])
+
+
+def orientations(coordinates, triangles):
+    """
+    orientation() for every index triple in triangles, over a flat array of
+    x, y pairs. Returns an array with one turn per triple.
+    """
+    xs = coordinates[0::2]
+    ys = coordinates[1::2]
+    turns = array('d')
+    indices = iter(triangles)
+    for a, b, c in zip(indices, indices, indices):
+        left = (ys[b] - ys[a]) * (xs[c] - xs[b])
+        right = (xs[b] - xs[a]) * (ys[c] - ys[b])
+        turn = left - right
+        if abs(turn) <= ORIENTATION_BOUND * (abs(left) + abs(right)):
+            turn = exact_orientation(Point(xs[a], ys[a]), Point(xs[b], ys[b]),
+                                     Point(xs[c], ys[c]))
+        turns.append(turn)
+    return turns
+
+
+def circumcircles(coordinates, triangles):
+    """
+    circumcenter() for every index triple in triangles, over a flat array of
+    x, y pairs. Returns an array of center x, y pairs and an array of radii.
+    Triples on the same line get a nan center and an infinite radius.
+    """
+    xs = coordinates[0::2]
+    ys = coordinates[1::2]
+    centers = array('d')
+    radii = array('d')
+    nan = float('nan')
+    inf = float('inf')
+
+    indices = iter(triangles)
+    for a, b, c in zip(indices, indices, indices):
+        ax = xs[a]
+        ay = ys[a]
+        bx = xs[b] - ax
+        by = ys[b] - ay
+        cx = xs[c] - ax
+        cy = ys[c] - ay
+        left = bx * cy
+        right = by * cx
+        cross = left - right
+        if abs(cross) <= ORIENTATION_BOUND * (abs(left) + abs(right)):
+            cross = -exact_orientation(Point(ax, ay), Point(xs[b], ys[b]),
+                                       Point(xs[c], ys[c]))
+        if cross == 0:
+            centers.extend((nan, nan))
+            radii.append(inf)
+            continue
+
+        d = 2 * cross
+        b_squared = bx * bx + by * by
+        c_squared = cx * cx + cy * cy
+        x = (cy * b_squared - by * c_squared) / d
+        y = (bx * c_squared - cx * b_squared) / d
+        centers.extend((ax + x, ay + y))
+        radii.append(sqrt(x * x + y * y))
+    return centers, radii
+
+
+def distances(coordinates, pairs):
+    """
+    The euclidean distance for every index pair in pairs, over a flat array
+    of x, y pairs.
+    """
+    xs = coordinates[0::2]
+    ys = coordinates[1::2]
+    indices = iter(pairs)
+    return array('d', [
+        sqrt((xs[b] - xs[a])**2 + (ys[b] - ys[a])**2)
+        for a, b in zip(indices, indices)
+    ])
+
+
 class Point(object):
+    __slots__ = ('x', 'y')
+
     def __init__(self, x, y):
         # Float the points to ensure Python2 arithmetic
         self.x = float(x)
@@ -42,12 +291,20 @@ class Line(object):
     """
     Parent of LineSegment and ContinuousLine.
     """
+    __slots__ = ()
+
     @classmethod
     def intersect(cls, line_1, line_2):
         """
         Determines if two lines intersect, returns None if not found.
         """
-        det = line_1.A * line_2.B - line_2.A*line_1.B
+        left = line_1.A * line_2.B
+        right = line_2.A * line_1.B
+        det = left - right
+        if abs(det) <= ORIENTATION_BOUND * (abs(left) + abs(right)):
+            # Too close to call in floats
+            det = float(Fraction(line_1.A) * Fraction(line_2.B) -
+                        Fraction(line_2.A) * Fraction(line_1.B))
 
         if det == 0:
             # Lines are parallel (same slope)
@@ -76,6 +333,8 @@ class Line(object):
 
 
 class LineSegment(Line):
+    __slots__ = ('point_1', 'point_2', 'A', 'B', 'C')
+
     def __init__(self, point_1=None, point_2=None, A=None, B=None, C=None):
         """
         Lines are represented with Ax+By=C
@@ -153,6 +412,8 @@ class ContinuousLine(Line):
     With a line being represented by Ax + By = C, this is an
     infinitely continuous line
     """
+    __slots__ = ('A', 'B', 'C')
+
     def __init__(self, A, B, C):
         self.A = A
         self.B = B
@@ -164,16 +425,52 @@ class ContinuousLine(Line):
 
 
 class Triangle(object):
+    """
+    Only the three points are stored. The edges and the orientation are
+    worked out when they are read, so a triangulation's worth of triangles
+    stays small. The circumcircle is the exception, as it is asked for over
+    and over: it is kept once worked out, until a point is replaced.
+    """
+    __slots__ = ('point_1', 'point_2', 'point_3', 'circumcircle_cache')
+
     def __init__(self, point_1, point_2, point_3):
         self.point_1 = point_1
         self.point_2 = point_2
         self.point_3 = point_3
+        # The points the circumcircle was worked out for, followed by its
+        # center, its squared radius and the orientation of the points
+        self.circumcircle_cache = None
+
+    @property
+    def line_1(self):
+        return LineSegment(self.point_1, self.point_2)
 
-        self.line_1 = LineSegment(self.point_1, self.point_2)
-        self.line_2 = LineSegment(self.point_2, self.point_3)
-        self.line_3 = LineSegment(self.point_3, self.point_1)
+    @property
+    def line_2(self):
+        return LineSegment(self.point_2, self.point_3)
 
-        self.clockwise = self.is_clockwise()
+    @property
+    def line_3(self):
+        return LineSegment(self.point_3, self.point_1)
+
+    @property
+    def clockwise(self):
+        return self.is_clockwise()
+
+    @property
+    def circumcenter(self):
+        """
+        The center of the circumcircle, None if the points are on one line
+        """
+        return self.update_circumcircle()[3]
+
+    @property
+    def squared_radius(self):
+        """
+        The squared radius of the circumcircle, infinite if the points are on
+        one line
+        """
+        return self.update_circumcircle()[4]
 
     def __str__(self):
         return 'Triangle({}, {}, {})'.format(self.point_1,
@@ -208,15 +505,12 @@ class Triangle(object):
         """
         Determines whether the triangle is clockwise or counter clockwise
         """
-        orientation = ((self.point_2.y - self.point_1.y) *
-                       (self.point_3.x - self.point_2.x) -
-                       (self.point_2.x - self.point_1.x) *
-                       (self.point_3.y - self.point_2.y))
+        turn = orientation(self.point_1, self.point_2, self.point_3)
 
-        if orientation == 0:
+        if turn == 0:
             # Points are on the same line
             return None
-        if orientation > 0:
+        if turn > 0:
             # CW
             return True
         else:
@@ -226,25 +520,143 @@ class Triangle(object):
     def is_collinear(self):
         return self.clockwise is None
 
+    def update_circumcircle(self):
+        """
+        Works out the circumcircle again if any point was replaced since it
+        last was, returning the cache
+        """
+        cache = self.circumcircle_cache
+        point_1 = self.point_1
+        point_2 = self.point_2
+        point_3 = self.point_3
+        if (cache is None or cache[0] is not point_1 or cache[1] is not point_2 or
+                cache[2] is not point_3):
+            center = circumcenter(point_1, point_2, point_3)
+            if center is None:
+                squared_radius = float('inf')
+                turn = 0
+            else:
+                dx = center.x - point_1.x
+                dy = center.y - point_1.y
+                squared_radius = dx * dx + dy * dy
+                turn = orientation(point_1, point_2, point_3)
+            cache = (point_1, point_2, point_3, center, squared_radius, turn)
+            self.circumcircle_cache = cache
+        return cache
+
+    def in_circumcircle(self, point):
+        """
+        Whether point is strictly inside the circumcircle, from the in_circle
+        determinant rather than the center and radius, so it is exact. Points
+        on one line have no circumcircle to be inside of.
+        """
+        turn = self.update_circumcircle()[5]
+        if turn == 0:
+            return False
+        determinant = in_circle(self.point_1, self.point_2, self.point_3, point)
+        # in_circle is positive inside for counter clockwise points
+        return determinant > 0 if turn < 0 else determinant < 0
+
     @classmethod
     def get_circumcircle(cls, line_1, line_2):
         """
         The three points of a triangle form a circle. The center of
-        the circle can be found via the point where the two perpendicular
-        bisectors meet.
+        the circle is where the two perpendicular bisectors meet, which
+        circumcenter() finds straight from the points.
 
         returns :: center, radius of the circle
         """
-        midpoint_1 = line_1.get_midpoint()
-        perpendicular_line_1 = line_1.get_perpendicular_bisector(midpoint_1)
+        point_1 = line_1.point_1
+        point_2 = line_1.point_2
+        if line_2.point_1 in (point_1, point_2):
+            point_3 = line_2.point_2
+        else:
+            point_3 = line_2.point_1
+
+        center = circumcenter(point_1, point_2, point_3)
+        if center is None:
+            # Points are on the same line
+            return None, None
+        return center, center.distance(point_1)
+
+
+class PointArray(object):
+    """
+    Points kept as x, y pairs in one flat array, the layout the batch
+    functions work on. Indexing hands out Point objects made on demand.
+    """
+    __slots__ = ('coordinates',)
+
+    def __init__(self, points=()):
+        self.coordinates = get_coordinates(points)
+
+    @classmethod
+    def from_coordinates(cls, coordinates):
+        point_array = cls()
+        point_array.coordinates = array('d', coordinates)
+        return point_array
 
-        midpoint_2 = line_2.get_midpoint()
-        perpendicular_line_2 = line_2.get_perpendicular_bisector(midpoint_2)
+    def __len__(self):
+        return len(self.coordinates) // 2
 
-        center = ContinuousLine.intersect(perpendicular_line_1,
-                                          perpendicular_line_2)
-        radius = center.distance(line_1.point_1)
-        return center, radius
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("PointArray index out of range")
+        return Point(self.coordinates[2 * index], self.coordinates[2 * index + 1])
+
+    def __iter__(self):
+        coordinates = self.coordinates
+        for i in range(0, len(coordinates), 2):
+            yield Point(coordinates[i], coordinates[i + 1])
+
+    def append(self, point):
+        self.coordinates.extend((point.x, point.y))
+
+    def extend(self, points):
+        self.coordinates.extend(get_coordinates(points))
+
+
+class TriangleArray(object):
+    """
+    Triangles kept as index triples into a sequence of points, in one flat
+    array. An existing index array, such as Mesh.triangles, is used as is
+    rather than copied. Indexing hands out Triangle objects over the points.
+    """
+    __slots__ = ('points', 'indices')
+
+    def __init__(self, points, indices=()):
+        self.points = points
+        if isinstance(indices, array):
+            self.indices = indices
+        else:
+            self.indices = array('l', indices)
+
+    def __len__(self):
+        return len(self.indices) // 3
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("TriangleArray index out of range")
+        a, b, c = self.get_indices(index)
+        return Triangle(self.points[a], self.points[b], self.points[c])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def get_indices(self, index):
+        return tuple(self.indices[3 * index:3 * index + 3])
+
+    def append(self, a, b, c):
+        self.indices.extend((a, b, c))
 
 
 class ConvexHull(object):
@@ -1,7 +1,13 @@
 import unittest
 from unittest import TestCase
 
-from geometry import Point, LineSegment, ContinuousLine, Triangle, ConvexHull
+import math
+from array import array
+
+from geometry import (Point, LineSegment, ContinuousLine, Triangle, ConvexHull,
+                      orientation, in_circle, get_coordinates, orientations,
+                      circumcircles, distances, sort_points, sort_coordinates,
+                      crossing_point, PointArray, TriangleArray)
 
 
 class PointTest(TestCase):
@@ -58,6 +64,16 @@ class LineSegmentTest(TestCase):
         self.assertEqual(intersect_point.x, 0.5)
         self.assertEqual(intersect_point.y, 0.5)
 
+    def test_crossing_point(self):
+        self.assertEqual(crossing_point(self.point_1, self.point_2,
+                                        self.line_2.point_1, self.line_2.point_2),
+                         Point(0.5, 0.5))
+        self.assertIsNone(crossing_point(self.point_1, self.point_2,
+                                         Point(1, 0), Point(2, 1)))
+        # Never rounded past the end of the first segment
+        point = crossing_point(Point(0, 0), Point(1, 0), Point(1, -1), Point(1, 1))
+        self.assertEqual(point, Point(1, 0))
+
     def test_get_midpoint(self):
         midpoint = self.line_1.get_midpoint()
         self.assertEqual(midpoint.x, 0.5)
@@ -114,6 +130,145 @@ class TriangleTest(TestCase):
         colinear = Triangle(Point(0, 0), Point(1, 0), Point(2, 0))
         self.assertEqual(colinear.clockwise, None)
 
+    def test_orientation(self):
+        self.assertLess(orientation(self.A, self.B, self.C), 0)
+        self.assertGreater(orientation(self.C, self.B, self.A), 0)
+        self.assertEqual(orientation(Point(0, 0), Point(1, 1), Point(2, 2)), 0)
+
+    def test_in_circle(self):
+        """
+        The circumcircle of A, B, C is centered on (0, 1) with a radius of 1
+        """
+        self.assertGreater(in_circle(self.A, self.B, self.C, Point(0.5, 1)), 0)
+        self.assertLess(in_circle(self.A, self.B, self.C, Point(2, 1)), 0)
+        self.assertEqual(in_circle(self.A, self.B, self.C, Point(-1, 1)), 0)
+
+    def test_orientation_near_collinear(self):
+        """
+        Rounding makes the float result 0, the exact one is counter clockwise
+        """
+        point = Point(0.5, 0.5 + 2.0 ** -53)
+        self.assertLess(orientation(point, Point(12, 12), Point(24, 24)), 0)
+        self.assertGreater(orientation(Point(24, 24), Point(12, 12), point), 0)
+        self.assertFalse(Triangle(point, Point(12, 12), Point(24, 24)).is_collinear())
+
+    def test_in_circle_near_cocircular(self):
+        tiny = 2.0 ** -40
+        self.assertGreater(in_circle(self.A, self.B, self.C, Point(-1 + tiny, 1)), 0)
+        self.assertLess(in_circle(self.A, self.B, self.C, Point(-1 - tiny, 1)), 0)
+
+    def test_circumcircle_cache(self):
+        triangle = Triangle(self.A, self.B, self.C)
+        self.assertEqual(triangle.circumcenter, Point(0, 1))
+        self.assertEqual(triangle.squared_radius, 1)
+        self.assertIs(triangle.circumcenter, triangle.circumcenter)
+
+        triangle.point_3 = Point(2, 0)
+        self.assertEqual(triangle.circumcenter, Point(1, 0))
+        self.assertEqual(triangle.squared_radius, 1)
+
+        triangle.point_3 = Point(2, 2)
+        self.assertIsNone(triangle.circumcenter)
+        self.assertEqual(triangle.squared_radius, float('inf'))
+
+    def test_in_circumcircle(self):
+        tiny = 2.0 ** -40
+        for triangle in (Triangle(self.A, self.B, self.C),
+                         Triangle(self.C, self.B, self.A)):
+            self.assertTrue(triangle.in_circumcircle(Point(0.5, 1)))
+            self.assertTrue(triangle.in_circumcircle(Point(-1 + tiny, 1)))
+            self.assertFalse(triangle.in_circumcircle(Point(-1, 1)))
+            self.assertFalse(triangle.in_circumcircle(Point(2, 1)))
+        self.assertFalse(Triangle(self.A, self.B, Point(2, 2)).in_circumcircle(self.B))
+
+
+class BatchTest(TestCase):
+    def setUp(self):
+        self.points = [Point(0, 0), Point(1, 1), Point(0, 2), Point(2, 2)]
+        self.coordinates = get_coordinates(self.points)
+
+    def test_get_coordinates(self):
+        self.assertEqual(list(self.coordinates), [0, 0, 1, 1, 0, 2, 2, 2])
+
+    def test_orientations(self):
+        turns = orientations(self.coordinates, [0, 1, 2, 2, 1, 0, 0, 1, 3])
+        self.assertEqual(list(turns), [
+            orientation(self.points[0], self.points[1], self.points[2]),
+            orientation(self.points[2], self.points[1], self.points[0]),
+            0,
+        ])
+
+    def test_circumcircles(self):
+        centers, radii = circumcircles(self.coordinates, [0, 1, 2, 0, 1, 3])
+        self.assertEqual(list(centers[:2]), [0, 1])
+        self.assertEqual(radii[0], 1)
+        # 0, 1, 3 are on the same line
+        self.assertTrue(math.isnan(centers[2]) and math.isnan(centers[3]))
+        self.assertEqual(radii[1], float('inf'))
+
+    def test_distances(self):
+        lengths = distances(self.coordinates, [0, 2, 2, 3, 0, 3])
+        self.assertEqual(list(lengths), [2, 2, self.points[0].distance(self.points[3])])
+
+
+class SortTest(TestCase):
+    def test_sort_coordinates(self):
+        coordinates = array('d', [2, 1, 0, 5, 2, 0, 0, 5, 2, 1, -1, 3])
+        sorted_coordinates, order, index_map = sort_coordinates(coordinates)
+        self.assertEqual(list(sorted_coordinates), [-1, 3, 0, 5, 2, 0, 2, 1])
+        self.assertEqual(list(order), [5, 1, 2, 0])
+        # Inputs 1 and 3 are the same point, as are 0 and 4
+        self.assertEqual(list(index_map), [3, 1, 2, 1, 3, 0])
+
+    def test_sort_points_keeps_first_duplicate(self):
+        first = Point(1, 1)
+        duplicate = Point(1, 1)
+        points = sort_points([Point(2, 0), first, Point(1, 0), duplicate])
+        self.assertEqual(points, [Point(1, 0), Point(1, 1), Point(2, 0)])
+        self.assertIs(points[1], first)
+
+
+class PointArrayTest(TestCase):
+    def setUp(self):
+        self.points = [Point(0, 0), Point(1, 1), Point(0, 2)]
+        self.point_array = PointArray(self.points)
+
+    def test_point_array(self):
+        self.assertEqual(len(self.point_array), 3)
+        self.assertEqual(self.point_array[1], Point(1, 1))
+        self.assertEqual(self.point_array[-1], Point(0, 2))
+        self.assertEqual(self.point_array[:2], self.points[:2])
+        self.assertEqual(list(self.point_array), self.points)
+        with self.assertRaises(IndexError):
+            self.point_array[3]
+
+    def test_append(self):
+        self.point_array.append(Point(2, 2))
+        self.assertEqual(list(self.point_array.coordinates),
+                         [0, 0, 1, 1, 0, 2, 2, 2])
+
+    def test_from_coordinates(self):
+        point_array = PointArray.from_coordinates([0, 0, 1, 1, 0, 2])
+        self.assertEqual(list(point_array), self.points)
+
+
+class TriangleArrayTest(TestCase):
+    def test_triangle_array(self):
+        points = PointArray([Point(0, 0), Point(1, 1), Point(0, 2), Point(2, 2)])
+        triangles = TriangleArray(points, [0, 1, 2])
+        triangles.append(1, 3, 2)
+        self.assertEqual(len(triangles), 2)
+        self.assertEqual(triangles.get_indices(1), (1, 3, 2))
+        self.assertEqual(triangles[0], Triangle(Point(0, 0), Point(1, 1), Point(0, 2)))
+        self.assertEqual(triangles[1].clockwise, False)
+        self.assertEqual(list(triangles), triangles[:])
+
+    def test_shares_index_array(self):
+        indices = array('l', [0, 1, 2])
+        triangles = TriangleArray([Point(0, 0), Point(1, 1), Point(0, 2)], indices)
+        indices[0] = 2
+        self.assertEqual(triangles.get_indices(0), (2, 1, 2))
+
 
 class ConvexHullTest(TestCase):
     def setUp(self):
@@ -0,0 +1,225 @@
+from array import array
+from heapq import heappush, heappop
+
+from geometry import orientation, crossing_point
+
+
+def get_key(point):
+    return (point.x, point.y)
+
+
+class SegmentSweep(object):
+    """
+    Sweeps a vertical line left to right over segments, stopping at their
+    ends and at the points where neighboring segments meet. The segments
+    the line crosses are kept ordered bottom to top, so only neighbors are
+    ever tested against each other and finding k meeting pairs among n
+    segments takes O((n + k) log n) tests.
+
+    Every pair that meets is reported once, at the first point they share
+    in sweep order, which for overlapping segments is the left end of the
+    overlap.
+    """
+    def __init__(self, segments):
+        # Each segment's ends, left first, then bottom first when vertical
+        self.lefts = []
+        self.rights = []
+        for segment in segments:
+            point_1, point_2 = segment.point_1, segment.point_2
+            if get_key(point_2) < get_key(point_1):
+                point_1, point_2 = point_2, point_1
+            self.lefts.append(point_1)
+            self.rights.append(point_2)
+        size = max([abs(value) for point in self.lefts + self.rights
+                    for value in (point.x, point.y)] or [0.0])
+        self.tolerance = size * 1e-12
+
+        # Event points as (x, y), with the segments starting there, ending
+        # there and found to pass through there
+        self.queue = []
+        self.events = {}
+        # The segments the sweep line crosses, bottom to top
+        self.status = []
+        self.reported = set()
+        self.pairs = array('l')
+        self.coordinates = array('d')
+
+        for index in range(len(self.lefts)):
+            self.get_event(get_key(self.lefts[index]))[0].append(index)
+            self.get_event(get_key(self.rights[index]))[1].append(index)
+
+    def get_event(self, key):
+        event = self.events.get(key)
+        if event is None:
+            event = self.events[key] = ([], [], set())
+            heappush(self.queue, key)
+        return event
+
+    def sweep(self):
+        while self.queue:
+            key = heappop(self.queue)
+            self.handle_event(key, *self.events.pop(key))
+        return self.pairs, self.coordinates
+
+    def get_y(self, index, x, y):
+        """
+        Where a segment the sweep line crosses at x is, clamped to the event
+        at y for vertical segments
+        """
+        left = self.lefts[index]
+        right = self.rights[index]
+        if left.x == right.x:
+            return min(max(y, left.y), right.y)
+        return left.y + (x - left.x) * (right.y - left.y) / (right.x - left.x)
+
+    def is_near(self, index, x, y):
+        """
+        Whether a segment the sweep line crosses passes through x, y, give or
+        take the rounding of points where segments cross
+        """
+        return abs(self.get_y(index, x, y) - y) <= self.tolerance
+
+    def overlaps(self, index_1, index_2):
+        """
+        Whether two segments the sweep line crosses are on one line
+        """
+        left = self.lefts[index_1]
+        right = self.rights[index_1]
+        return (orientation(left, right, self.lefts[index_2]) == 0 and
+                orientation(left, right, self.rights[index_2]) == 0)
+
+    def get_slope_key(self, index):
+        """
+        Orders segments leaving the same point bottom to top, vertical last
+        """
+        left = self.lefts[index]
+        right = self.rights[index]
+        dx = right.x - left.x
+        if dx == 0:
+            return (1, 0.0)
+        return (0, (right.y - left.y) / dx)
+
+    def handle_event(self, key, starts, ends, through):
+        status = self.status
+        x, y = key
+
+        # The segments passing through the event are next to each other,
+        # just where it falls in the status
+        low = 0
+        high = len(status)
+        while low < high:
+            middle = (low + high) // 2
+            if self.get_y(status[middle], x, y) < y:
+                low = middle + 1
+            else:
+                high = middle
+        known = through.union(ends)
+
+        def belongs(index, neighbor):
+            # Overlapping segments move together, even if rounding leaves
+            # the event just off some of them
+            return (index in known or self.is_near(index, x, y) or
+                    (neighbor is not None and self.overlaps(index, neighbor)))
+
+        high = low
+        while high < len(status) and belongs(
+                status[high], status[high - 1] if low < high else None):
+            high += 1
+        while low > 0 and belongs(status[low - 1],
+                                  status[low] if low < high else None):
+            low -= 1
+        while high < len(status) and belongs(
+                status[high], status[high - 1] if low < high else None):
+            high += 1
+        passing = status[low:high]
+        del status[low:high]
+        # Any rounded so far off as to be out of place
+        for index in known.difference(passing):
+            if index in status:
+                position = status.index(index)
+                del status[position]
+                if position < low:
+                    low -= 1
+                passing.append(index)
+
+        meeting = set(starts)
+        meeting.update(ends)
+        meeting.update(passing)
+        self.report(sorted(meeting), key)
+
+        ends = set(ends)
+        inserted = [index for index in set(starts).union(passing)
+                    if index not in ends]
+        inserted.sort(key=self.get_slope_key)
+        status[low:low] = inserted
+        if inserted:
+            if low > 0:
+                self.check(status[low - 1], inserted[0], key)
+            if low + len(inserted) < len(status):
+                self.check(inserted[-1], status[low + len(inserted)], key)
+        elif 0 < low < len(status):
+            self.check(status[low - 1], status[low], key)
+
+    def report(self, indices, key):
+        for i, index_1 in enumerate(indices):
+            for index_2 in indices[i + 1:]:
+                pair = (index_1, index_2)
+                if (pair not in self.reported and
+                        self.get_meeting(index_1, index_2) is not None):
+                    self.reported.add(pair)
+                    self.pairs.extend(pair)
+                    self.coordinates.extend(key)
+
+    def check(self, index_1, index_2, key):
+        """
+        Queues the first point two neighboring segments meet at, if it is
+        past the event at key
+        """
+        pair = (min(index_1, index_2), max(index_1, index_2))
+        if pair in self.reported:
+            return
+        meeting = self.get_meeting(index_1, index_2)
+        if meeting is None:
+            return
+        if meeting > key:
+            self.get_event(meeting)[2].update(pair)
+        else:
+            # Rounded back to or before the event, where they already meet
+            self.report(pair, key)
+
+    def get_meeting(self, index_1, index_2):
+        """
+        The first point in sweep order that two segments share, as (x, y),
+        or None if they don't meet
+        """
+        a = self.lefts[index_1]
+        b = self.rights[index_1]
+        c = self.lefts[index_2]
+        d = self.rights[index_2]
+        turn_c = orientation(a, b, c)
+        turn_d = orientation(a, b, d)
+        turn_a = orientation(c, d, a)
+        turn_b = orientation(c, d, b)
+        if ((turn_c > 0 and turn_d > 0) or (turn_c < 0 and turn_d < 0) or
+                (turn_a > 0 and turn_b > 0) or (turn_a < 0 and turn_b < 0)):
+            return None
+
+        if turn_c == 0 and turn_d == 0:
+            # On one line, meeting where the overlap starts
+            start = max(get_key(a), get_key(c))
+            end = min(get_key(b), get_key(d))
+            return start if start <= end else None
+        for turn, point in ((turn_c, c), (turn_d, d), (turn_a, a), (turn_b, b)):
+            if turn == 0:
+                return get_key(point)
+        return get_key(crossing_point(a, b, c, d))
+
+
+def intersect_all(segments):
+    """
+    Finds every pair of LineSegments in segments that touch or cross, all at
+    once with SegmentSweep rather than testing pairs one at a time with
+    LineSegment.intersect. Returns an array of index pairs, i before j, and
+    an array of the x, y pair of the point each pair meets at, both flat.
+    """
+    return SegmentSweep(segments).sweep()
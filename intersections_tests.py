@@ -0,0 +1,85 @@
+import unittest
+from random import Random
+from unittest import TestCase
+
+from geometry import Point, LineSegment
+from intersections import intersect_all, SegmentSweep
+
+
+def get_pairs(segments):
+    pairs, coordinates = intersect_all(segments)
+    return list(zip(pairs[0::2], pairs[1::2])), list(zip(coordinates[0::2],
+                                                        coordinates[1::2]))
+
+
+def get_all_pairs(segments):
+    """
+    Every pair tested on its own
+    """
+    sweep = SegmentSweep(segments)
+    return set((i, j) for i in range(len(segments)) for j in range(i + 1, len(segments))
+               if sweep.get_meeting(i, j) is not None)
+
+
+def get_segment(random, size):
+    return LineSegment(Point(random.randint(0, size), random.randint(0, size)),
+                       Point(random.randint(0, size), random.randint(0, size)))
+
+
+class IntersectAllTest(TestCase):
+    def test_crossings(self):
+        segments = [
+            LineSegment(Point(0, 0), Point(4, 4)),
+            LineSegment(Point(0, 4), Point(4, 0)),
+            LineSegment(Point(3, 0), Point(3, 5)),
+            LineSegment(Point(5, 5), Point(6, 6)),
+        ]
+        pairs, points = get_pairs(segments)
+        self.assertEqual(pairs, [(0, 1), (1, 2), (0, 2)])
+        self.assertEqual(points, [(2, 2), (3, 1), (3, 3)])
+
+    def test_touching_and_overlapping(self):
+        segments = [
+            LineSegment(Point(0, 0), Point(2, 0)),
+            # Starting where the first ends
+            LineSegment(Point(2, 0), Point(3, 1)),
+            # Ending on the first
+            LineSegment(Point(1, 1), Point(1, 0)),
+            # Overlapping the first, and reported where the overlap starts
+            LineSegment(Point(3, 0), Point(1, 0)),
+            # A point on the second
+            LineSegment(Point(2.5, 0.5), Point(2.5, 0.5)),
+        ]
+        pairs, points = get_pairs(segments)
+        self.assertEqual(sorted(zip(pairs, points)), [
+            ((0, 1), (2, 0)), ((0, 2), (1, 0)), ((0, 3), (1, 0)),
+            ((1, 3), (2, 0)), ((1, 4), (2.5, 0.5)), ((2, 3), (1, 0))])
+
+    def test_many_through_one_point(self):
+        segments = [LineSegment(Point(-i, -1), Point(i, 1)) for i in range(1, 6)]
+        segments.append(LineSegment(Point(0, -1), Point(0, 1)))
+        pairs, points = get_pairs(segments)
+        self.assertEqual(len(pairs), 15)
+        self.assertEqual(set(points), {(0, 0)})
+
+    def test_random(self):
+        random = Random(0)
+        for size in (3, 10, 1000):
+            segments = [get_segment(random, size) for _ in range(200)]
+            pairs, points = get_pairs(segments)
+            self.assertEqual(len(pairs), len(set(pairs)))
+            self.assertEqual(set(pairs), get_all_pairs(segments))
+            for (i, j), (x, y) in zip(pairs, points):
+                point = Point(x, y)
+                for segment in (segments[i], segments[j]):
+                    start, end = segment.point_1, segment.point_2
+                    self.assertAlmostEqual(start.distance(point) + point.distance(end),
+                                           start.distance(end), 6)
+
+    def test_empty(self):
+        self.assertEqual(get_pairs([]), ([], []))
+        self.assertEqual(get_pairs([LineSegment(Point(0, 0), Point(1, 1))]), ([], []))
+
+
+if __name__ == '__main__':
+    unittest.main()
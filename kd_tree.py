@@ -0,0 +1,124 @@
+from array import array
+from heapq import heappush, heappushpop
+
+
+class KDTree(object):
+    """
+    Nearest site queries over points without a triangulation. The same
+    queries are on Delaunay, which answers them by walking the triangulation
+    instead.
+
+    The tree is kept in one array of point indices. The range start to end
+    holds a subtree, with the splitting point in its middle, the points below
+    it along its axis before it and the points above after it. Ranges of at
+    most leaf_size points are searched point by point.
+    """
+    def __init__(self, points, leaf_size=8):
+        self.points = points
+        self.leaf_size = max(1, leaf_size)
+        self.xs = array('d', [point.x for point in points])
+        self.ys = array('d', [point.y for point in points])
+        self.order = array('l', range(len(points)))
+        # Splitting axis of the point in the middle of each range, 0 for x
+        self.axes = array('b', [0]) * len(points)
+        self.build()
+
+    def build(self):
+        xs = self.xs
+        ys = self.ys
+        order = self.order
+        stack = [(0, len(order))]
+        while stack:
+            start, end = stack.pop()
+            if end - start <= self.leaf_size:
+                continue
+
+            indices = order[start:end]
+            x_spread = max(xs[i] for i in indices) - min(xs[i] for i in indices)
+            y_spread = max(ys[i] for i in indices) - min(ys[i] for i in indices)
+            axis = 0 if x_spread >= y_spread else 1
+            values = xs if axis == 0 else ys
+            order[start:end] = array('l', sorted(indices, key=values.__getitem__))
+
+            middle = (start + end) // 2
+            self.axes[middle] = axis
+            stack.append((start, middle))
+            stack.append((middle + 1, end))
+
+    def nearest(self, point):
+        """
+        The index of the point closest to point, or -1 if there are none
+        """
+        nearest = self.nearest_k(point, 1)
+        return nearest[0] if nearest else -1
+
+    def nearest_all(self, points):
+        """
+        nearest() for many points, returned as an array of indices
+        """
+        return array('l', [self.nearest(point) for point in points])
+
+    def nearest_k(self, point, k):
+        """
+        The indices of the k points closest to point, closest first
+        """
+        xs = self.xs
+        ys = self.ys
+        order = self.order
+        x = point.x
+        y = point.y
+        # The k best so far as (-squared distance, index), so the worst of
+        # them is on top
+        best = []
+        limit = float('inf')
+
+        stack = [(0, len(order), 0.0)]
+        while stack:
+            start, end, bound = stack.pop()
+            if bound >= limit:
+                continue
+
+            is_leaf = end - start <= self.leaf_size
+            if is_leaf:
+                candidates = order[start:end]
+            else:
+                middle = (start + end) // 2
+                candidates = (order[middle],)
+
+            for index in candidates:
+                dx = xs[index] - x
+                dy = ys[index] - y
+                distance = dx * dx + dy * dy
+                if len(best) < k:
+                    heappush(best, (-distance, index))
+                elif distance < limit:
+                    heappushpop(best, (-distance, index))
+                if len(best) == k:
+                    limit = -best[0][0]
+
+            if not is_leaf:
+                split = order[middle]
+                if self.axes[middle] == 0:
+                    offset = x - xs[split]
+                else:
+                    offset = y - ys[split]
+                far_bound = max(bound, offset * offset)
+                # The near side goes on top so it is searched first
+                if offset < 0:
+                    stack.append((middle + 1, end, far_bound))
+                    stack.append((start, middle, bound))
+                else:
+                    stack.append((start, middle, far_bound))
+                    stack.append((middle + 1, end, bound))
+
+        return [index for _, index in sorted(best, reverse=True)]
+
+    def nearest_k_all(self, points, k):
+        """
+        nearest_k() for many points, returned as one array of k indices per
+        point, or of all of them when there are fewer than k
+        """
+        nearest = array('l')
+        for point in points:
+            nearest.extend(self.nearest_k(point, k))
+        return nearest
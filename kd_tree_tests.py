@@ -0,0 +1,48 @@
+import unittest
+from unittest import TestCase
+
+from random import Random
+
+from geometry import Point
+from kd_tree import KDTree
+
+
+class KDTreeTest(TestCase):
+    def setUp(self):
+        random = Random(5)
+        self.points = [Point(random.randint(0, 30), random.randint(0, 30))
+                       for _ in range(300)]
+        self.queries = [Point(random.uniform(-5, 35), random.uniform(-5, 35))
+                        for _ in range(50)]
+        self.tree = KDTree(self.points, leaf_size=4)
+
+    def get_distances(self, point, indices):
+        return [point.distance(self.points[index]) for index in indices]
+
+    def test_nearest(self):
+        nearest = self.tree.nearest_all(self.queries)
+        self.assertEqual(nearest.typecode, 'l')
+        for point, index in zip(self.queries, nearest):
+            closest = min(point.distance(other) for other in self.points)
+            self.assertEqual(point.distance(self.points[index]), closest)
+
+    def test_nearest_k(self):
+        for point in self.queries:
+            distances = sorted(point.distance(other) for other in self.points)
+            self.assertEqual(
+                self.get_distances(point, self.tree.nearest_k(point, 7)),
+                distances[:7])
+
+    def test_nearest_k_all(self):
+        nearest = self.tree.nearest_k_all(self.queries[:3], 4)
+        self.assertEqual(len(nearest), 12)
+        self.assertEqual(list(nearest[4:8]), self.tree.nearest_k(self.queries[1], 4))
+
+    def test_small_trees(self):
+        self.assertEqual(KDTree([]).nearest(Point(0, 0)), -1)
+        tree = KDTree([Point(0, 0), Point(2, 2)])
+        self.assertEqual(tree.nearest_k(Point(2, 1), 5), [1, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,184 @@
+from array import array
+
+
+def next_halfedge(edge):
+    """
+    The half-edge after edge in its triangle
+    """
+    return edge - 2 if edge % 3 == 2 else edge + 1
+
+
+def prev_halfedge(edge):
+    """
+    The half-edge before edge in its triangle
+    """
+    return edge + 2 if edge % 3 == 0 else edge - 1
+
+
+class Mesh(object):
+    """
+    A triangle mesh stored as half-edges in flat arrays.
+
+    Triangle t is made of half-edges 3t, 3t+1 and 3t+2, counter clockwise.
+    triangles[e] is the vertex half-edge e starts from, and it ends at the
+    vertex the next half-edge starts from. halfedges[e] is the half-edge
+    running the other way in the neighboring triangle, or -1 if e is on the
+    boundary. vertex_edges[v] is a half-edge starting at v, the one on the
+    boundary for boundary vertices, or -1 if v has no triangles.
+    """
+    def __init__(self, vertex_count):
+        self.triangles = array('l')
+        self.halfedges = array('l')
+        self.vertex_edges = array('l', [-1]) * vertex_count
+
+    @property
+    def triangle_count(self):
+        return len(self.triangles) // 3
+
+    def add_triangle(self, a, b, c):
+        """
+        Adds the counter clockwise triangle a, b, c without neighbors and
+        returns its first half-edge, which runs from a to b.
+        """
+        edge = len(self.triangles)
+        self.triangles.extend((a, b, c))
+        self.halfedges.extend((-1, -1, -1))
+        return edge
+
+    def set_triangle(self, triangle, a, b, c):
+        """
+        Overwrites a triangle with the counter clockwise triangle a, b, c,
+        without neighbors. Whatever was linked to the old triangle has to be
+        linked again.
+        """
+        edge = 3 * triangle
+        self.triangles[edge:edge + 3] = array('l', (a, b, c))
+        self.halfedges[edge:edge + 3] = array('l', (-1, -1, -1))
+        return edge
+
+    def move_triangle(self, source, target):
+        """
+        Moves a triangle into the slot of another one, which must no longer
+        be in use, keeping its neighbors and the vertex half-edges pointing
+        at it.
+        """
+        triangles = self.triangles
+        halfedges = self.halfedges
+        vertex_edges = self.vertex_edges
+        for i in range(3):
+            old = 3 * source + i
+            new = 3 * target + i
+            vertex = triangles[old]
+            triangles[new] = vertex
+            if vertex_edges[vertex] == old:
+                vertex_edges[vertex] = new
+            self.link(new, halfedges[old])
+
+    def pop_triangle(self):
+        """
+        Removes the last triangle, which nothing may be linked to any more
+        """
+        del self.triangles[-3:]
+        del self.halfedges[-3:]
+
+    def link(self, edge, opposite):
+        """
+        Makes two half-edges each other's opposite. opposite may be -1.
+        """
+        self.halfedges[edge] = opposite
+        if opposite != -1:
+            self.halfedges[opposite] = edge
+
+    def update_halfedges(self):
+        """
+        Links every half-edge to its opposite, found by the vertices at its
+        ends, for triangles added without their neighbors.
+        """
+        triangles = self.triangles
+        self.halfedges = array('l', [-1]) * len(triangles)
+        # Half-edges still waiting for their opposite, by start and end
+        waiting = {}
+        for edge in range(len(triangles)):
+            start = triangles[edge]
+            end = triangles[next_halfedge(edge)]
+            opposite = waiting.pop((end, start), -1)
+            if opposite == -1:
+                waiting[(start, end)] = edge
+            else:
+                self.link(edge, opposite)
+
+    def update_vertex_edges(self):
+        """
+        Points every vertex at a half-edge starting from it, preferring the
+        boundary half-edge so a walk around the vertex covers all of it.
+        """
+        vertex_edges = self.vertex_edges
+        halfedges = self.halfedges
+        for edge, vertex in enumerate(self.triangles):
+            if vertex_edges[vertex] == -1 or halfedges[edge] == -1:
+                vertex_edges[vertex] = edge
+
+    def get_triangle(self, triangle):
+        """
+        The vertices of a triangle, counter clockwise
+        """
+        edge = 3 * triangle
+        return (self.triangles[edge], self.triangles[edge + 1],
+                self.triangles[edge + 2])
+
+    def get_edge(self, edge):
+        """
+        The start and end vertex of a half-edge
+        """
+        return self.triangles[edge], self.triangles[next_halfedge(edge)]
+
+    def get_adjacent_triangles(self, triangle):
+        """
+        The triangles across each edge of a triangle, -1 where there are none
+        """
+        adjacent = []
+        for edge in range(3 * triangle, 3 * triangle + 3):
+            opposite = self.halfedges[edge]
+            adjacent.append(opposite // 3 if opposite != -1 else -1)
+        return adjacent
+
+    def get_outgoing_edges(self, vertex):
+        """
+        The half-edges starting from a vertex, counter clockwise
+        """
+        start = self.vertex_edges[vertex]
+        if start == -1:
+            return []
+
+        edges = [start]
+        edge = self.halfedges[prev_halfedge(start)]
+        while edge != -1 and edge != start:
+            edges.append(edge)
+            edge = self.halfedges[prev_halfedge(edge)]
+        return edges
+
+    def find_edge(self, start, end):
+        """
+        The half-edge from start to end, or -1 if there is none
+        """
+        for edge in self.get_outgoing_edges(start):
+            if self.triangles[next_halfedge(edge)] == end:
+                return edge
+        return -1
+
+    def get_vertex_star(self, vertex):
+        """
+        The vertices connected to a vertex, counter clockwise. For a boundary
+        vertex the star runs from one boundary neighbor to the other.
+        """
+        edges = self.get_outgoing_edges(vertex)
+        star = [self.triangles[next_halfedge(edge)] for edge in edges]
+        if edges and self.halfedges[prev_halfedge(edges[-1])] == -1:
+            star.append(self.triangles[prev_halfedge(edges[-1])])
+        return star
+
+    def get_vertex_triangles(self, vertex):
+        """
+        The triangles around a vertex, counter clockwise
+        """
+        return [edge // 3 for edge in self.get_outgoing_edges(vertex)]
@@ -0,0 +1,259 @@
+import mmap
+import struct
+import sys
+from array import array
+
+from convex_hull import ConvexHull
+from geometry import Point, PointArray, TriangleArray
+from mesh import Mesh
+from triangulation import Delaunay
+from voronoi import VoronoiDiagram
+
+MAGIC = b'VORONOI\0'
+VERSION = 1
+HEADER = struct.Struct('<8sII')
+BLOCK = struct.Struct('<16s4sQQ')
+
+
+def get_index_typecode(count, index_size=None):
+    """
+    The typecode of indices into count items: int32 if they fit, unless
+    index_size asks for 4 or 8 bytes.
+    """
+    if index_size is None:
+        index_size = 4 if count < 2 ** 31 else 8
+    if index_size == 4:
+        if count >= 2 ** 31:
+            raise ValueError("{} items can't be indexed with int32.".format(count))
+        return 'i'
+    if index_size == 8:
+        return 'q'
+    raise ValueError("The index size must be 4 or 8 bytes.")
+
+
+def to_array(values, typecode):
+    """
+    Copies values, an array or a memoryview of a block, into an array of
+    typecode, as one copy of the bytes when the item sizes match
+    """
+    if isinstance(values, array) and values.typecode == typecode:
+        return values
+    result = array(typecode)
+    if isinstance(values, (array, memoryview)) and values.itemsize == result.itemsize:
+        result.frombytes(memoryview(values).cast('B'))
+        return result
+    return array(typecode, values)
+
+
+def write_blocks(path, blocks):
+    """
+    Writes (name, typecode, values) blocks to a file at path. Arrays of the
+    block's typecode are written as they are.
+
+    The file is a header, a table of the blocks and the blocks themselves,
+    all little endian. The header is MAGIC, then the version and the number
+    of blocks as uint32. Each table entry is the block's name (16 bytes),
+    its typecode (4 bytes), and its item count and byte offset as uint64.
+    Every block starts on an 8 byte boundary. Points are saved as a float64
+    block of x, y pairs and triangles as an int32 block of index triples,
+    or int64 when there are too many points for int32.
+    """
+    arrays = [(name.encode('ascii'), to_array(values, typecode))
+              for name, typecode, values in blocks]
+
+    offset = HEADER.size + BLOCK.size * len(arrays)
+    table = []
+    for name, values in arrays:
+        offset += -offset % 8
+        table.append(BLOCK.pack(name, values.typecode.encode('ascii'),
+                                len(values), offset))
+        offset += len(values) * values.itemsize
+
+    with open(path, 'wb') as output:
+        output.write(HEADER.pack(MAGIC, VERSION, len(arrays)))
+        for entry in table:
+            output.write(entry)
+        for name, values in arrays:
+            output.write(b'\0' * (-output.tell() % 8))
+            if sys.byteorder == 'big':
+                values = array(values.typecode, values)
+                values.byteswap()
+            values.tofile(output)
+
+
+class MeshFile(object):
+    """
+    A file written by write_blocks, memory mapped. Every block is a
+    memoryview straight into the map, so opening even a huge file reads
+    only its header and a block is only read as it is used.
+
+    The views can't be used once the file is closed.
+    """
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = None
+        self.blocks = {}
+
+        magic, version, block_count = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError("{} is not a mesh file.".format(path))
+        if version != VERSION:
+            self.close()
+            raise ValueError("Unknown mesh file version {}.".format(version))
+
+        self.view = memoryview(self.map)
+        for i in range(block_count):
+            name, typecode, count, offset = BLOCK.unpack_from(
+                self.map, HEADER.size + i * BLOCK.size)
+            name = name.rstrip(b'\0').decode('ascii')
+            typecode = typecode.rstrip(b'\0').decode('ascii')
+            size = array(typecode).itemsize
+            block = self.view[offset:offset + count * size].cast(typecode)
+            if sys.byteorder == 'big':
+                block = array(typecode, block)
+                block.byteswap()
+            self.blocks[name] = block
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def __contains__(self, name):
+        return name in self.blocks
+
+    def __getitem__(self, name):
+        return self.blocks[name]
+
+    def close(self):
+        for block in self.blocks.values():
+            if isinstance(block, memoryview):
+                block.release()
+        self.blocks = {}
+        if self.view is not None:
+            self.view.release()
+            self.view = None
+        self.map.close()
+        self.file.close()
+
+    def get_points(self):
+        """
+        The points as a PointArray over the mapped coordinates
+        """
+        points = PointArray()
+        points.coordinates = self.blocks['points']
+        return points
+
+    def get_triangles(self):
+        """
+        The triangles as a TriangleArray over the mapped indices
+        """
+        triangles = TriangleArray(self.get_points())
+        triangles.indices = self.blocks['triangles']
+        return triangles
+
+
+def get_points(coordinates):
+    return [Point(coordinates[i], coordinates[i + 1])
+            for i in range(0, len(coordinates), 2)]
+
+
+def save_points(points, path):
+    write_blocks(path, [('points', 'd', PointArray(points).coordinates)])
+
+
+def load_points(path):
+    with MeshFile(path) as mesh_file:
+        return get_points(mesh_file['points'])
+
+
+def save_delaunay(delaunay, path, adjacency=True, index_size=None):
+    """
+    Saves the points and triangles of a triangulation, its constraints if
+    it has any, and with adjacency the opposite of every half-edge, so
+    loading needn't work them out
+    """
+    typecode = get_index_typecode(len(delaunay.points), index_size)
+    blocks = [
+        ('points', 'd', PointArray(delaunay.points).coordinates),
+        ('triangles', typecode, delaunay.mesh.triangles),
+        ('legalize', 'b', [delaunay.legalize]),
+    ]
+    if adjacency:
+        blocks.append(('halfedges', get_index_typecode(
+            len(delaunay.mesh.halfedges), index_size), delaunay.mesh.halfedges))
+    if delaunay.constraints:
+        blocks.append(('constraints', typecode, [
+            vertex for edge in sorted(delaunay.constraints) for vertex in edge]))
+    write_blocks(path, blocks)
+
+
+def load_delaunay(path):
+    """
+    Loads a triangulation saved by save_delaunay, without sweeping again
+    """
+    with MeshFile(path) as mesh_file:
+        points = get_points(mesh_file['points'])
+        mesh = Mesh(len(points))
+        mesh.triangles = to_array(mesh_file['triangles'], 'l')
+        if 'halfedges' in mesh_file:
+            mesh.halfedges = to_array(mesh_file['halfedges'], 'l')
+        else:
+            mesh.update_halfedges()
+        legalize = bool(mesh_file['legalize'][0])
+        constraints = list(mesh_file['constraints']) if 'constraints' in mesh_file else []
+    delaunay = Delaunay(points, legalize, mesh=mesh)
+    delaunay.constraints = set(zip(constraints[0::2], constraints[1::2]))
+    return delaunay
+
+
+def save_convex_hull(convex_hull, path):
+    """
+    Saves the hull points, in hull order
+    """
+    save_points(convex_hull.hull_points, path)
+
+
+def load_convex_hull(path):
+    """
+    The hull of the points saved by save_convex_hull, which is the hull that
+    was saved
+    """
+    return ConvexHull(load_points(path), algorithm='monotone_chain')
+
+
+def save_voronoi(diagram, path, index_size=None):
+    """
+    Saves the arrays of a Voronoi diagram, along with its points and
+    bounding box
+    """
+    index_count = max(len(diagram.vertices) // 2, len(diagram.points),
+                      len(diagram.cells))
+    typecode = get_index_typecode(index_count, index_size)
+    write_blocks(path, [
+        ('points', 'd', PointArray(diagram.points).coordinates),
+        ('box', 'd', diagram.bounding_box),
+        ('vertices', 'd', diagram.vertices),
+        ('edges', typecode, diagram.edges),
+        ('sites', typecode, diagram.edge_sites),
+        ('cells', typecode, diagram.cells),
+        ('offsets', typecode, diagram.cell_offsets),
+    ])
+
+
+def load_voronoi(path):
+    """
+    Loads a diagram saved by save_voronoi as a VoronoiDiagram
+    """
+    with MeshFile(path) as mesh_file:
+        diagram = VoronoiDiagram(get_points(mesh_file['points']),
+                                 tuple(mesh_file['box']))
+        diagram.vertices = to_array(mesh_file['vertices'], 'd')
+        diagram.edges = to_array(mesh_file['edges'], 'l')
+        diagram.edge_sites = to_array(mesh_file['sites'], 'l')
+        diagram.cells = to_array(mesh_file['cells'], 'l')
+        diagram.cell_offsets = to_array(mesh_file['offsets'], 'l')
+    return diagram
@@ -0,0 +1,83 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import TestCase
+
+from random import Random
+
+from geometry import LineSegment, Point
+from mesh_file import (load_convex_hull, load_delaunay, load_points, load_voronoi,
+                       save_convex_hull, save_delaunay, save_points, save_voronoi,
+                       MeshFile)
+from triangulation import Delaunay
+from voronoi import Voronoi
+
+
+class MeshFileTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'mesh.bin')
+        random = Random(0)
+        self.points = [Point(random.uniform(0, 10), random.uniform(0, 10))
+                       for _ in range(200)]
+        self.delaunay = Delaunay(self.points, legalize=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_delaunay(self):
+        for adjacency in (True, False):
+            for index_size in (4, 8):
+                save_delaunay(self.delaunay, self.path, adjacency, index_size)
+                loaded = load_delaunay(self.path)
+                self.assertTrue(loaded.legalize)
+                self.assertEqual(loaded.points, self.delaunay.points)
+                self.assertEqual(loaded.mesh.triangles, self.delaunay.mesh.triangles)
+                self.assertEqual(loaded.mesh.halfedges, self.delaunay.mesh.halfedges)
+                self.assertEqual(loaded.hull_next, self.delaunay.hull_next)
+                self.assertEqual(loaded.triangles, self.delaunay.triangles)
+
+    def test_delaunay_constraints(self):
+        self.delaunay.add_constraints([LineSegment(Point(1, 1), Point(9, 8))])
+        save_delaunay(self.delaunay, self.path)
+        loaded = load_delaunay(self.path)
+        self.assertTrue(loaded.constraints)
+        self.assertEqual(loaded.constraints, self.delaunay.constraints)
+
+    def test_lazy_blocks(self):
+        save_delaunay(self.delaunay, self.path, adjacency=False)
+        with MeshFile(self.path) as mesh_file:
+            self.assertNotIn('halfedges', mesh_file)
+            self.assertEqual(mesh_file['triangles'].format, 'i')
+            self.assertEqual(len(mesh_file['points']), 2 * len(self.delaunay.points))
+            triangles = mesh_file.get_triangles()
+            self.assertEqual(len(triangles), len(self.delaunay.triangles))
+            self.assertEqual(triangles[-1], self.delaunay.triangles[-1])
+
+    def test_points_and_convex_hull(self):
+        save_points(self.points, self.path)
+        self.assertEqual(load_points(self.path), self.points)
+        save_convex_hull(self.delaunay.convex_hull, self.path)
+        self.assertEqual(load_convex_hull(self.path).hull_points,
+                         self.delaunay.convex_hull.hull_points)
+
+    def test_voronoi(self):
+        voronoi = Voronoi(self.delaunay, (0, 0, 10, 10))
+        save_voronoi(voronoi, self.path)
+        loaded = load_voronoi(self.path)
+        self.assertEqual(loaded.bounding_box, voronoi.bounding_box)
+        self.assertEqual(loaded.vertices, voronoi.vertices)
+        self.assertEqual(loaded.edges, voronoi.edges)
+        for index in range(len(self.points)):
+            self.assertEqual(loaded.get_cell(index), voronoi.get_cell(index))
+
+    def test_not_a_mesh_file(self):
+        with open(self.path, 'wb') as output:
+            output.write(b'x,y\n' * 10)
+        with self.assertRaises(ValueError):
+            MeshFile(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
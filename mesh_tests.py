@@ -0,0 +1,79 @@
+import unittest
+from unittest import TestCase
+
+from geometry import Point
+from mesh import Mesh, next_halfedge, prev_halfedge
+from triangulation import Delaunay
+
+
+class MeshTest(TestCase):
+    def setUp(self):
+        # Two triangles sharing the edge 0, 2 and a vertex 4 left unused
+        self.mesh = Mesh(5)
+        first = self.mesh.add_triangle(0, 1, 2)
+        second = self.mesh.add_triangle(0, 2, 3)
+        self.mesh.link(first + 2, second)
+        self.mesh.update_vertex_edges()
+
+    def test_halfedge_steps(self):
+        self.assertEqual([next_halfedge(edge) for edge in range(6)],
+                         [1, 2, 0, 4, 5, 3])
+        self.assertEqual([prev_halfedge(edge) for edge in range(6)],
+                         [2, 0, 1, 5, 3, 4])
+
+    def test_triangles_and_edges(self):
+        self.assertEqual(self.mesh.triangle_count, 2)
+        self.assertEqual(self.mesh.get_triangle(1), (0, 2, 3))
+        self.assertEqual(self.mesh.get_edge(2), (2, 0))
+        self.assertEqual(self.mesh.get_edge(3), (0, 2))
+        self.assertEqual(self.mesh.get_adjacent_triangles(0), [-1, -1, 1])
+        self.assertEqual(self.mesh.get_adjacent_triangles(1), [0, -1, -1])
+
+    def test_vertex_star(self):
+        self.assertEqual(self.mesh.get_vertex_star(0), [1, 2, 3])
+        self.assertEqual(self.mesh.get_vertex_triangles(0), [0, 1])
+        self.assertEqual(self.mesh.get_vertex_star(2), [3, 0, 1])
+        self.assertEqual(self.mesh.get_vertex_star(1), [2, 0])
+        self.assertEqual(self.mesh.get_vertex_star(4), [])
+
+    def test_find_edge(self):
+        edge = self.mesh.find_edge(2, 3)
+        self.assertEqual(self.mesh.get_edge(edge), (2, 3))
+        self.assertEqual(self.mesh.find_edge(1, 3), -1)
+
+    def test_update_halfedges(self):
+        halfedges = self.mesh.halfedges
+        self.mesh.update_halfedges()
+        self.assertEqual(self.mesh.halfedges, halfedges)
+
+    def test_move_triangle(self):
+        # Drop triangle 0 and move triangle 1 into its place
+        self.mesh.link(3, -1)
+        self.mesh.move_triangle(1, 0)
+        self.mesh.pop_triangle()
+        self.assertEqual(self.mesh.triangle_count, 1)
+        self.assertEqual(self.mesh.get_triangle(0), (0, 2, 3))
+        self.assertEqual(list(self.mesh.halfedges), [-1, -1, -1])
+        self.assertEqual(self.mesh.vertex_edges[3], 2)
+
+    def test_interior_vertex_star(self):
+        points = [
+            Point(0, 0),
+            Point(2, 0),
+            Point(1, 1),
+            Point(0, 2),
+            Point(2, 2),
+        ]
+        delaunay = Delaunay(points, legalize=True)
+        mesh = delaunay.mesh
+        # Point(1, 1) is the only interior point
+        center = delaunay.points.index(Point(1, 1))
+        star = mesh.get_vertex_star(center)
+        self.assertEqual(sorted(star), [0, 1, 3, 4])
+        self.assertEqual(len(mesh.get_outgoing_edges(center)), 4)
+        for edge in mesh.get_outgoing_edges(center):
+            self.assertEqual(mesh.halfedges[mesh.halfedges[edge]], edge)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+from array import array
+from math import log
+from random import Random
+
+# Coordinates are scaled onto a grid of 2 ** BITS cells a side
+BITS = 16
+SIDE = 1 << BITS
+
+
+def get_grid_coordinates(coordinates):
+    """
+    Scales the x, y pairs onto integer grid cells over their bounding box,
+    returning the column and row of every pair
+    """
+    xs = coordinates[0::2]
+    ys = coordinates[1::2]
+    if not xs:
+        return [], []
+    min_x = min(xs)
+    min_y = min(ys)
+    # One scale for both axes, so the cells are square
+    size = max(max(xs) - min_x, max(ys) - min_y)
+    scale = (SIDE - 1) / size if size > 0 else 0.0
+    return ([int((x - min_x) * scale) for x in xs],
+            [int((y - min_y) * scale) for y in ys])
+
+
+# The bits of a byte spread out to every other bit of 16
+spread_bits = array('l', [
+    sum(((byte >> bit) & 1) << (2 * bit) for bit in range(8)) for byte in range(256)])
+
+
+def morton_keys(coordinates):
+    """
+    The position of every x, y pair along the Z shaped Morton curve,
+    interleaving the bits of its grid column and row
+    """
+    columns, rows = get_grid_coordinates(coordinates)
+    spread = spread_bits
+    return array('l', [
+        spread[column & 255] | spread[column >> 8] << 16 |
+        (spread[row & 255] | spread[row >> 8] << 16) << 1
+        for column, row in zip(columns, rows)])
+
+
+def get_hilbert_tables():
+    """
+    Tables walking the Hilbert curve 4 bits of column and row at a time.
+    The curve's orientation within a cell is a state: whether the cell's
+    coordinates are swapped and whether they are flipped. For each state and
+    16 x 16 block, the tables give the 8 bits of curve position within the
+    block and the state the cell picked in the block is in.
+    """
+    positions = array('l', [0]) * (4 * 256)
+    states = array('l', [0]) * (4 * 256)
+    for state in range(4):
+        swap = state & 1
+        flip = state >> 1
+        for block in range(256):
+            x = block >> 4
+            y = block & 15
+            if flip:
+                x ^= 15
+                y ^= 15
+            if swap:
+                x, y = y, x
+            position = 0
+            new_state = state
+            step = 8
+            while step:
+                right = 1 if x & step else 0
+                up = 1 if y & step else 0
+                position += step * step * ((3 * right) ^ up)
+                if not up:
+                    if right:
+                        # Flip the rest of the bits
+                        x ^= step - 1
+                        y ^= step - 1
+                        new_state ^= 2
+                    x, y = y, x
+                    new_state ^= 1
+                step >>= 1
+            positions[state * 256 + block] = position
+            states[state * 256 + block] = new_state
+    return positions, states
+
+
+hilbert_positions, hilbert_states = get_hilbert_tables()
+
+
+def hilbert_keys(coordinates):
+    """
+    The position of every x, y pair along the Hilbert curve, which unlike
+    the Morton curve never jumps between cells that aren't next to each
+    other
+    """
+    columns, rows = get_grid_coordinates(coordinates)
+    positions = hilbert_positions
+    states = hilbert_states
+    keys = array('l')
+    for column, row in zip(columns, rows):
+        key = 0
+        state = 0
+        for shift in (12, 8, 4, 0):
+            entry = (state << 8) | ((column >> shift) & 15) << 4 | (row >> shift) & 15
+            key = key << 8 | positions[entry]
+            state = states[entry]
+        keys.append(key)
+    return keys
+
+
+def curve_order(coordinates, curve='hilbert'):
+    """
+    The indices of the x, y pairs of coordinates, a flat array, sorted along
+    a curve, 'hilbert' or 'morton'. Points near each other in the order are
+    near each other in the plane.
+    """
+    if curve == 'hilbert':
+        keys = hilbert_keys(coordinates)
+    elif curve == 'morton':
+        keys = morton_keys(coordinates)
+    else:
+        raise ValueError("Unknown curve {}.".format(curve))
+    order = list(range(len(keys)))
+    order.sort(key=keys.__getitem__)
+    return array('l', order)
+
+
+def brio_order(coordinates, curve='hilbert', seed=0):
+    """
+    Biased randomized insertion order, by Amenta, Choi and Rote. Every pair
+    is put in the last round with probability 1/2, in the one before with
+    1/4 and so on, and each round is sorted along the curve. The random
+    rounds keep the expected cost of randomized insertion while the curve
+    keeps each round's walks short.
+    """
+    if curve == 'hilbert':
+        keys = hilbert_keys(coordinates)
+    elif curve == 'morton':
+        keys = morton_keys(coordinates)
+    else:
+        raise ValueError("Unknown curve {}.".format(curve))
+    random = Random(seed).random
+    count = len(keys)
+    # Round 0 is the last, with about half of the pairs
+    last = max(0, int(log(count, 2))) if count else 0
+    rounds = [min(last, int(-log(1.0 - random(), 2))) for _ in range(count)]
+    order = list(range(count))
+    order.sort(key=lambda index: ((last - rounds[index]) << (2 * BITS)) | keys[index])
+    return array('l', order)
+
+
+def insertion_order(coordinates, strategy):
+    """
+    The order to insert the x, y pairs in by strategy: 'hilbert' or 'morton'
+    for curve_order, 'brio' for brio_order along the Hilbert curve, or
+    'sorted' to keep them as they are. Inserting points into a
+    triangulation along a curve keeps every walk to the next point short.
+    """
+    if strategy == 'sorted':
+        return array('l', range(len(coordinates) // 2))
+    if strategy == 'brio':
+        return brio_order(coordinates)
+    if strategy in ('hilbert', 'morton'):
+        return curve_order(coordinates, strategy)
+    raise ValueError("Unknown insertion order {}.".format(strategy))
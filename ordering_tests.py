@@ -0,0 +1,66 @@
+import unittest
+from array import array
+from random import Random
+from unittest import TestCase
+
+from ordering import (hilbert_keys, morton_keys, curve_order, brio_order,
+                      insertion_order)
+
+
+def get_grid(side):
+    """
+    Every point of a side x side grid, as x, y pairs
+    """
+    return array('d', [value for row in range(side) for column in range(side)
+                       for value in (column, row)])
+
+
+class OrderingTest(TestCase):
+    def test_morton_keys(self):
+        coordinates = array('d', [0, 0, 1, 0, 0, 1, 1, 1])
+        self.assertEqual(list(morton_keys(coordinates)),
+                         [0, 0x55555555, 0xaaaaaaaa, 0xffffffff])
+
+    def test_hilbert_curve_is_continuous(self):
+        side = 16
+        coordinates = get_grid(side)
+        keys = hilbert_keys(coordinates)
+        order = curve_order(coordinates, 'hilbert')
+        self.assertEqual(len(set(keys)), side * side)
+        # Scaled onto the curve's grid each point is in a block of its own,
+        # and each step along the curve is to a neighbor
+        for index, next_index in zip(order, order[1:]):
+            dx = abs(coordinates[2 * index] - coordinates[2 * next_index])
+            dy = abs(coordinates[2 * index + 1] - coordinates[2 * next_index + 1])
+            self.assertEqual(dx + dy, 1)
+        self.assertEqual(coordinates[2 * order[0]:2 * order[0] + 2], array('d', [0, 0]))
+        self.assertEqual(coordinates[2 * order[-1]:2 * order[-1] + 2],
+                         array('d', [side - 1, 0]))
+
+    def test_brio_order(self):
+        random = Random(1)
+        coordinates = array('d', [random.random() for _ in range(2000)])
+        order = brio_order(coordinates, seed=3)
+        self.assertEqual(sorted(order), list(range(1000)))
+        self.assertEqual(order, brio_order(coordinates, seed=3))
+        self.assertNotEqual(order, brio_order(coordinates, seed=4))
+        # The last round, about half of the points, is in curve order
+        keys = hilbert_keys(coordinates)
+        last = [keys[index] for index in order[600:]]
+        self.assertEqual(last, sorted(last))
+
+    def test_insertion_order(self):
+        coordinates = get_grid(4)
+        self.assertEqual(list(insertion_order(coordinates, 'sorted')), list(range(16)))
+        for strategy in ('hilbert', 'morton', 'brio'):
+            self.assertEqual(sorted(insertion_order(coordinates, strategy)),
+                             list(range(16)))
+        self.assertEqual(len(insertion_order(array('d'), 'hilbert')), 0)
+        with self.assertRaises(ValueError):
+            insertion_order(coordinates, 'bogus')
+        with self.assertRaises(ValueError):
+            curve_order(coordinates, 'bogus')
+
+
+if __name__ == '__main__':
+    unittest.main()
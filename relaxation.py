@@ -0,0 +1,78 @@
+from math import sqrt
+from timeit import default_timer
+
+from geometry import Point
+from triangulation import Delaunay
+from voronoi import Voronoi
+
+
+class LloydRelaxation(object):
+    """
+    Lloyd relaxation of points in a bounding box: moving every point to the
+    centroid of its Voronoi cell, over and over, spreads the points out into
+    cells of about equal size. The points move only a little each
+    iteration, so the triangulation is carried over and repaired by
+    Delaunay.move rather than built again, unless move can't repair it.
+
+    history holds a dict for every iteration run, with the seconds it took,
+    the furthest any point moved as shift, and whether the triangulation had
+    to be built again as rebuilt. Given a Stats object as stats, every
+    iteration is also timed into it as 'relax' and the triangulations count
+    into it as usual.
+    """
+    def __init__(self, points, bounding_box, tolerance=1e-6, max_iterations=100,
+                 stats=None):
+        self.bounding_box = bounding_box
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        self.stats = stats
+        self.delaunay = Delaunay(points, legalize=True, stats=stats)
+        # The index in delaunay.points of each given point, or of the point
+        # it duplicates
+        self.point_indices = list(self.delaunay.point_indices)
+        self.history = []
+
+    def step(self):
+        """
+        Moves every point to the centroid of its cell once. Returns the
+        furthest any point moved.
+        """
+        start = default_timer()
+        delaunay = self.delaunay
+        centroids = Voronoi(delaunay, self.bounding_box).get_centroids()
+        points = [Point(centroids[i], centroids[i + 1])
+                  for i in range(0, len(centroids), 2)]
+        shift = 0.0
+        for old, new in zip(delaunay.points, points):
+            shift = max(shift, (old.x - new.x) ** 2 + (old.y - new.y) ** 2)
+        shift = sqrt(shift)
+
+        rebuilt = not delaunay.move(points)
+        if rebuilt:
+            self.delaunay = Delaunay(points, legalize=True, stats=self.stats)
+            # Points moved onto each other are merged
+            new_indices = self.delaunay.point_indices
+            self.point_indices = [new_indices[index] for index in self.point_indices]
+
+        seconds = default_timer() - start
+        self.history.append({'seconds': seconds, 'shift': shift, 'rebuilt': rebuilt})
+        if self.stats is not None:
+            self.stats.add_time('relax', seconds)
+        return shift
+
+    def relax(self):
+        """
+        Runs iterations until no point moves further than tolerance, or for
+        max_iterations. Returns whether the points settled.
+        """
+        for _ in range(self.max_iterations):
+            if self.step() <= self.tolerance:
+                return True
+        return False
+
+    def get_points(self):
+        """
+        The relaxed points, in the order they were given
+        """
+        points = self.delaunay.points
+        return [points[index] for index in self.point_indices]
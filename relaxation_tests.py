@@ -0,0 +1,57 @@
+import unittest
+from random import Random
+from unittest import TestCase
+
+from geometry import Point
+from relaxation import LloydRelaxation
+from stats import Stats
+from voronoi import Voronoi
+
+
+class LloydRelaxationTest(TestCase):
+    def setUp(self):
+        random = Random(2)
+        self.points = [Point(random.random(), random.random()) for _ in range(60)]
+
+    def test_relax(self):
+        relaxation = LloydRelaxation(self.points, (0, 0, 1, 1), tolerance=1e-3,
+                                     max_iterations=200)
+        self.assertTrue(relaxation.relax())
+        self.assertLessEqual(relaxation.history[-1]['shift'], 1e-3)
+        self.assertGreater(relaxation.history[0]['shift'],
+                           relaxation.history[-1]['shift'])
+        for iteration in relaxation.history:
+            self.assertGreaterEqual(iteration['seconds'], 0)
+            self.assertFalse(iteration['rebuilt'])
+
+        # Every point ends up about at the centroid of its cell
+        points = relaxation.get_points()
+        self.assertEqual(len(points), len(self.points))
+        voronoi = Voronoi(relaxation.delaunay, (0, 0, 1, 1))
+        centroids = voronoi.get_centroids()
+        for index, point in enumerate(relaxation.delaunay.points):
+            self.assertLess(point.distance(Point(centroids[2 * index],
+                                                 centroids[2 * index + 1])), 1e-3)
+
+    def test_max_iterations(self):
+        stats = Stats()
+        relaxation = LloydRelaxation(self.points, (0, 0, 1, 1), tolerance=0,
+                                     max_iterations=3, stats=stats)
+        self.assertFalse(relaxation.relax())
+        self.assertEqual(len(relaxation.history), 3)
+        self.assertAlmostEqual(stats.seconds['relax'],
+                               sum(iteration['seconds']
+                                   for iteration in relaxation.history))
+
+    def test_duplicates_keep_their_order(self):
+        points = self.points + [self.points[5]]
+        relaxation = LloydRelaxation(points, (0, 0, 1, 1), max_iterations=2)
+        relaxation.relax()
+        relaxed = relaxation.get_points()
+        self.assertEqual(len(relaxed), len(points))
+        self.assertEqual(relaxed[5], relaxed[-1])
+        self.assertLess(relaxed[5].distance(points[5]), 0.2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+from timeit import default_timer
+
+
+class Stats(object):
+    """
+    Counts of predicate calls, flips, hull rebuilds, triangles and objects
+    made, and the seconds spent in each phase, all by name. The callback, if
+    given, is called with the stats and the phase's name every time a phase
+    ends, so they can be exported as they come in.
+
+    Delaunay and ConvexHull gather stats only when given one, and then count
+    in bulk per phase or per point rather than per predicate call.
+    """
+    def __init__(self, callback=None):
+        self.counts = {}
+        self.seconds = {}
+        self.callback = callback
+
+    def count(self, name, amount=1):
+        self.counts[name] = self.counts.get(name, 0) + amount
+
+    def add_time(self, name, seconds):
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+        if self.callback is not None:
+            self.callback(self, name)
+
+    def as_dict(self):
+        return {'counts': dict(self.counts), 'seconds': dict(self.seconds)}
+
+
+class Phase(object):
+    """
+    Times its block into stats as name
+    """
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        self.start = default_timer()
+
+    def __exit__(self, *exception):
+        self.stats.add_time(self.name, default_timer() - self.start)
+
+
+class NoPhase(object):
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exception):
+        pass
+
+
+no_phase = NoPhase()
+
+
+def timed(stats, name):
+    """
+    A context manager timing its block as the phase name in stats, or doing
+    nothing if stats is None
+    """
+    if stats is None:
+        return no_phase
+    return Phase(stats, name)
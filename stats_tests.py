@@ -0,0 +1,114 @@
+import unittest
+from unittest import TestCase, mock
+
+from random import Random
+
+from convex_hull import ConvexHull
+from divide_and_conquer import DivideAndConquer
+from geometry import Point, in_circle, orientation
+from stats import Stats, timed
+from triangulation import Delaunay
+
+
+class StatsTest(TestCase):
+    def setUp(self):
+        random = Random(2)
+        self.points = [Point(random.random(), random.random()) for _ in range(300)]
+
+    def test_phases(self):
+        phases = []
+        stats = Stats(callback=lambda stats, phase: phases.append(phase))
+        stats.count('flips')
+        stats.count('flips', 2)
+        with timed(stats, 'build'):
+            pass
+        with timed(None, 'build'):
+            pass
+        self.assertEqual(phases, ['build'])
+        self.assertEqual(stats.as_dict(), {'counts': {'flips': 3},
+                                           'seconds': {'build': stats.seconds['build']}})
+
+    def test_delaunay(self):
+        stats = Stats()
+        # Triangle objects call the orientation of geometry
+        with mock.patch('triangulation.in_circle', wraps=in_circle) as in_circle_mock, \
+                mock.patch('triangulation.orientation', wraps=orientation) as orientation_mock, \
+                mock.patch('convex_hull.orientation', wraps=orientation) as hull_mock, \
+                mock.patch('geometry.orientation', wraps=orientation) as triangle_mock:
+            delaunay = Delaunay(self.points, legalize=True, stats=stats)
+        counts = stats.counts
+        self.assertEqual(counts['in_circle'], in_circle_mock.call_count)
+        self.assertEqual(counts['orientation'],
+                         orientation_mock.call_count + hull_mock.call_count +
+                         triangle_mock.call_count)
+        self.assertEqual(counts['triangles_created'], delaunay.mesh.triangle_count)
+        self.assertGreater(counts['flips'], 0)
+        self.assertEqual(counts['hull_builds'], 1)
+        # Only the first triangle is made as a Triangle object to test it
+        self.assertEqual(counts['triangle_objects'], 1)
+        self.assertEqual(set(stats.seconds),
+                         {'sort', 'build_initial', 'triangulate', 'hull_build'})
+
+        delaunay.triangles
+        self.assertEqual(counts['triangle_objects'], 1 + delaunay.mesh.triangle_count)
+
+    def test_insertion_order(self):
+        stats = Stats()
+        with mock.patch('triangulation.in_circle', wraps=in_circle) as in_circle_mock, \
+                mock.patch('triangulation.orientation', wraps=orientation) as orientation_mock, \
+                mock.patch('convex_hull.orientation', wraps=orientation) as hull_mock, \
+                mock.patch('geometry.orientation', wraps=orientation) as triangle_mock:
+            delaunay = Delaunay(self.points, legalize=True, stats=stats,
+                                insertion_order='hilbert')
+        counts = stats.counts
+        self.assertEqual(counts['in_circle'], in_circle_mock.call_count)
+        self.assertEqual(counts['orientation'],
+                         orientation_mock.call_count + hull_mock.call_count +
+                         triangle_mock.call_count)
+        self.assertEqual(counts['triangles_created'], delaunay.mesh.triangle_count)
+        self.assertGreater(counts['walk_steps'], 0)
+        self.assertIn('insert', stats.seconds)
+
+    def test_collinear_start(self):
+        stats = Stats()
+        points = [Point(i, i) for i in range(5)] + [Point(5, 0)]
+        Delaunay(points, legalize=True, stats=stats)
+        self.assertIn('get_collinear_triangles', stats.seconds)
+        self.assertEqual(stats.counts['triangles_created'], 4)
+
+    def test_merge(self):
+        stats = Stats()
+        DivideAndConquer(self.points, strips=3, processes=1, stats=stats)
+        # Only the merges are counted
+        self.assertGreater(stats.counts['in_circle'], 0)
+        self.assertNotIn('triangles_created', stats.counts)
+        self.assertEqual(stats.counts['hull_builds'], 1)
+        self.assertIn('triangulate', stats.seconds)
+
+    def test_convex_hull_orientations(self):
+        for algorithm in ConvexHull.algorithms:
+            for incremental in (False, True):
+                stats = Stats()
+                with mock.patch('convex_hull.orientation', wraps=orientation) as hull_mock, \
+                        mock.patch('geometry.orientation', wraps=orientation) as triangle_mock:
+                    hull = ConvexHull(self.points[:30], algorithm, incremental, stats=stats)
+                    for point in self.points[30:60]:
+                        hull.add_point(point)
+                self.assertEqual(stats.counts['orientation'],
+                                 hull_mock.call_count + triangle_mock.call_count)
+
+    def test_convex_hull_rebuilds(self):
+        stats = Stats()
+        hull = ConvexHull(self.points[:10], algorithm='quickhull', stats=stats)
+        for point in self.points[10:20]:
+            hull.add_point(point)
+        self.assertEqual(stats.counts['hull_builds'], 11)
+
+    def test_disabled(self):
+        delaunay = Delaunay(self.points, legalize=True)
+        self.assertIsNone(delaunay.stats)
+        self.assertIsNone(delaunay.convex_hull.stats)
+
+
+if __name__ == '__main__':
+    unittest.main()
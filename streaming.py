@@ -0,0 +1,278 @@
+from array import array
+from heapq import heapify, heappush, heappop, merge
+from tempfile import TemporaryFile
+
+from geometry import circumcenter, orientation, Point, Triangle
+from mesh import next_halfedge, prev_halfedge
+from triangulation import Delaunay
+
+
+def spill_chunk(coordinates, directory=None):
+    """
+    Writes sorted x, y pairs to a temporary file, returned ready to be read
+    back
+    """
+    chunk = TemporaryFile(dir=directory)
+    array('d', [value for pair in coordinates for value in pair]).tofile(chunk)
+    chunk.seek(0)
+    return chunk
+
+
+def read_chunk(chunk, buffer_size=65536):
+    """
+    Reads x, y pairs back from a spilled chunk, buffer_size values at a time
+    """
+    while True:
+        values = array('d')
+        try:
+            values.fromfile(chunk, buffer_size)
+        except EOFError:
+            # The last, short read still fills values
+            pass
+        if not values:
+            return
+        for i in range(0, len(values), 2):
+            yield values[i], values[i + 1]
+
+
+def sort_points_external(points, chunk_size=1000000, directory=None):
+    """
+    Sorts points on x, then y, and removes duplicates like sort_points, but
+    holds at most chunk_size of them in memory. Each sorted chunk is spilled
+    to a temporary file in directory and the chunks are merged as the
+    sorted points are read. Yields new Point objects.
+    """
+    chunks = []
+    try:
+        coordinates = []
+        for point in points:
+            coordinates.append((point.x, point.y))
+            if len(coordinates) == chunk_size:
+                coordinates.sort()
+                chunks.append(spill_chunk(coordinates, directory))
+                coordinates = []
+        coordinates.sort()
+
+        if chunks:
+            if coordinates:
+                chunks.append(spill_chunk(coordinates, directory))
+            coordinates = merge(*[read_chunk(chunk) for chunk in chunks])
+
+        previous = None
+        for pair in coordinates:
+            if pair != previous:
+                yield Point(*pair)
+                previous = pair
+    finally:
+        for chunk in chunks:
+            chunk.close()
+
+
+class StreamingDelaunay(Delaunay):
+    """
+    Sweeps points that are already sorted on x, then y, as they are read,
+    without ever holding all of them. Iterating over it runs the sweep and
+    yields each triangle as a Triangle object as soon as no later point can
+    change it, so only the triangles around the sweep line are kept. Unsorted
+    points can be sorted with sort_points_external first.
+
+    With legalize set a later point only changes a triangle if it is inside
+    the triangle's circumcircle, so a triangle is done once the sweep line is
+    right of its circumcircle. Without it triangles never change and are
+    done as soon as they are made.
+
+    The queries of Delaunay need the whole triangulation and can't be used.
+    """
+    def __init__(self, points, legalize=True, batch_size=64,
+                 compact_size=100000):
+        self.stream = iter(points)
+        # Triangles are checked for being done every batch_size points
+        self.batch_size = batch_size
+        # The triangles done with are dropped from the mesh once there are
+        # at least compact_size of them and as many as triangles left
+        self.compact_size = compact_size
+        # Whether each triangle of the mesh has been yielded
+        self.done = array('b')
+        self.done_count = 0
+        # The right end of each triangle's circumcircle, and a queue of the
+        # triangles by it as (x, triangle)
+        self.triangle_bounds = array('d')
+        self.bounds = []
+        super(StreamingDelaunay, self).__init__([], legalize)
+        # The triangles flipped since they were last checked
+        self.changed_triangles = set()
+        # Only the points of triangles still in the mesh and on the boundary
+        # are kept, by their index in the sorted stream
+        self.points = {}
+
+    def build_initial(self):
+        # Nothing is read until the triangulation is iterated over
+        pass
+
+    def triangulate(self):
+        pass
+
+    def __iter__(self):
+        points = self.points
+        mesh = self.mesh
+        previous = None
+        for point in self.stream:
+            if previous is not None:
+                if (point.x, point.y) < (previous.x, previous.y):
+                    raise ValueError("The points must be sorted on x, then y.")
+                if point == previous:
+                    continue
+            previous = point
+
+            index = self.swept
+            points[index] = point
+            self.swept += 1
+            if not self.hull_next:
+                if not self.start(index):
+                    continue
+            else:
+                self.add_sweep_point(index)
+            if self.swept % self.batch_size == 0:
+                for triangle in self.get_done(point.x):
+                    yield triangle
+
+        if not self.hull_next:
+            raise ValueError("At least 3 unique points not on one line are "
+                             "needed to form a triangulation.")
+        done = self.done
+        for triangle in range(mesh.triangle_count):
+            if triangle >= len(done) or not done[triangle]:
+                yield self.get_triangle(triangle)
+
+    def start(self, index):
+        """
+        Starts the triangulation with the point at index if it is off the
+        line of the points before it, which are all there are so far.
+        Returns whether it did.
+        """
+        points = self.points
+        if index < 2 or orientation(points[0], points[1], points[index]) == 0:
+            return False
+
+        self.build_fan(index, list(range(index)))
+        return True
+
+    def add_bounds(self):
+        """
+        Queues the triangles made or flipped since the last time by the
+        right end of their circumcircle, padded well beyond its rounding
+        error
+        """
+        mesh = self.mesh
+        points = self.points
+        triangles = self.changed_triangles
+        added = mesh.triangle_count - len(self.done)
+        triangles.update(range(len(self.done), mesh.triangle_count))
+        self.done.extend(array('b', [0]) * added)
+        self.triangle_bounds.extend(array('d', [0.0]) * added)
+        for triangle in triangles:
+            if not self.legalize:
+                bound = float('-inf')
+            else:
+                a, b, c = mesh.get_triangle(triangle)
+                center = circumcenter(points[a], points[b], points[c])
+                if center is None:
+                    continue
+                radius = center.distance(points[a])
+                bound = center.x + radius + (abs(center.x) + radius) * 1e-6
+            self.triangle_bounds[triangle] = bound
+            heappush(self.bounds, (bound, triangle))
+        triangles.clear()
+
+    def get_done(self, x):
+        """
+        Yields the triangles the sweep line at x has passed, then drops them
+        from the mesh if enough have piled up
+        """
+        self.add_bounds()
+        bounds = self.bounds
+        while bounds and bounds[0][0] <= x:
+            bound, triangle = heappop(bounds)
+            if self.done[triangle] or bound != self.triangle_bounds[triangle]:
+                # Flipped since it was queued, and queued again
+                continue
+            self.done[triangle] = 1
+            self.done_count += 1
+            yield self.get_triangle(triangle)
+
+        if (self.done_count >= self.compact_size and
+                2 * self.done_count >= self.mesh.triangle_count):
+            self.compact()
+
+    def get_triangle(self, triangle):
+        points = self.points
+        return Triangle(*[points[vertex] for vertex in self.mesh.get_triangle(triangle)])
+
+    def flip_edge(self, edge):
+        # A triangle dropped from the mesh leaves -1 behind on its neighbors'
+        # edges, which flip_edge takes for the boundary. Entries it wrongly
+        # points at the flipped half-edges are put back.
+        triangles = self.mesh.triangles
+        halfedges = self.mesh.halfedges
+        opposite = halfedges[edge]
+        if (halfedges[prev_halfedge(edge)] != -1 and
+                halfedges[prev_halfedge(opposite)] != -1):
+            super(StreamingDelaunay, self).flip_edge(edge)
+            return
+
+        hull_edges = self.hull_edges
+        vertices = (triangles[edge], triangles[next_halfedge(edge)])
+        saved = [hull_edges.get(vertex) for vertex in vertices]
+        super(StreamingDelaunay, self).flip_edge(edge)
+        for vertex, old_edge in zip(vertices, saved):
+            new_edge = hull_edges.get(vertex)
+            if new_edge != old_edge and (
+                    vertex not in self.hull_next or
+                    triangles[next_halfedge(new_edge)] != vertex or
+                    triangles[new_edge] != self.hull_next[vertex]):
+                if old_edge is None:
+                    del hull_edges[vertex]
+                else:
+                    hull_edges[vertex] = old_edge
+
+    def compact(self):
+        """
+        Drops the triangles already yielded from the mesh, along with the
+        points no longer needed by the rest. Their neighbors are left with
+        -1 across from them, which is safe as no flip can reach them.
+        """
+        mesh = self.mesh
+        done = self.done
+        kept = [triangle for triangle in range(mesh.triangle_count)
+                if not done[triangle]]
+        new_index = array('l', [-1]) * mesh.triangle_count
+        for new, old in enumerate(kept):
+            new_index[old] = new
+
+        def move(edge):
+            if edge == -1 or done[edge // 3]:
+                return -1
+            return 3 * new_index[edge // 3] + edge % 3
+
+        triangles = array('l')
+        halfedges = array('l')
+        for old in kept:
+            for edge in range(3 * old, 3 * old + 3):
+                triangles.append(mesh.triangles[edge])
+                halfedges.append(move(mesh.halfedges[edge]))
+        for vertex, edge in self.hull_edges.items():
+            self.hull_edges[vertex] = move(edge)
+        self.bounds = [(bound, new_index[triangle]) for bound, triangle in self.bounds
+                       if not done[triangle] and bound == self.triangle_bounds[triangle]]
+        heapify(self.bounds)
+        self.triangle_bounds = array('d', [self.triangle_bounds[old] for old in kept])
+        mesh.triangles = triangles
+        mesh.halfedges = halfedges
+        self.done = array('b', [0]) * len(kept)
+        self.done_count = 0
+
+        needed = set(triangles)
+        needed.update(self.hull_next)
+        for vertex in list(self.points):
+            if vertex not in needed:
+                del self.points[vertex]
@@ -0,0 +1,58 @@
+import unittest
+from unittest import TestCase
+
+from random import Random
+
+from geometry import sort_points, Point
+from streaming import sort_points_external, StreamingDelaunay
+from triangulation import Delaunay
+
+
+def get_keys(triangles):
+    return sorted(tuple(sorted((point.x, point.y) for point in
+                               (triangle.point_1, triangle.point_2, triangle.point_3)))
+                  for triangle in triangles)
+
+
+class StreamingTest(TestCase):
+    def test_sort_points_external(self):
+        random = Random(0)
+        points = [Point(random.randint(0, 20), random.randint(0, 20))
+                  for _ in range(300)]
+        self.assertEqual(list(sort_points_external(points, chunk_size=7)),
+                         sort_points(points))
+        self.assertEqual(list(sort_points_external(points)), sort_points(points))
+
+    def test_same_triangles_as_delaunay(self):
+        random = Random(1)
+        for points in ([Point(random.random(), random.random()) for _ in range(500)],
+                       [Point(x, y) for x in range(12) for y in range(12)]):
+            for legalize in (True, False):
+                expected = Delaunay(points, legalize=legalize).triangles
+                streamed = StreamingDelaunay(sort_points(points), legalize,
+                                             batch_size=3, compact_size=10)
+                self.assertEqual(get_keys(streamed), get_keys(expected))
+
+    def test_only_keeps_the_front(self):
+        random = Random(2)
+        points = sort_points_external(
+            Point(random.random(), random.random()) for _ in range(3000))
+        delaunay = StreamingDelaunay(points, compact_size=100)
+        count = 0
+        largest = 0
+        for _ in delaunay:
+            count += 1
+            largest = max(largest, delaunay.mesh.triangle_count)
+        self.assertGreater(count, 5000)
+        self.assertLess(largest, count / 4)
+        self.assertLess(len(delaunay.points), 3000 / 4)
+
+    def test_bad_streams(self):
+        with self.assertRaises(ValueError):
+            list(StreamingDelaunay([Point(1, 0), Point(0, 0), Point(0, 1)]))
+        with self.assertRaises(ValueError):
+            list(StreamingDelaunay([Point(0, 0), Point(1, 1), Point(2, 2)]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,29 +1,198 @@
-from copy import copy
+from array import array
+from collections import deque
+from heapq import heappush, heappop
+from math import sqrt
+from random import Random
 
 from convex_hull import ConvexHull
-from geometry import sort_points, Point, Triangle
+from geometry import (sort_coordinates, get_coordinates, orientation, in_circle,
+                      crossing_point, Triangle)
+from mesh import Mesh, next_halfedge, prev_halfedge
+from ordering import insertion_order
+from stats import timed
 
 
-def find_difference(old_points, new_points):
+def get_squared_distance(point_1, point_2):
+    dx = point_1.x - point_2.x
+    dy = point_1.y - point_2.y
+    return dx * dx + dy * dy
+
+
+def get_edge_key(start, end):
     """
-    Determines what elements in old_points are missing in new_points
-    Note: Does not include new elements from new_points
+    The vertices of an edge in the order it is kept in constraints
     """
-    return set(old_points) - set(new_points)
+    return (start, end) if start < end else (end, start)
+
 
 
 class Delaunay(object):
     """
-    Creates the triangulation using a sweep line approach.
+    Creates the triangulation using a sweep line approach. With legalize set,
+    every edge failing the empty circumcircle test is flipped as the sweep
+    goes, which gives a Delaunay triangulation.
+
+    An existing Mesh of the points, such as one loaded from a file, can be
+    given instead of sweeping. The points must then already be sorted and
+    unique, as they are in self.points.
+
+    With insertion_order set the points are instead inserted one at a time,
+    each found by walking from the last, in the order given by
+    ordering.insertion_order: 'hilbert', 'morton', 'brio' or 'sorted'.
+    self.points is then in that order.
+
+    Given a Stats object as stats, the build counts its predicate calls,
+    flips, triangles and objects made and times each of its phases.
     """
-    def __init__(self, points):
-        self.points = sort_points(points)
-        self.triangles = []
+    def __init__(self, points, legalize=False, mesh=None, stats=None,
+                 insertion_order=None):
+        self.stats = stats
+        # input_indices holds the index in the given points of each of
+        # self.points, and point_indices the index in self.points of each
+        # given point, or of the point it duplicates
+        if mesh is None:
+            points = list(points)
+            with timed(stats, 'sort'):
+                _, self.input_indices, self.point_indices = sort_coordinates(
+                    get_coordinates(points))
+                self.points = [points[index] for index in self.input_indices]
+            if insertion_order is not None:
+                with timed(stats, 'order'):
+                    self.reorder(insertion_order)
+        else:
+            self.points = list(points)
+            self.input_indices = None
+            self.point_indices = None
         self.convex_hull = None
         self.degenerate = False
+        self.legalize = legalize
+
+        # The triangles are kept as half-edges over indices into self.points,
+        # self.triangles is only built from them when asked for.
+        self.mesh = Mesh(len(self.points))
+        self._triangles = None
+        # The boundary of the triangulation walked clockwise. Unlike the
+        # convex hull it keeps every collinear point on the boundary.
+        # hull_edges maps each boundary point to the half-edge of its edge to
+        # the next boundary point, which runs the other way around.
+        self.hull_next = {}
+        self.hull_prev = {}
+        self.hull_edges = {}
+        # Number of points from self.points swept into the triangulation
+        self.swept = 0
+        # While inserting or removing a point, the triangles changed so far
+        self.changed_triangles = None
+        # The edges that are never flipped, as pairs of vertices from
+        # get_edge_key
+        self.constraints = set()
+
+        # Point location starts its walks from a coarse grid of points, built
+        # on the first query, or from the triangle found last
+        self.grid = None
+        self.grid_box = None
+        self.grid_size = 0
+        self.last_triangle = 0
+        self.walk_random = Random(0)
+
+        if mesh is None and insertion_order is not None:
+            with timed(stats, 'insert'):
+                self.insert_all()
+        elif mesh is None:
+            with timed(stats, 'build_initial'):
+                self.build_initial()
+            with timed(stats, 'triangulate'):
+                self.triangulate()
+        else:
+            self.set_mesh(mesh)
+
+    @property
+    def triangles(self):
+        """
+        The triangulation as Triangle objects, built from the mesh on first
+        use.
+        """
+        if self._triangles is None:
+            points = self.points
+            self._triangles = [
+                Triangle(*[points[vertex] for vertex in self.mesh.get_triangle(triangle)])
+                for triangle in range(self.mesh.triangle_count)
+            ]
+            if self.stats is not None:
+                self.stats.count('triangle_objects', len(self._triangles))
+        return self._triangles
+
+    def set_mesh(self, mesh):
+        """
+        Takes over a finished triangulation, finding its boundary from the
+        half-edges without an opposite.
+        """
+        self.mesh = mesh
+        for edge, opposite in enumerate(mesh.halfedges):
+            if opposite == -1:
+                start, end = mesh.get_edge(edge)
+                self.hull_next[end] = start
+                self.hull_prev[start] = end
+                self.hull_edges[end] = edge
+        if not self.hull_next:
+            raise ValueError("The mesh has no triangles.")
+
+        self.convex_hull = ConvexHull(
+            [self.points[vertex] for vertex in self.hull_next],
+            algorithm='monotone_chain', incremental=True, stats=self.stats)
+        self.swept = len(self.points)
+        mesh.update_vertex_edges()
+
+    def reorder(self, strategy):
+        """
+        Puts the sorted, unique points in the insertion order of strategy,
+        keeping input_indices and point_indices in step
+        """
+        order = insertion_order(get_coordinates(self.points), strategy)
+        positions = array('l', [0]) * len(order)
+        for position, index in enumerate(order):
+            positions[index] = position
+        self.points = [self.points[index] for index in order]
+        self.input_indices = array('l', [self.input_indices[index] for index in order])
+        self.point_indices = array('l', [positions[index] for index in self.point_indices])
+
+    def insert_all(self):
+        """
+        Triangulates by inserting the points one at a time in the order they
+        are in, rather than sweeping. Each walk starts from the last point's
+        triangles, or from the grid of points inserted so far if that is
+        closer.
+        """
+        points = self.points
+        if len(points) < 3:
+            raise ValueError("At least 3 unique points are needed to form a "
+                             "triangulation.")
+        for third in range(2, len(points)):
+            if orientation(points[0], points[1], points[third]) != 0:
+                break
+        else:
+            raise ValueError("All points provided are collinear and a "
+                             "triangulation could not be formed.")
+        if self.stats is not None:
+            self.stats.count('orientation', third - 1)
+
+        self.build_fan(third, [0, 1])
+        self.mesh.update_vertex_edges()
+        self.convex_hull = ConvexHull([points[0], points[1], points[third]],
+                                      algorithm='monotone_chain', incremental=True,
+                                      stats=self.stats)
+        # Only the points inserted so far go in the grid
+        self.build_grid()
+        self.grid = array('l', [-1]) * len(self.grid)
+        for index in (0, 1, third):
+            self.grid[self.get_grid_cell(points[index])] = index
 
-        self.build_initial()
-        self.triangulate()
+        for index in range(2, len(points)):
+            if index == third:
+                continue
+            point = points[index]
+            triangle, boundary_edge = self.walk(self.get_walk_start(point), point)
+            self.connect_point(index, triangle, boundary_edge)
+        self.swept = len(points)
 
     def build_initial(self):
         """
@@ -31,15 +200,25 @@ class Delaunay(object):
         the starting points. In such a case, the produced triangles will be
         degenerate.
         """
+        if len(self.points) < 3:
+            raise ValueError("At least 3 unique points are needed to form a "
+                             "triangulation.")
+
         # Form a triangle and convex hull from the first 3 points
-        starter_hull = [self.points.pop(0) for i in range(3)]
-        self.convex_hull = ConvexHull(starter_hull)
+        starter_hull = self.points[:3]
+        self.convex_hull = ConvexHull(starter_hull, algorithm='monotone_chain',
+                                      incremental=True, stats=self.stats)
+        self.swept = 3
         first_triangle = Triangle(*starter_hull)
+        if self.stats is not None:
+            self.stats.count('triangle_objects')
+            self.stats.count('orientation')
         if first_triangle.is_collinear():
             self.degenerate = True
-            self.get_collinear_triangles()
+            with timed(self.stats, 'get_collinear_triangles'):
+                self.get_collinear_triangles()
         else:
-            self.triangles.append(Triangle(*starter_hull))
+            self.build_fan(2, [0, 1])
 
     def get_collinear_triangles(self):
         """
@@ -48,63 +227,1162 @@ class Delaunay(object):
         point.
         """
         while True:
-            if not self.points:
+            if self.swept == len(self.points):
                 # All the points are collinear
-                raise ValueError("All points provided are collinear and a ",
+                raise ValueError("All points provided are collinear and a "
                                  "triangulation could not be formed.")
 
-            new_point = self.points.pop(0)
+            new_point = self.points[self.swept]
             new_triangle = Triangle(new_point, *self.convex_hull.hull_points[-2:])
+            if self.stats is not None:
+                self.stats.count('triangle_objects')
+                self.stats.count('orientation')
             # We add the point to the convex hull regardless
 
             if not new_triangle.is_collinear():
-                self.triangles = self.build_triangles(new_point, self.convex_hull.hull_points)
+                self.build_fan(self.swept, list(range(self.swept)))
                 break
             self.convex_hull.add_point(new_point)
+            self.swept += 1
         self.convex_hull.add_point(new_point)
+        self.swept += 1
+
+    def build_fan(self, point_index, line_indices):
+        """
+        Connects a point to every point of a line of points, starting the
+        triangulation and its boundary. The line is sorted and has no other
+        point on its side of the line, so the fan's triangles need no
+        legalizing.
+        """
+        mesh = self.mesh
+        first = line_indices[0]
+        last = line_indices[-1]
+        counter_clockwise = orientation(self.points[first],
+                                        self.points[last],
+                                        self.points[point_index]) < 0
+
+        last_edge = -1
+        for i in range(len(line_indices) - 1):
+            a = line_indices[i]
+            b = line_indices[i+1]
+            if counter_clockwise:
+                edge = mesh.add_triangle(point_index, a, b)
+                if last_edge != -1:
+                    mesh.link(edge, last_edge + 2)
+            else:
+                edge = mesh.add_triangle(point_index, b, a)
+                if last_edge != -1:
+                    mesh.link(edge + 2, last_edge)
+            last_edge = edge
+
+        # Every half-edge without an opposite is on the boundary, running
+        # against the clockwise walk
+        for edge in range(len(mesh.halfedges)):
+            if mesh.halfedges[edge] == -1:
+                end, start = mesh.get_edge(edge)
+                self.hull_next[start] = end
+                self.hull_prev[end] = start
+                self.hull_edges[start] = edge
+
+        if self.stats is not None:
+            self.stats.count('orientation')
+            self.stats.count('triangles_created', len(line_indices) - 1)
 
     def triangulate(self):
         """
-        Builds a list of Triangle objects based on the triangles created in
-        build_initial.
+        Sweeps the remaining points left to right, connecting each point to
+        the part of the boundary it can see.
         """
-        for point in self.points:
-            # Copy convex hull point list
-            old_convex_hull = copy(self.convex_hull.hull_points)
-            # Add new point to convex hull
-            self.convex_hull.add_point(point)
+        for index in range(self.swept, len(self.points)):
+            self.convex_hull.add_point(self.points[index])
+            self.add_sweep_point(index)
+            self.swept += 1
 
-            points_to_connect = []
+        self.mesh.update_vertex_edges()
+        self._triangles = None
 
-            points_to_connect += self.get_displaced_points(old_convex_hull)
+    def add_sweep_point(self, index):
+        """
+        Connects the point at index, which is right of every point swept so
+        far, to each boundary edge it can see. The previous point is the
+        rightmost boundary point, so it is on one of those edges.
+        """
+        self.add_outside_point(index, index - 1)
 
-            points_to_connect += self.get_neighboring_points(point)
+    def add_outside_point(self, index, start):
+        """
+        Connects the point at index, outside of the triangulation, to each
+        boundary edge it can see. start is a boundary point on one of those
+        edges, so the visible edges are found by walking out from it in both
+        directions.
+        """
+        mesh = self.mesh
+        points = self.points
+        point = points[index]
 
-            # Sort points_to_connect on x, y
-            points_to_connect = sort_points(points_to_connect)
+        forward = []
+        right = start
+        while True:
+            next_index = self.hull_next[right]
+            if orientation(points[right], points[next_index], point) >= 0:
+                break
+            edge = mesh.add_triangle(right, next_index, index)
+            mesh.link(edge, self.hull_edges[right])
+            if forward:
+                mesh.link(edge + 2, forward[-1] + 1)
+            forward.append(edge)
+            right = next_index
+
+        backward = []
+        left = start
+        while True:
+            prev_index = self.hull_prev[left]
+            if orientation(points[prev_index], points[left], point) >= 0:
+                break
+            edge = mesh.add_triangle(prev_index, left, index)
+            mesh.link(edge, self.hull_edges[prev_index])
+            if backward:
+                mesh.link(edge + 1, backward[-1] + 2)
+            elif forward:
+                mesh.link(edge + 1, forward[0] + 2)
+            backward.append(edge)
+            left = prev_index
+
+        # Points between left and right are now inside the triangulation
+        covered = self.hull_next[left]
+        while covered != right:
+            next_index = self.hull_next.pop(covered)
+            del self.hull_prev[covered]
+            del self.hull_edges[covered]
+            covered = next_index
+
+        self.hull_next[left] = index
+        self.hull_prev[index] = left
+        self.hull_next[index] = right
+        self.hull_prev[right] = index
+        self.hull_edges[left] = backward[-1] + 2 if backward else forward[0] + 2
+        self.hull_edges[index] = forward[-1] + 1 if forward else backward[0] + 1
+
+        stats = self.stats
+        if stats is not None:
+            # Each walk tests one edge more than it connects
+            stats.count('orientation', len(forward) + len(backward) + 2)
+            stats.count('triangles_created', len(forward) + len(backward))
+
+        if self.legalize:
+            for edge in forward + backward:
+                self.legalize_edge(edge)
+
+    def legalize_edge(self, edge):
+        """
+        Flips the half-edge if the point across it lies inside the
+        circumcircle of its triangle, then checks the two edges the flip
+        exposed, until every edge is legal again. Only the edges facing the
+        swept point are checked.
+        """
+        points = self.points
+        triangles = self.mesh.triangles
+        halfedges = self.mesh.halfedges
+        constraints = self.constraints
+        stack = [edge]
+        # Counted only where they are rare, the in_circle tests follow from
+        # them as every flip pushes two edges
+        boundary_edges = 0
+        flips = 0
+        while stack:
+            a = stack.pop()
+            b = halfedges[a]
+            if b == -1:
+                # Edges on the boundary are always legal
+                boundary_edges += 1
+                continue
 
-            # Create triangles and add to triangle_list
-            new_triangles = self.build_triangles(point, points_to_connect)
-            self.triangles += new_triangles
+            # Inlined is_illegal, this runs for every edge the sweep adds
+            if in_circle(points[triangles[a]],
+                         points[triangles[next_halfedge(a)]],
+                         points[triangles[prev_halfedge(a)]],
+                         points[triangles[prev_halfedge(b)]]) <= 0:
+                continue
+            if constraints and self.is_constrained(a):
+                continue
+
+            self.flip_edge(a)
+            flips += 1
+            stack.append(a)
+            stack.append(next_halfedge(b))
+
+        if self.stats is not None:
+            self.stats.count('in_circle', 1 + 2 * flips - boundary_edges)
+            self.stats.count('flips', flips)
+
+    def legalize_edges(self, edges):
+        """
+        Flips illegal edges, starting from the given half-edges, until every
+        edge is legal again. Unlike legalize_edge this assumes nothing about
+        where the illegal edges are, so all four edges around each flip are
+        checked again.
+        """
+        halfedges = self.mesh.halfedges
+        stack = list(edges)
+        tests = 0
+        flips = 0
+        while stack:
+            a = stack.pop()
+            if halfedges[a] != -1:
+                tests += 1
+            if self.is_illegal(a):
+                b = halfedges[a]
+                self.flip_edge(a)
+                flips += 1
+                stack.extend((a, next_halfedge(a), b, next_halfedge(b)))
+
+        if self.stats is not None:
+            self.stats.count('in_circle', tests)
+            self.stats.count('flips', flips)
+
+    def is_illegal(self, edge):
+        """
+        Whether the point across the half-edge lies inside the circumcircle
+        of its triangle. Edges on the boundary and constraints are always
+        legal.
+        """
+        opposite = self.mesh.halfedges[edge]
+        if opposite == -1:
+            return False
+        if self.constraints and self.is_constrained(edge):
+            return False
+
+        # Triangle A, B, C on edge and triangle B, A, D on opposite
+        points = self.points
+        triangles = self.mesh.triangles
+        return in_circle(points[triangles[edge]],
+                         points[triangles[next_halfedge(edge)]],
+                         points[triangles[prev_halfedge(edge)]],
+                         points[triangles[prev_halfedge(opposite)]]) > 0
+
+    def is_constrained(self, edge):
+        return get_edge_key(*self.mesh.get_edge(edge)) in self.constraints
+
+    def flip_edge(self, edge):
+        """
+        Swaps the half-edge between triangles A, B, C and B, A, D for the
+        other diagonal, turning them into D, B, C and C, A, D in place.
+        """
+        mesh = self.mesh
+        triangles = mesh.triangles
+        halfedges = mesh.halfedges
+        a = edge
+        b = halfedges[a]
+        a_prev = prev_halfedge(a)
+        b_prev = prev_halfedge(b)
+        A = triangles[a]
+        B = triangles[next_halfedge(a)]
+
+        triangles[a] = triangles[b_prev]
+        triangles[b] = triangles[a_prev]
+        b_prev_opposite = halfedges[b_prev]
+        a_prev_opposite = halfedges[a_prev]
+        mesh.link(a, b_prev_opposite)
+        mesh.link(b, a_prev_opposite)
+        mesh.link(a_prev, b_prev)
+
+        # Boundary half-edges that moved
+        if b_prev_opposite == -1:
+            self.hull_edges[B] = a
+        if a_prev_opposite == -1:
+            self.hull_edges[A] = b
+
+        if self.changed_triangles is not None:
+            self.changed_triangles.add(a // 3)
+            self.changed_triangles.add(b // 3)
+
+    def locate(self, point):
+        """
+        Finds the triangle containing point, returning its index in the mesh
+        or -1 if the point is outside of the triangulation. A point on an
+        edge or a vertex is in any one of the triangles around it.
+        """
+        if self.grid is None:
+            self.build_grid()
+
+        triangle, _ = self.walk(self.get_walk_start(point), point)
+        if triangle != -1:
+            self.last_triangle = triangle
+        return triangle
+
+    def locate_all(self, points):
+        """
+        locate() for many points, returned as an array of triangle indices.
+        Walks start from wherever the last one ended when that is closer, so
+        points that are near each other in the input are found quickly.
+        """
+        return array('l', [self.locate(point) for point in points])
+
+    def build_grid(self):
+        """
+        Buckets the points into a grid of about one cell per eight points,
+        keeping one point per cell to start walks from.
+        """
+        points = self.points
+        self.grid_box = (min(point.x for point in points),
+                         min(point.y for point in points),
+                         max(point.x for point in points),
+                         max(point.y for point in points))
+        self.grid_size = max(1, int(sqrt(len(points) / 8.0)))
+        self.grid = array('l', [-1]) * (self.grid_size * self.grid_size)
+        for index, point in enumerate(points):
+            self.grid[self.get_grid_cell(point)] = index
+
+    def get_grid_cell(self, point):
+        min_x, min_y, max_x, max_y = self.grid_box
+        size = self.grid_size
+        column = 0
+        row = 0
+        if max_x > min_x:
+            column = int((point.x - min_x) / (max_x - min_x) * size)
+            column = min(max(column, 0), size - 1)
+        if max_y > min_y:
+            row = int((point.y - min_y) / (max_y - min_y) * size)
+            row = min(max(row, 0), size - 1)
+        return row * size + column
+
+    def get_walk_start(self, point):
+        """
+        The triangle to walk from: the one found last, or one around the
+        point in the grid cell of point if that is closer.
+        """
+        mesh = self.mesh
+        start = self.last_triangle
+        vertex = self.grid[self.get_grid_cell(point)]
+        if vertex != -1 and mesh.vertex_edges[vertex] != -1:
+            last_vertex = mesh.triangles[3 * start]
+            if (point.distance(self.points[vertex]) <
+                    point.distance(self.points[last_vertex])):
+                start = mesh.vertex_edges[vertex] // 3
+        return start
+
+    def walk(self, triangle, point):
+        """
+        Remembering stochastic walk from triangle to the one containing
+        point. Each step crosses an edge point is on the far side of, trying
+        the edges in a random order and never the one just crossed.
+
+        Returns the triangle and -1, or -1 and the boundary half-edge the
+        walk would have crossed if point is outside of the triangulation.
+        """
+        points = self.points
+        triangles = self.mesh.triangles
+        halfedges = self.mesh.halfedges
+        random = self.walk_random.random
+        entered = -1
+        steps = 0
+        tests = 0
+        while True:
+            first = 3 * triangle
+            offset = int(random() * 3)
+            for i in range(3):
+                edge = first + (offset + i) % 3
+                if edge == entered:
+                    continue
+                start = points[triangles[edge]]
+                end = points[triangles[next_halfedge(edge)]]
+                tests += 1
+                if orientation(start, end, point) > 0:
+                    # Clockwise, so point is on the far side of this edge
+                    entered = halfedges[edge]
+                    if entered == -1:
+                        self.count_walk(steps, tests)
+                        return -1, edge
+                    triangle = entered // 3
+                    steps += 1
+                    break
+            else:
+                self.count_walk(steps, tests)
+                return triangle, -1
+
+    def count_walk(self, steps, tests):
+        if self.stats is not None:
+            self.stats.count('walk_steps', steps)
+            self.stats.count('orientation', tests)
+
+    def nearest(self, point):
+        """
+        The index in self.points of the point closest to point. Starting
+        from the triangle containing point, it steps to whichever neighbor is
+        closer until none is, which in a Delaunay triangulation only stops
+        at the closest point, so the triangulation must be built with
+        legalize=True and have no constraints.
+        """
+        if not self.legalize or self.constraints:
+            raise ValueError("Nearest site queries need a Delaunay "
+                             "triangulation built with legalize=True and "
+                             "without constraints.")
+        mesh = self.mesh
+        points = self.points
+        triangle = self.locate(point)
+        if triangle == -1:
+            # Outside of the triangulation, any start will do
+            triangle = self.last_triangle
+
+        nearest = -1
+        distance = float('inf')
+        for vertex in mesh.get_triangle(triangle):
+            vertex_distance = get_squared_distance(points[vertex], point)
+            if vertex_distance < distance:
+                nearest = vertex
+                distance = vertex_distance
+
+        while True:
+            closer = nearest
+            for vertex in mesh.get_vertex_star(nearest):
+                vertex_distance = get_squared_distance(points[vertex], point)
+                if vertex_distance < distance:
+                    closer = vertex
+                    distance = vertex_distance
+            if closer == nearest:
+                return nearest
+            nearest = closer
+
+    def find_vertex(self, point):
+        """
+        The index in self.points of the triangulation's vertex at point, or
+        -1 if there is none
+        """
+        triangle = self.locate(point)
+        if triangle != -1:
+            for vertex in self.mesh.get_triangle(triangle):
+                if self.points[vertex] == point:
+                    return vertex
+        return -1
+
+    def nearest_all(self, points):
+        """
+        nearest() for many points, returned as an array of indices
+        """
+        return array('l', [self.nearest(point) for point in points])
 
-    def build_triangles(self, point, points_to_connect):
+    def nearest_k(self, point, k):
         """
-        Creates a list of triangles using point as a corner in every triangle.
+        The indices in self.points of the k points closest to point, closest
+        first. Each next closest point is a neighbor of one of the closer
+        ones, so they are found by expanding out from the closest point.
         """
-        triangle_list = []
-        n = len(points_to_connect)
-        for i in range(n-1):
-            triangle_list.append(
-                Triangle(point, points_to_connect[i], points_to_connect[i+1])
-            )
-        return triangle_list
+        mesh = self.mesh
+        points = self.points
+        start = self.nearest(point)
+        queue = [(get_squared_distance(points[start], point), start)]
+        seen = set([start])
+        nearest = []
+        while queue and len(nearest) < k:
+            _, vertex = heappop(queue)
+            nearest.append(vertex)
+            for neighbor in mesh.get_vertex_star(vertex):
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    heappush(queue, (get_squared_distance(points[neighbor], point),
+                                     neighbor))
+        return nearest
 
-    def get_displaced_points(self, old_convex_hull):
+    def nearest_k_all(self, points, k):
         """
-        Find the points that are no longer part of the convex hull. These will
-        form triangles with the newly added point.
+        nearest_k() for many points, returned as one array of k indices per
+        point, or of all of them when there are fewer than k
         """
-        return find_difference(old_convex_hull, self.convex_hull.hull_points)
+        nearest = array('l')
+        for point in points:
+            nearest.extend(self.nearest_k(point, k))
+        return nearest
+
+    def insert(self, point):
+        """
+        Adds a point to the triangulation, changing only the triangles
+        around it. A point inside is joined to the corners of the triangle
+        it is in, or of both triangles on the edge it is on, and a point
+        outside to every boundary edge it can see. With legalize set the
+        edges facing the point are then flipped as in the sweep.
+
+        Returns the index of the point in self.points, followed by the
+        indices of the triangles created and of those destroyed. Destroyed
+        indices are from before the change and created ones from after it,
+        so a triangle changed in place is in both. A point already in the
+        triangulation is not added again and changes no triangles. A point
+        on a constraint splits it in two.
+        """
+        mesh = self.mesh
+        if self.grid is None:
+            self.build_grid()
+        triangle, boundary_edge = self.walk(self.get_walk_start(point), point)
+        if triangle != -1:
+            for vertex in mesh.get_triangle(triangle):
+                if self.points[vertex] == point:
+                    return vertex, [], []
+
+        index = len(self.points)
+        self.points.append(point)
+        mesh.vertex_edges.append(-1)
+        return self.connect_point(index, triangle, boundary_edge)
+
+    def connect_point(self, index, triangle, boundary_edge):
+        """
+        Joins the point at index, not yet in the triangulation, to it. The
+        point is in triangle, or outside of boundary_edge when triangle is
+        -1, as found by walk(). Returns what insert() does.
+        """
+        mesh = self.mesh
+        point = self.points[index]
+        self.grid[self.get_grid_cell(point)] = index
+        triangle_count = mesh.triangle_count
+        self.changed_triangles = set()
+
+        if triangle == -1:
+            # The boundary edge runs the other way around from its half-edge
+            start = mesh.triangles[next_halfedge(boundary_edge)]
+            self.add_outside_point(index, start)
+        else:
+            edge = self.get_point_edge(triangle, point)
+            if edge == -1:
+                self.split_triangle(triangle, index)
+            else:
+                key = get_edge_key(*mesh.get_edge(edge))
+                self.split_edge(edge, index)
+                if key in self.constraints:
+                    self.constraints.remove(key)
+                    self.constraints.add(get_edge_key(key[0], index))
+                    self.constraints.add(get_edge_key(index, key[1]))
+
+        changed = self.changed_triangles
+        self.changed_triangles = None
+        changed.update(range(triangle_count, mesh.triangle_count))
+        destroyed = sorted(t for t in changed if t < triangle_count)
+        self.update_changed(changed, [index],
+                            hull_changed=index in self.hull_next)
+        return index, sorted(changed), destroyed
+
+    def get_point_edge(self, triangle, point):
+        """
+        The half-edge of a triangle that point lies on, or -1 if it is
+        strictly inside
+        """
+        points = self.points
+        triangles = self.mesh.triangles
+        for edge in range(3 * triangle, 3 * triangle + 3):
+            if orientation(points[triangles[edge]],
+                           points[triangles[next_halfedge(edge)]], point) == 0:
+                if self.stats is not None:
+                    self.stats.count('orientation', edge - 3 * triangle + 1)
+                return edge
+        if self.stats is not None:
+            self.stats.count('orientation', 3)
+        return -1
+
+    def split_triangle(self, triangle, index):
+        """
+        Splits triangle A, B, C around the point at index, inside of it, into
+        A, B, P in place, B, C, P and C, A, P.
+        """
+        mesh = self.mesh
+        a, b, c = mesh.get_triangle(triangle)
+        first = 3 * triangle
+        opposite_ab, opposite_bc, opposite_ca = mesh.halfedges[first:first + 3]
+
+        mesh.set_triangle(triangle, a, b, index)
+        mesh.link(first, opposite_ab)
+        edge_1 = mesh.add_triangle(b, c, index)
+        mesh.link(edge_1, opposite_bc)
+        mesh.link(edge_1 + 2, first + 1)
+        edge_2 = mesh.add_triangle(c, a, index)
+        mesh.link(edge_2, opposite_ca)
+        mesh.link(edge_2 + 1, first + 2)
+        mesh.link(edge_2 + 2, edge_1 + 1)
+        self.changed_triangles.add(triangle)
+        if self.stats is not None:
+            self.stats.count('triangles_created', 2)
+
+        if self.legalize:
+            for edge in (first, edge_1, edge_2):
+                self.legalize_edge(edge)
+
+    def split_edge(self, edge, index):
+        """
+        Splits the edge from A to B at the point at index, on it. Triangle
+        A, B, C becomes C, A, P in place and B, C, P, and triangle B, A, D
+        across the edge becomes A, D, P in place and D, B, P. On the boundary
+        there is no triangle across and the point joins the boundary.
+        """
+        mesh = self.mesh
+        triangles = mesh.triangles
+        halfedges = mesh.halfedges
+        triangle = edge // 3
+        opposite = halfedges[edge]
+        a = triangles[edge]
+        b = triangles[next_halfedge(edge)]
+        c = triangles[prev_halfedge(edge)]
+        opposite_bc = halfedges[next_halfedge(edge)]
+        opposite_ca = halfedges[prev_halfedge(edge)]
+
+        first = mesh.set_triangle(triangle, c, a, index)
+        mesh.link(first, opposite_ca)
+        edge_1 = mesh.add_triangle(b, c, index)
+        mesh.link(edge_1, opposite_bc)
+        mesh.link(edge_1 + 1, first + 2)
+        self.changed_triangles.add(triangle)
+        outer_edges = [first, edge_1]
+
+        if opposite == -1:
+            self.hull_next[b] = index
+            self.hull_prev[index] = b
+            self.hull_next[index] = a
+            self.hull_prev[a] = index
+        else:
+            d = triangles[prev_halfedge(opposite)]
+            opposite_ad = halfedges[next_halfedge(opposite)]
+            opposite_db = halfedges[prev_halfedge(opposite)]
+            second = mesh.set_triangle(opposite // 3, a, d, index)
+            mesh.link(second, opposite_ad)
+            mesh.link(second + 2, first + 1)
+            edge_2 = mesh.add_triangle(d, b, index)
+            mesh.link(edge_2, opposite_db)
+            mesh.link(edge_2 + 1, edge_1 + 2)
+            mesh.link(edge_2 + 2, second + 1)
+            self.changed_triangles.add(opposite // 3)
+            outer_edges.extend((second, edge_2))
+        if self.stats is not None:
+            # Both triangles are changed in place, so only one more each
+            self.stats.count('triangles_created', len(outer_edges) // 2)
+
+        if self.legalize:
+            for outer_edge in outer_edges:
+                self.legalize_edge(outer_edge)
+
+    def remove(self, point):
+        """
+        Takes a point out of the triangulation, filling the hole its
+        triangles leave with new ones. Inside, the hole is cut into triangles
+        one convex corner at a time. On the boundary, the points around it
+        that the new boundary passes inside of are cut off instead, leaving
+        the boundary convex. With legalize set the new edges are then
+        legalized.
+
+        The point keeps its index in self.points, without any triangles.
+        Returns the index followed by the indices of the triangles created
+        and destroyed, as for insert(). Triangles moved to fill the slots
+        freed in the mesh are in both, under their old and new indices.
+        The constraints ending at the point are dropped with it.
+        """
+        mesh = self.mesh
+        points = self.points
+        index = self.find_vertex(point)
+        if index == -1:
+            raise ValueError("The point is not in the triangulation.")
+
+        edges = mesh.get_outgoing_edges(index)
+        star = mesh.get_vertex_star(index)
+        removed = sorted(edge // 3 for edge in edges)
+        on_boundary = index in self.hull_next
+
+        if on_boundary:
+            fill, boundary = self.get_boundary_fill(star)
+        else:
+            fill = self.get_hole_fill(star)
+        if mesh.triangle_count - len(removed) + len(fill) == 0:
+            raise ValueError("At least 3 points not on one line must remain "
+                             "in the triangulation.")
+        for vertex in star:
+            self.constraints.discard(get_edge_key(index, vertex))
+
+        # The half-edges still needing an opposite, keyed by the start and
+        # end vertex of that opposite. The hole's edges are waiting on the
+        # half-edges outside of it, which run the other way around.
+        waiting = {}
+        for edge, start, end in zip(edges, star, star[1:] + star[:1]):
+            waiting[(start, end)] = mesh.halfedges[next_halfedge(edge)]
+
+        self.changed_triangles = set()
+        new_edges = []
+        for triangle, vertices in zip(removed, fill):
+            first = mesh.set_triangle(triangle, *vertices)
+            self.changed_triangles.add(triangle)
+            for edge in range(first, first + 3):
+                start, end = mesh.get_edge(edge)
+                if (start, end) in waiting:
+                    mesh.link(edge, waiting.pop((start, end)))
+                else:
+                    waiting[(end, start)] = edge
+                new_edges.append(edge)
+
+        if on_boundary:
+            # What is left waiting is on the new boundary
+            for edge in waiting.values():
+                if edge != -1:
+                    mesh.halfedges[edge] = -1
+                    self.hull_edges[mesh.triangles[next_halfedge(edge)]] = edge
+            del self.hull_next[index]
+            del self.hull_prev[index]
+            del self.hull_edges[index]
+            for start, end in zip(boundary, boundary[1:]):
+                self.hull_next[start] = end
+                self.hull_prev[end] = start
+
+        if self.legalize:
+            self.legalize_edges(new_edges)
+
+        changed = self.changed_triangles
+        self.changed_triangles = None
+        destroyed = set(removed)
+        destroyed.update(t for t in changed if t < mesh.triangle_count)
+        # Fill the slots no longer in use from the end of the mesh
+        free = removed[len(fill):]
+        while free:
+            last = mesh.triangle_count - 1
+            if last in free:
+                free.remove(last)
+            else:
+                target = free.pop(0)
+                mesh.move_triangle(last, target)
+                destroyed.add(last)
+                changed.discard(last)
+                changed.add(target)
+            mesh.pop_triangle()
+
+        mesh.vertex_edges[index] = -1
+        self.update_changed(changed, star, hull_changed=on_boundary)
+        return index, sorted(changed), sorted(destroyed)
+
+    def get_hole_fill(self, polygon):
+        """
+        Triangles filling the counter clockwise polygon left by removing a
+        point inside the triangulation, made by cutting off convex corners
+        with no other polygon point in the triangle they make.
+        """
+        points = self.points
+        polygon = list(polygon)
+        fill = []
+        while len(polygon) > 3:
+            count = len(polygon)
+            for i in range(count):
+                a = polygon[i - 1]
+                b = polygon[i]
+                c = polygon[(i + 1) % count]
+                if orientation(points[a], points[b], points[c]) >= 0:
+                    continue
+                for vertex in polygon:
+                    if (vertex not in (a, b, c) and
+                            orientation(points[a], points[b], points[vertex]) <= 0 and
+                            orientation(points[b], points[c], points[vertex]) <= 0 and
+                            orientation(points[c], points[a], points[vertex]) <= 0):
+                        break
+                else:
+                    fill.append((a, b, c))
+                    del polygon[i]
+                    break
+        fill.append(tuple(polygon))
+        return fill
+
+    def get_boundary_fill(self, chain):
+        """
+        Triangles filling the gap left by removing a boundary point, given
+        the points around it from one boundary neighbor to the other, and
+        the new boundary between those neighbors. The chain is walked as the
+        boundary, clockwise, cutting off every point it turns counter
+        clockwise at.
+        """
+        points = self.points
+        fill = []
+        boundary = [chain[0]]
+        for vertex in chain[1:]:
+            while len(boundary) > 1 and orientation(
+                    points[boundary[-2]], points[boundary[-1]], points[vertex]) < 0:
+                fill.append((boundary[-2], boundary[-1], vertex))
+                boundary.pop()
+            boundary.append(vertex)
+        return fill, boundary
+
+    def update_changed(self, triangles, vertices, hull_changed):
+        """
+        Brings everything kept alongside the mesh up to date after inserting
+        or removing a point: the boundary half-edges and vertex half-edges
+        of the changed triangles and of the given vertices, the convex hull
+        if the boundary changed, and the Triangle objects.
+        """
+        mesh = self.mesh
+        mesh_triangles = mesh.triangles
+        halfedges = mesh.halfedges
+        vertex_edges = mesh.vertex_edges
+        vertices = set(vertices)
+        for triangle in triangles:
+            for edge in range(3 * triangle, 3 * triangle + 3):
+                vertices.add(mesh_triangles[edge])
+                if halfedges[edge] == -1:
+                    self.hull_edges[mesh_triangles[next_halfedge(edge)]] = edge
+
+        for vertex in vertices:
+            if vertex in self.hull_prev:
+                # The boundary half-edge starting at vertex
+                vertex_edges[vertex] = self.hull_edges[self.hull_prev[vertex]]
+                continue
+            edge = vertex_edges[vertex]
+            if 0 <= edge < len(mesh_triangles) and mesh_triangles[edge] == vertex:
+                continue
+            for triangle in triangles:
+                for edge in range(3 * triangle, 3 * triangle + 3):
+                    if mesh_triangles[edge] == vertex:
+                        vertex_edges[vertex] = edge
+
+        if hull_changed:
+            self.convex_hull = ConvexHull(
+                [self.points[vertex] for vertex in self.hull_next],
+                algorithm='monotone_chain', incremental=True, stats=self.stats)
+        if triangles:
+            self.last_triangle = min(triangles)
+        elif self.last_triangle >= mesh.triangle_count:
+            self.last_triangle = 0
+        self._triangles = None
+
+    def move(self, points):
+        """
+        Moves every point to the new position at its index in points, then
+        repairs the triangulation in place rather than sorting and sweeping
+        again. Wherever the boundary now bends inward it is filled in with
+        new triangles, and with legalize set illegal edges are flipped.
+        Points whose move would turn a triangle over, which flips can't
+        repair, are held back, then taken out and put in again at their new
+        positions, keeping their indices.
+
+        Returns False if a dent in the boundary can't be filled with one
+        triangle, if points would be taken out of a triangulation with
+        constraints, or if taking one out would leave too few points. The
+        triangulation is left valid, but should be built again.
+        """
+        mesh = self.mesh
+        triangles = mesh.triangles
+        if len(points) != len(self.points):
+            raise ValueError("Every point must be given a new position.")
+
+        moved = list(points)
+        held = set()
+        check = range(0, len(triangles), 3)
+        while check:
+            turned = []
+            for edge in check:
+                if orientation(moved[triangles[edge]],
+                               moved[triangles[edge + 1]],
+                               moved[triangles[edge + 2]]) >= 0:
+                    turned.append(edge)
+            for edge in turned:
+                for vertex in triangles[edge:edge + 3]:
+                    if vertex not in held:
+                        held.add(vertex)
+                        moved[vertex] = self.points[vertex]
+            # Holding points back can turn the triangles around them over
+            check = [3 * triangle for vertex in held
+                     for triangle in mesh.get_vertex_triangles(vertex)] if turned else []
+        if held and self.constraints:
+            return False
+
+        self.points = moved
+        self.grid = None
+        triangle_count = mesh.triangle_count
+        self.changed_triangles = set()
+        filled = self.fill_boundary()
+        if self.legalize:
+            self.legalize_edges(range(len(triangles)))
+
+        changed = self.changed_triangles
+        self.changed_triangles = None
+        changed.update(range(triangle_count, mesh.triangle_count))
+        # Flips leave vertex half-edges pointing anywhere
+        mesh.vertex_edges = array('l', [-1]) * len(moved)
+        mesh.update_vertex_edges()
+        self.update_changed(changed, [], hull_changed=True)
+
+        for vertex in sorted(held):
+            point = points[vertex]
+            try:
+                self.remove(moved[vertex])
+            except ValueError:
+                # Too few points would be left, so the rest stay held back
+                return False
+            moved[vertex] = point
+            triangle, boundary_edge = self.walk(self.get_walk_start(point), point)
+            if triangle == -1 or point not in [
+                    moved[corner] for corner in mesh.get_triangle(triangle)]:
+                self.connect_point(vertex, triangle, boundary_edge)
+        return filled
+
+    def fill_boundary(self):
+        """
+        Adds a triangle across every boundary point the boundary bends
+        inward at, joining the point's two boundary neighbors, until the
+        boundary is convex again. Returns False if one of those triangles
+        would cover another boundary point.
+        """
+        points = self.points
+        mesh = self.mesh
+        hull_next = self.hull_next
+        hull_prev = self.hull_prev
+        hull_edges = self.hull_edges
+        stack = list(hull_next)
+        while stack:
+            vertex = stack.pop()
+            if vertex not in hull_next:
+                continue
+            prev_index = hull_prev[vertex]
+            next_index = hull_next[vertex]
+            corners = (prev_index, vertex, next_index)
+            a, b, c = [points[corner] for corner in corners]
+            if orientation(a, b, c) >= 0:
+                continue
+            for other in hull_next:
+                if (other not in corners and
+                        orientation(a, b, points[other]) <= 0 and
+                        orientation(b, c, points[other]) <= 0 and
+                        orientation(c, a, points[other]) <= 0):
+                    return False
+
+            edge = mesh.add_triangle(prev_index, vertex, next_index)
+            mesh.link(edge, hull_edges[prev_index])
+            mesh.link(edge + 1, hull_edges[vertex])
+            del hull_next[vertex]
+            del hull_prev[vertex]
+            del hull_edges[vertex]
+            hull_next[prev_index] = next_index
+            hull_prev[next_index] = prev_index
+            hull_edges[prev_index] = edge + 2
+            stack.append(prev_index)
+            stack.append(next_index)
+        return True
+
+    def add_constraints(self, segments):
+        """
+        Makes every LineSegment of segments a path of edges of the
+        triangulation, which no later flip takes away. Endpoints not yet in
+        the triangulation are inserted. A segment passing through points is
+        split at them, and where segments cross, the crossing is inserted
+        as a point and both are split at it. With legalize set every other
+        edge is then Delaunay as far as the constraints allow.
+
+        The edges a segment crosses, constraints among them, are found by
+        walking the triangles along it, so the triangulation itself indexes
+        the constraints and segments are never tested against each other.
+        """
+        for segment in segments:
+            self.add_constraint(segment)
+
+    def add_constraint(self, segment):
+        """
+        add_constraints() for a single segment
+        """
+        start = self.insert(segment.point_1)[0]
+        end = self.insert(segment.point_2)[0]
+        pending = [(start, end)]
+        while pending:
+            start, end = pending.pop()
+            if start != end:
+                pending.extend(self.add_constraint_edge(start, end))
+
+    def add_constraint_edge(self, start, end):
+        """
+        Makes the edge between two points a constraint. The triangles it
+        crosses are taken out and the cavity on either side of it filled
+        again, or if the line meets a point or another constraint first, it
+        is only taken that far.
+
+        Returns the edges still to be constrained, if it was not taken all
+        the way.
+        """
+        mesh = self.mesh
+        points = self.points
+        triangles = mesh.triangles
+        halfedges = mesh.halfedges
+        point_1 = points[start]
+        point_2 = points[end]
+
+        # Find the edge of a triangle around start that the line crosses
+        crossed = []
+        for edge in mesh.get_outgoing_edges(start):
+            right = triangles[next_halfedge(edge)]
+            left = triangles[prev_halfedge(edge)]
+            if end in (right, left):
+                self.constraints.add(get_edge_key(start, end))
+                return []
+            right_turn = orientation(point_1, point_2, points[right])
+            left_turn = orientation(point_1, point_2, points[left])
+            for vertex, turn in ((right, right_turn), (left, left_turn)):
+                if turn == 0 and self.is_ahead(start, end, vertex):
+                    # The line runs along an edge to vertex
+                    self.constraints.add(get_edge_key(start, vertex))
+                    return [(vertex, end)]
+            if right_turn > 0 and left_turn < 0:
+                crossed.append(next_halfedge(edge))
+                break
+        else:
+            raise ValueError("The constraint leaves the triangulation.")
+
+        # Walk across the triangles along the line, collecting the points
+        # left and right of it
+        lefts = [left]
+        rights = [right]
+        remaining = []
+        while True:
+            edge = crossed[-1]
+            if self.is_constrained(edge):
+                return self.split_crossing(start, end, edge)
+            opposite = halfedges[edge]
+            if opposite == -1:
+                raise ValueError("The constraint leaves the triangulation.")
+            vertex = triangles[prev_halfedge(opposite)]
+            if vertex == end:
+                break
+            turn = orientation(point_1, point_2, points[vertex])
+            if turn == 0:
+                # The line runs into a point, so stop there
+                remaining.append((vertex, end))
+                end = vertex
+                break
+            if turn > 0:
+                rights.append(vertex)
+                crossed.append(prev_halfedge(opposite))
+            else:
+                lefts.append(vertex)
+                crossed.append(next_halfedge(opposite))
+
+        if len(set(lefts)) < len(lefts) or len(set(rights)) < len(rights):
+            # The cavity touches itself where the line passes a point on
+            # both sides of an edge, and can't be filled as two polygons
+            self.flip_constraint_edge(start, end, crossed)
+            return remaining
+
+        # The half-edges around the cavity, keyed by start and end vertex,
+        # waiting on the half-edges of the new triangles that replace them
+        removed = [crossed[0] // 3] + [halfedges[edge] // 3 for edge in crossed]
+        removed_set = set(removed)
+        waiting = {}
+        for triangle in removed:
+            for edge in range(3 * triangle, 3 * triangle + 3):
+                opposite = halfedges[edge]
+                if opposite == -1 or opposite // 3 not in removed_set:
+                    waiting[mesh.get_edge(edge)] = opposite
+
+        fill = (self.get_cavity_fill(start, end, lefts[::-1]) +
+                self.get_cavity_fill(end, start, rights))
+        for triangle, vertices in zip(removed, fill):
+            first = mesh.set_triangle(triangle, *vertices)
+            for edge in range(first, first + 3):
+                key = mesh.get_edge(edge)
+                if key in waiting:
+                    mesh.link(edge, waiting.pop(key))
+                else:
+                    waiting[(key[1], key[0])] = edge
+        self.constraints.add(get_edge_key(start, end))
+        self.update_changed(removed, [], hull_changed=False)
+        return remaining
+
+    def flip_constraint_edge(self, start, end, crossed):
+        """
+        Makes the edge between two points a constraint by flipping the
+        half-edges it crosses away. An edge whose two triangles don't make a
+        convex quadrilateral can't be flipped yet and waits for the flips
+        around it. The new edges are then legalized.
+        """
+        mesh = self.mesh
+        points = self.points
+        triangles = mesh.triangles
+        halfedges = mesh.halfedges
+        point_1 = points[start]
+        point_2 = points[end]
+        queue = deque(mesh.get_edge(edge) for edge in crossed)
+        new_edges = []
+        self.changed_triangles = set()
+        while queue:
+            vertex_1, vertex_2 = queue.popleft()
+            edge = mesh.find_edge(vertex_1, vertex_2)
+            opposite = halfedges[edge]
+            vertex_3 = triangles[prev_halfedge(edge)]
+            vertex_4 = triangles[prev_halfedge(opposite)]
+            turn_1 = orientation(points[vertex_3], points[vertex_4], points[vertex_1])
+            turn_2 = orientation(points[vertex_3], points[vertex_4], points[vertex_2])
+            if not (turn_1 < 0 < turn_2 or turn_2 < 0 < turn_1):
+                queue.append((vertex_1, vertex_2))
+                continue
+
+            self.flip_edge(edge)
+            # Keeps the vertex half-edges find_edge walks from right
+            self.update_changed((edge // 3, opposite // 3), [], hull_changed=False)
+            turn_1 = orientation(point_1, point_2, points[vertex_3])
+            turn_2 = orientation(point_1, point_2, points[vertex_4])
+            if turn_1 < 0 < turn_2 or turn_2 < 0 < turn_1:
+                queue.append((vertex_3, vertex_4))
+            elif get_edge_key(vertex_3, vertex_4) != get_edge_key(start, end):
+                new_edges.append((vertex_3, vertex_4))
+
+        self.constraints.add(get_edge_key(start, end))
+        if self.legalize:
+            self.legalize_edges([mesh.find_edge(*edge) for edge in new_edges])
+        changed = self.changed_triangles
+        self.changed_triangles = None
+        self.update_changed(changed, [], hull_changed=False)
+
+    def is_ahead(self, start, end, vertex):
+        """
+        Whether a point on the line from start to end is on the same side of
+        start as end
+        """
+        points = self.points
+        return ((points[vertex].x - points[start].x) * (points[end].x - points[start].x) +
+                (points[vertex].y - points[start].y) * (points[end].y - points[start].y)) > 0
+
+    def split_crossing(self, start, end, edge):
+        """
+        Inserts the point where the line from start to end crosses the
+        constrained half-edge, returning the edges left to constrain on
+        either side of it. The point is rounded, so when it is not exactly
+        on the constraint, the constraint is bent through it instead.
+        """
+        points = self.points
+        vertex_1, vertex_2 = self.mesh.get_edge(edge)
+        crossing = crossing_point(points[start], points[end],
+                                  points[vertex_1], points[vertex_2])
+        index = self.insert(crossing)[0]
+        remaining = [(start, index), (index, end)]
+        key = get_edge_key(vertex_1, vertex_2)
+        if key in self.constraints:
+            self.constraints.remove(key)
+            remaining.extend(((vertex_1, index), (index, vertex_2)))
+            if self.legalize:
+                # The constraint kept the new point's edges from flipping it
+                self.changed_triangles = set()
+                edge = self.mesh.find_edge(vertex_1, vertex_2)
+                if edge != -1:
+                    self.legalize_edges([edge])
+                changed = self.changed_triangles
+                self.changed_triangles = None
+                self.update_changed(changed, [], hull_changed=False)
+        return remaining
+
+    def get_cavity_fill(self, start, end, chain):
+        """
+        Triangles filling one side of the cavity of a new constraint, a
+        polygon running counter clockwise from start to end and then along
+        chain back to start. Each edge takes the chain point whose
+        circumcircle holds no other chain point, splitting the chain in two.
+        """
+        points = self.points
+        fill = []
+        stack = [(start, end, chain)]
+        while stack:
+            start, end, chain = stack.pop()
+            if not chain:
+                continue
+            best = 0
+            for i in range(1, len(chain)):
+                if in_circle(points[start], points[end], points[chain[best]],
+                             points[chain[i]]) > 0:
+                    best = i
+            vertex = chain[best]
+            fill.append((start, end, vertex))
+            stack.append((vertex, end, chain[:best]))
+            stack.append((start, vertex, chain[best + 1:]))
+        return fill
 
     def get_neighboring_points(self, point):
         """
@@ -122,4 +1400,3 @@ class Delaunay(object):
             right_point = self.convex_hull.hull_points[new_point_index+1]
 
         return [left_point, right_point]
-
@@ -1,8 +1,10 @@
 import unittest
 from unittest import TestCase
 
-from geometry import Point, Triangle
-from triangulation import Delaunay
+from random import Random
+
+from geometry import LineSegment, Point, Triangle, orientation
+from triangulation import Delaunay, get_edge_key
 
 
 class TriangulateTest(TestCase):
@@ -48,6 +50,14 @@ class TriangulateTest(TestCase):
         ]
         self.assertEqual(delaunay.triangles, expected_triangles)
 
+    def test_input_indices(self):
+        points = [Point(2, 0), Point(0, 0), Point(1, 2), Point(0, 0)]
+        delaunay = Delaunay(points)
+        self.assertEqual(list(delaunay.input_indices), [1, 2, 0])
+        self.assertEqual(list(delaunay.point_indices), [2, 0, 1, 0])
+        for index, point in enumerate(points):
+            self.assertEqual(delaunay.points[delaunay.point_indices[index]], point)
+
     def test_triangulation_collinearity_case(self):
         """
         Ensure in the case of the first 3+ points are collinear, it will
@@ -89,6 +99,316 @@ class TriangulateTest(TestCase):
         with self.assertRaises(ValueError):
             delaunay = Delaunay(points)
 
+    def test_triangulation_fans_in_boundary_order(self):
+        """
+        A point that sees both the upper and the lower boundary should be
+        connected to the boundary in order, without overlapping triangles.
+        """
+        points = [
+            Point(0, 1),
+            Point(0, -1),
+            Point(1, 0),
+            Point(3, 0)
+        ]
+        delaunay = Delaunay(points)
+        expected_triangles = [
+            Triangle(Point(0, -1), Point(0, 1), Point(1, 0)),
+            Triangle(Point(1, 0), Point(0, -1), Point(3, 0)),
+            Triangle(Point(0, 1), Point(1, 0), Point(3, 0))
+        ]
+        self.assertCountEqual(delaunay.triangles, expected_triangles)
+
+    def test_legalize_flips_illegal_edge(self):
+        """
+        The sweep connects (2, 0) to the long edge between (1, -3) and (1, 3),
+        which (0, 0) makes illegal.
+        """
+        points = [
+            Point(0, 0),
+            Point(1, -3),
+            Point(1, 3),
+            Point(2, 0)
+        ]
+        sweep = Delaunay(points)
+        self.assertEqual(sweep.triangles, [
+            Triangle(Point(0, 0), Point(1, -3), Point(1, 3)),
+            Triangle(Point(1, -3), Point(1, 3), Point(2, 0))
+        ])
+
+        delaunay = Delaunay(points, legalize=True)
+        expected_triangles = [
+            Triangle(Point(0, 0), Point(1, -3), Point(2, 0)),
+            Triangle(Point(0, 0), Point(2, 0), Point(1, 3))
+        ]
+        self.assertCountEqual(delaunay.triangles, expected_triangles)
+
+    def test_legalize_empty_circumcircles(self):
+        """
+        No point should be inside the circumcircle of any triangle.
+        """
+        random = Random(3)
+        points = [Point(random.uniform(0, 100), random.uniform(0, 100))
+                  for i in range(60)]
+        delaunay = Delaunay(points, legalize=True)
+        self.assertEqual(len(delaunay.triangles), 2 * 60 - len(delaunay.hull_next) - 2)
+
+        for triangle in delaunay.triangles:
+            center, radius = Triangle.get_circumcircle(triangle.line_1,
+                                                       triangle.line_2)
+            for point in delaunay.points:
+                self.assertGreater(center.distance(point), radius - 1e-9)
+
+    def test_locate(self):
+        random = Random(4)
+        points = [Point(random.uniform(0, 100), random.uniform(0, 100))
+                  for i in range(200)]
+        delaunay = Delaunay(points, legalize=True)
+        queries = [Point(random.uniform(0, 100), random.uniform(0, 100))
+                   for i in range(100)]
+        located = delaunay.locate_all(queries)
+        self.assertEqual(located.typecode, 'l')
+        self.assertEqual(len(located), 100)
+        for point, index in zip(queries, located):
+            if index == -1:
+                # Only points outside of the hull are missing
+                hull = delaunay.convex_hull.hull_points
+                self.assertTrue(any(
+                    orientation(hull[i - 1], hull[i], point) < 0
+                    for i in range(len(hull))))
+                continue
+            triangle = delaunay.triangles[index]
+            self.assertNotEqual(triangle.clockwise, True)
+            for line in (triangle.line_1, triangle.line_2, triangle.line_3):
+                self.assertLessEqual(orientation(line.point_1, line.point_2, point), 0)
+
+    def test_locate_outside_and_on_vertices(self):
+        points = [
+            Point(0, 0),
+            Point(2, 0),
+            Point(1, 1),
+            Point(0, 2),
+            Point(2, 2),
+        ]
+        delaunay = Delaunay(points, legalize=True)
+        self.assertEqual(delaunay.locate(Point(3, 1)), -1)
+        self.assertEqual(delaunay.locate(Point(1, -0.5)), -1)
+        for point in points:
+            index = delaunay.locate(point)
+            self.assertIn(point, [delaunay.triangles[index].point_1,
+                                  delaunay.triangles[index].point_2,
+                                  delaunay.triangles[index].point_3])
+
+    def test_nearest(self):
+        random = Random(5)
+        points = [Point(random.randint(0, 30), random.randint(0, 30))
+                  for _ in range(300)]
+        delaunay = Delaunay(points, legalize=True)
+        queries = [Point(random.uniform(-5, 35), random.uniform(-5, 35))
+                   for _ in range(50)]
+
+        nearest = delaunay.nearest_all(queries)
+        self.assertEqual(nearest.typecode, 'l')
+        for point, index in zip(queries, nearest):
+            closest = min(point.distance(other) for other in delaunay.points)
+            self.assertEqual(point.distance(delaunay.points[index]), closest)
+
+        for point in queries:
+            distances = sorted(point.distance(other) for other in delaunay.points)
+            nearest = delaunay.nearest_k(point, 6)
+            self.assertEqual([point.distance(delaunay.points[index])
+                              for index in nearest], distances[:6])
+        self.assertEqual(len(delaunay.nearest_k_all(queries, 3)), 150)
+
+    def test_nearest_needs_delaunay(self):
+        random = Random(5)
+        points = [Point(random.random(), random.random()) for _ in range(100)]
+        with self.assertRaises(ValueError):
+            Delaunay(points).nearest(Point(0.5, 0.5))
+        with self.assertRaises(ValueError):
+            Delaunay(points).nearest_k(Point(0.5, 0.5), 3)
+
+        delaunay = Delaunay(points, legalize=True)
+        delaunay.add_constraints([LineSegment(Point(0, 0), Point(1, 1))])
+        with self.assertRaises(ValueError):
+            delaunay.nearest(Point(0.5, 0.5))
+
+    def assert_delaunay(self, delaunay):
+        points = delaunay.points
+        triangles = delaunay.mesh.triangles
+        live = [index for index in range(len(points))
+                if delaunay.mesh.vertex_edges[index] != -1]
+        self.assertEqual(len(delaunay.triangles),
+                         2 * len(live) - len(delaunay.hull_next) - 2)
+        for edge, opposite in enumerate(delaunay.mesh.halfedges):
+            if opposite == -1:
+                start, end = delaunay.mesh.get_edge(edge)
+                self.assertEqual(delaunay.hull_next[end], start)
+                self.assertEqual(delaunay.hull_edges[end], edge)
+            else:
+                self.assertEqual(delaunay.mesh.halfedges[opposite], edge)
+                self.assertFalse(delaunay.is_illegal(edge))
+        for triangle in delaunay.triangles:
+            self.assertFalse(triangle.clockwise)
+        self.assertEqual(set(triangles), set(live))
+
+    def test_insert(self):
+        random = Random(6)
+        points = [Point(random.uniform(0, 100), random.uniform(0, 100))
+                  for _ in range(50)]
+        delaunay = Delaunay(points, legalize=True)
+        inside = Point(50.5, 50.5)
+        outside = Point(120, 40)
+        for point in (inside, outside):
+            before = [delaunay.mesh.get_triangle(triangle)
+                      for triangle in range(delaunay.mesh.triangle_count)]
+            index, created, destroyed = delaunay.insert(point)
+            self.assertEqual(delaunay.points[index], point)
+            self.assertEqual(len(created) - len(destroyed),
+                             delaunay.mesh.triangle_count - len(before))
+            for triangle in range(delaunay.mesh.triangle_count):
+                if triangle >= len(before) or (
+                        delaunay.mesh.get_triangle(triangle) != before[triangle]):
+                    self.assertIn(triangle, created)
+            self.assertIn(index, delaunay.mesh.get_vertex_star(
+                delaunay.nearest_k(point, 2)[1]))
+            self.assert_delaunay(delaunay)
+        self.assertIn(outside, delaunay.convex_hull.hull_points)
+        self.assertEqual(delaunay.insert(inside), (50, [], []))
+
+    def test_insert_on_edges(self):
+        points = [Point(x, y) for x in range(4) for y in range(4)]
+        delaunay = Delaunay(points, legalize=True)
+        for point in (Point(1.5, 1), Point(0, 2.5), Point(1.5, 1.5)):
+            delaunay.insert(point)
+            self.assert_delaunay(delaunay)
+        self.assertIn(delaunay.points.index(Point(0, 2.5)), delaunay.hull_next)
+
+    def test_remove(self):
+        random = Random(7)
+        points = [Point(random.randint(0, 10), random.randint(0, 10))
+                  for _ in range(60)]
+        delaunay = Delaunay(points, legalize=True)
+        for point in list(delaunay.points[::3]):
+            count = delaunay.mesh.triangle_count
+            index, created, destroyed = delaunay.remove(point)
+            self.assertEqual(delaunay.mesh.vertex_edges[index], -1)
+            self.assertEqual(len(created) - len(destroyed),
+                             delaunay.mesh.triangle_count - count)
+            self.assert_delaunay(delaunay)
+            self.assertNotEqual(delaunay.points[delaunay.nearest(point)], point)
+
+        with self.assertRaises(ValueError):
+            delaunay.remove(Point(0.5, 0.5))
+
+    def test_remove_to_one_line(self):
+        delaunay = Delaunay([Point(0, 0), Point(1, 0), Point(2, 0), Point(1, 1)])
+        with self.assertRaises(ValueError):
+            delaunay.remove(Point(1, 1))
+        delaunay.remove(Point(1, 0))
+        self.assertEqual(len(delaunay.triangles), 1)
+
+    def get_edges(self, delaunay):
+        return set(get_edge_key(*delaunay.mesh.get_edge(edge))
+                   for edge in range(len(delaunay.mesh.triangles)))
+
+    def test_constraints(self):
+        random = Random(3)
+        points = [Point(random.random(), random.random()) for _ in range(200)]
+        delaunay = Delaunay(points, legalize=True)
+        segments = [LineSegment(Point(0.1, 0.1), Point(0.9, 0.85)),
+                    LineSegment(Point(0.2, 0.8), Point(0.8, 0.2)),
+                    LineSegment(Point(0.1, 0.5), Point(0.4, 0.5))]
+        delaunay.add_constraints(segments)
+        self.assert_delaunay(delaunay)
+        self.assertTrue(delaunay.constraints <= self.get_edges(delaunay))
+
+        # The crossing of the first two segments splits both of them
+        crossing = [index for index in range(len(delaunay.points))
+                    if sum(index in edge for edge in delaunay.constraints) == 4]
+        self.assertEqual(len(crossing), 1)
+        self.assertAlmostEqual(delaunay.points[crossing[0]].x, 0.1 + 0.8 * 0.8 / 1.55)
+
+        for point in (Point(0.1, 0.1), Point(0.9, 0.85), Point(0.4, 0.5)):
+            index = delaunay.find_vertex(point)
+            self.assertEqual(delaunay.points[index], point)
+            self.assertTrue(any(index in edge for edge in delaunay.constraints))
+
+    def test_constraints_through_points(self):
+        points = [Point(x, y) for x in range(5) for y in range(5)]
+        delaunay = Delaunay(points, legalize=True)
+        delaunay.add_constraints([LineSegment(Point(0, 0), Point(4, 4)),
+                                  LineSegment(Point(0, 4), Point(4, 0))])
+        self.assert_delaunay(delaunay)
+        # Both diagonals are split at every lattice point along them
+        self.assertEqual(len(delaunay.points), 25)
+        self.assertEqual(len(delaunay.constraints), 8)
+        self.assertTrue(delaunay.constraints <= self.get_edges(delaunay))
+
+    def test_insert_and_remove_with_constraints(self):
+        random = Random(4)
+        points = [Point(random.random(), random.random()) for _ in range(100)]
+        delaunay = Delaunay(points, legalize=True)
+        delaunay.add_constraints([LineSegment(Point(0, 0.5), Point(1, 0.5))])
+        index = delaunay.insert(Point(0.5, 0.5))[0]
+        self.assertEqual(sum(index in edge for edge in delaunay.constraints), 2)
+        for _ in range(50):
+            delaunay.insert(Point(random.random(), random.random()))
+        self.assert_delaunay(delaunay)
+        self.assertTrue(delaunay.constraints <= self.get_edges(delaunay))
+
+        delaunay.remove(Point(0.5, 0.5))
+        self.assert_delaunay(delaunay)
+        self.assertFalse(any(index in edge for edge in delaunay.constraints))
+        self.assertTrue(delaunay.constraints <= self.get_edges(delaunay))
+
+    def get_triangle_sets(self, delaunay):
+        return set(frozenset((triangle.point_1, triangle.point_2, triangle.point_3))
+                   for triangle in delaunay.triangles)
+
+    def test_move(self):
+        random = Random(8)
+        points = [Point(random.random(), random.random()) for _ in range(100)]
+        delaunay = Delaunay(points, legalize=True)
+        for spread in (0.001, 0.01, 0.1):
+            moved = [Point(point.x + random.gauss(0, spread),
+                           point.y + random.gauss(0, spread))
+                     for point in delaunay.points]
+            self.assertTrue(delaunay.move(moved))
+            self.assertEqual(delaunay.points, moved)
+            self.assert_delaunay(delaunay)
+            # The same triangles as sweeping the moved points again
+            rebuilt = Delaunay(moved, legalize=True)
+            self.assertEqual(self.get_triangle_sets(delaunay),
+                             self.get_triangle_sets(rebuilt))
+
+        with self.assertRaises(ValueError):
+            delaunay.move(moved[1:])
+
+        # Turning the only triangle over would take out all of its points
+        delaunay = Delaunay([Point(0, 0), Point(1, 0), Point(0, 1)], legalize=True)
+        self.assertFalse(delaunay.move([Point(0, 0), Point(1, 0), Point(0, 1)]))
+        self.assert_delaunay(delaunay)
+
+    def test_insertion_orders(self):
+        random = Random(9)
+        points = [Point(random.randint(0, 20), random.randint(0, 20))
+                  for _ in range(300)]
+        sweep = Delaunay(points, legalize=True)
+        for order in ('sorted', 'hilbert', 'morton', 'brio'):
+            delaunay = Delaunay(points, legalize=True, insertion_order=order)
+            self.assert_delaunay(delaunay)
+            self.assertEqual(len(delaunay.triangles), len(sweep.triangles))
+            self.assertCountEqual(delaunay.points, sweep.points)
+            for index, point in enumerate(points):
+                self.assertEqual(delaunay.points[delaunay.point_indices[index]], point)
+                self.assertEqual(points[delaunay.input_indices[
+                    delaunay.point_indices[index]]], point)
+
+        with self.assertRaises(ValueError):
+            Delaunay([Point(0, 0), Point(1, 1), Point(2, 2)], insertion_order='hilbert')
+        with self.assertRaises(ValueError):
+            Delaunay(points, insertion_order='bogus')
+
     def test_get_neighboring_points(self):
         """
         If the newly added point neighbors the convex hull start point,
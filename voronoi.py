@@ -0,0 +1,373 @@
+from array import array
+
+from geometry import circumcircles, get_coordinates, Point
+
+
+def clip_line(x, y, dx, dy, t0, t1, bounding_box):
+    """
+    Clips the part of the line (x + t*dx, y + t*dy) between t0 and t1 to the
+    bounding box. Returns the clipped t0 and t1, along with the index of the
+    box side each was clipped on (None if it was not), or None if the line
+    misses the box.
+    """
+    min_x, min_y, max_x, max_y = bounding_box
+    side_0 = None
+    side_1 = None
+    # Sides are left, right, bottom, top
+    for side, p, q in ((0, -dx, x - min_x), (1, dx, max_x - x),
+                       (2, -dy, y - min_y), (3, dy, max_y - y)):
+        if p == 0:
+            if q < 0:
+                # Parallel to and outside of this side
+                return None
+            continue
+
+        r = q / p
+        if p < 0:
+            if r > t1:
+                return None
+            if r > t0:
+                t0 = r
+                side_0 = side
+        else:
+            if r < t0:
+                return None
+            if r < t1:
+                t1 = r
+                side_1 = side
+    return t0, t1, side_0, side_1
+
+
+class VoronoiDiagram(object):
+    """
+    Parent of Voronoi and Fortune. A Voronoi diagram clipped to a bounding
+    box, kept in flat arrays rather than per cell objects.
+
+    vertices holds x, y pairs: the diagram's own vertices followed by the
+    points added by clipping. edges holds pairs of vertex indices and
+    edge_sites the pair of points each edge separates. The cell of points[i]
+    is the counter clockwise polygon cells[cell_offsets[i]:cell_offsets[i+1]]
+    of vertex indices, which is empty if the cell is outside of the bounding
+    box or the point is not in the diagram.
+
+    Every Voronoi edge between points a and b, a < b, is given by a start and
+    an end vertex, with a on its left walking from start to end. A missing
+    vertex means the edge runs off to infinity.
+    """
+    def __init__(self, points, bounding_box):
+        min_x, min_y, max_x, max_y = bounding_box
+        if not (min_x < max_x and min_y < max_y):
+            raise ValueError("The bounding box must be given as "
+                             "(min_x, min_y, max_x, max_y).")
+
+        self.points = points
+        self.bounding_box = tuple(float(value) for value in bounding_box)
+
+        self.vertices = array('d')
+        self.edges = array('l')
+        self.edge_sites = array('l')
+        self.cells = array('l')
+        self.cell_offsets = array('l', [0])
+
+        # Vertex indices of the bounding box corners, added as needed
+        self.corners = {}
+
+    def add_vertex(self, x, y):
+        self.vertices.append(x)
+        self.vertices.append(y)
+        return len(self.vertices) // 2 - 1
+
+    def get_vertex(self, index):
+        return self.vertices[2 * index], self.vertices[2 * index + 1]
+
+    def clip_edge(self, a, b, start, end):
+        """
+        Clips the Voronoi edge between points a and b to the bounding box and
+        adds it to edges. Returns the clipped start and end vertices, or None
+        if the edge is outside of the box.
+        """
+        point_a = self.points[a]
+        point_b = self.points[b]
+        # Direction with a on the left, for edges running off to infinity
+        dx = point_a.y - point_b.y
+        dy = point_b.x - point_a.x
+        t0 = float('-inf')
+        t1 = float('inf')
+
+        if start is not None and end is not None:
+            x, y = self.get_vertex(start)
+            end_x, end_y = self.get_vertex(end)
+            dx = end_x - x
+            dy = end_y - y
+            t0 = 0.0
+            t1 = 1.0
+        elif start is not None:
+            x, y = self.get_vertex(start)
+            t0 = 0.0
+        elif end is not None:
+            x, y = self.get_vertex(end)
+            t1 = 0.0
+        else:
+            # Both ends at infinity, the edge is the whole bisector
+            x = (point_a.x + point_b.x) / 2
+            y = (point_a.y + point_b.y) / 2
+
+        clipped = clip_line(x, y, dx, dy, t0, t1, self.bounding_box)
+        if clipped is None:
+            return None
+        t0, t1, side_0, side_1 = clipped
+        if t0 == t1 and (side_0 is not None or side_1 is not None):
+            # Only touches the bounding box
+            return None
+
+        if side_0 is None and start is not None:
+            clipped_start = start
+        else:
+            clipped_start = self.add_box_vertex(x + t0 * dx, y + t0 * dy, side_0)
+        if side_1 is None and end is not None:
+            clipped_end = end
+        else:
+            clipped_end = self.add_box_vertex(x + t1 * dx, y + t1 * dy, side_1)
+
+        self.edges.append(clipped_start)
+        self.edges.append(clipped_end)
+        self.edge_sites.append(a)
+        self.edge_sites.append(b)
+        return clipped_start, clipped_end
+
+    def add_box_vertex(self, x, y, side):
+        """
+        Adds a vertex on the bounding box, snapping it onto the side it was
+        clipped on.
+        """
+        min_x, min_y, max_x, max_y = self.bounding_box
+        if side == 0:
+            x = min_x
+        elif side == 1:
+            x = max_x
+        elif side == 2:
+            y = min_y
+        elif side == 3:
+            y = max_y
+        x = min(max(x, min_x), max_x)
+        y = min(max(y, min_y), max_y)
+        return self.add_vertex(x, y)
+
+    def add_cell(self, index, edges, neighbors):
+        """
+        Adds the cell of the point at index from its clipped edges, given
+        counter clockwise as start, end pairs (None for edges outside of the
+        box). The bounding box is followed wherever the cell leaves it.
+        """
+        polygon = []
+        for edge in edges:
+            if edge is None:
+                continue
+
+            start, end = edge
+            if polygon and polygon[-1] != start:
+                self.add_box_walk(polygon, polygon[-1], start)
+            if not polygon or polygon[-1] != start:
+                polygon.append(start)
+            polygon.append(end)
+
+        if polygon:
+            if polygon[-1] == polygon[0]:
+                polygon.pop()
+            else:
+                self.add_box_walk(polygon, polygon[-1], polygon[0])
+        elif self.contains_bounding_box(index, neighbors):
+            for corner in range(4):
+                polygon.append(self.get_corner(corner))
+
+        self.cells.extend(polygon)
+        self.cell_offsets.append(len(self.cells))
+
+    def contains_bounding_box(self, index, neighbors):
+        """
+        Whether a cell without edges in the bounding box covers all of it,
+        which is when the box's center is closer to the cell's point than to
+        any of its neighbors.
+        """
+        min_x, min_y, max_x, max_y = self.bounding_box
+        center = Point((min_x + max_x) / 2, (min_y + max_y) / 2)
+        distance = center.distance(self.points[index])
+        for neighbor in neighbors:
+            if center.distance(self.points[neighbor]) < distance:
+                return False
+        return True
+
+    def get_perimeter_position(self, x, y):
+        """
+        The distance walked counter clockwise around the bounding box from
+        its bottom left corner to reach x, y.
+        """
+        min_x, min_y, max_x, max_y = self.bounding_box
+        width = max_x - min_x
+        height = max_y - min_y
+        if y == min_y and x < max_x:
+            return x - min_x
+        if x == max_x and y < max_y:
+            return width + (y - min_y)
+        if y == max_y and x > min_x:
+            return width + height + (max_x - x)
+        return 2 * width + height + (max_y - y)
+
+    def get_corner(self, corner):
+        """
+        The vertex index of a bounding box corner, counter clockwise from the
+        bottom left.
+        """
+        if corner not in self.corners:
+            min_x, min_y, max_x, max_y = self.bounding_box
+            x, y = ((min_x, min_y), (max_x, min_y),
+                    (max_x, max_y), (min_x, max_y))[corner]
+            self.corners[corner] = self.add_vertex(x, y)
+        return self.corners[corner]
+
+    def add_box_walk(self, polygon, exit_vertex, entry_vertex):
+        """
+        Adds the bounding box corners passed walking counter clockwise from
+        where the cell leaves the box to where it enters it again.
+        """
+        min_x, min_y, max_x, max_y = self.bounding_box
+        width = max_x - min_x
+        height = max_y - min_y
+        start = self.get_perimeter_position(*self.get_vertex(exit_vertex))
+        end = self.get_perimeter_position(*self.get_vertex(entry_vertex))
+        corners = (0, width, width + height, 2 * width + height)
+
+        if start == end:
+            return
+        if start < end:
+            passed = [i for i in range(4) if start < corners[i] < end]
+        else:
+            passed = ([i for i in range(4) if corners[i] > start] +
+                      [i for i in range(4) if corners[i] < end])
+        for corner in passed:
+            polygon.append(self.get_corner(corner))
+
+    def get_cell(self, index):
+        """
+        The cell of points[index] as a list of Points
+        """
+        start = self.cell_offsets[index]
+        end = self.cell_offsets[index + 1]
+        return [Point(*self.get_vertex(vertex)) for vertex in self.cells[start:end]]
+
+    def get_centroids(self):
+        """
+        The centroid of every cell as x, y pairs, in one pass over the flat
+        cell arrays. A point without a cell is its own centroid.
+        """
+        vertices = self.vertices
+        cells = self.cells
+        offsets = self.cell_offsets
+        centroids = array('d')
+        for index in range(len(offsets) - 1):
+            start = offsets[index]
+            end = offsets[index + 1]
+            area = 0.0
+            x = 0.0
+            y = 0.0
+            if end - start >= 3:
+                # Summed over a fan from the first vertex, measured from it
+                # to keep the products small
+                x0 = vertices[2 * cells[start]]
+                y0 = vertices[2 * cells[start] + 1]
+                x1 = vertices[2 * cells[start + 1]] - x0
+                y1 = vertices[2 * cells[start + 1] + 1] - y0
+                for i in range(start + 2, end):
+                    x2 = vertices[2 * cells[i]] - x0
+                    y2 = vertices[2 * cells[i] + 1] - y0
+                    cross = x1 * y2 - x2 * y1
+                    area += cross
+                    x += cross * (x1 + x2)
+                    y += cross * (y1 + y2)
+                    x1 = x2
+                    y1 = y2
+            if area > 0:
+                centroids.append(x0 + x / (3 * area))
+                centroids.append(y0 + y / (3 * area))
+            else:
+                point = self.points[index]
+                centroids.append(point.x)
+                centroids.append(point.y)
+        return centroids
+
+
+class Voronoi(VoronoiDiagram):
+    """
+    The Voronoi diagram of the points of a Delaunay triangulation. Every
+    Voronoi vertex is the circumcenter of a triangle and every Voronoi edge
+    crosses a triangle edge, so the diagram is read off the triangulation in
+    linear time. The circumcenter of triangle t is vertex t.
+    """
+    def __init__(self, delaunay, bounding_box):
+        if not delaunay.legalize or delaunay.constraints:
+            raise ValueError("A Voronoi diagram needs a Delaunay triangulation "
+                             "built with legalize=True and without "
+                             "constraints.")
+        super(Voronoi, self).__init__(delaunay.points, bounding_box)
+        self.delaunay = delaunay
+
+        # Maps an edge (a, b), a < b, to the clipped part of its Voronoi edge
+        self.clipped_edges = {}
+
+        self.build()
+
+    def build(self):
+        self.add_circumcenters()
+        self.clip_edges()
+
+        for index in range(len(self.points)):
+            neighbors = self.delaunay.mesh.get_vertex_star(index)
+            if not neighbors:
+                # Removed from the triangulation, so it has no cell
+                self.cell_offsets.append(len(self.cells))
+                continue
+            edges = []
+            for neighbor in neighbors:
+                if index < neighbor:
+                    edges.append(self.clipped_edges[(index, neighbor)])
+                else:
+                    edge = self.clipped_edges[(neighbor, index)]
+                    edges.append(edge and (edge[1], edge[0]))
+            self.add_cell(index, edges, neighbors)
+
+        # The lookup is only needed while building
+        self.clipped_edges = {}
+
+    def add_circumcenters(self):
+        """
+        Adds the circumcenter of every triangle as a vertex, in the same
+        order as the triangles of the mesh.
+        """
+        coordinates = get_coordinates(self.points)
+        centers, radii = circumcircles(coordinates, self.delaunay.mesh.triangles)
+        self.vertices.extend(centers)
+
+    def clip_edges(self):
+        """
+        Clips the Voronoi edge crossing every triangle edge a, b. It runs from
+        the circumcenter of the triangle on b, a to the one on a, b. A
+        missing triangle means the edge runs out through the triangulation's
+        boundary.
+        """
+        mesh = self.delaunay.mesh
+        for edge in range(len(mesh.halfedges)):
+            opposite = mesh.halfedges[edge]
+            if opposite != -1 and opposite < edge:
+                # Clipped from the other side
+                continue
+
+            a, b = mesh.get_edge(edge)
+            # The triangle on a half-edge is to the left of it
+            left = edge // 3
+            right = opposite // 3 if opposite != -1 else None
+            if a < b:
+                start, end = right, left
+            else:
+                a, b = b, a
+                start, end = left, right
+            self.clipped_edges[(a, b)] = self.clip_edge(a, b, start, end)
@@ -0,0 +1,126 @@
+import unittest
+from unittest import TestCase
+from random import Random
+
+from geometry import LineSegment, Point, orientation
+from triangulation import Delaunay
+from voronoi import Voronoi
+
+
+def get_area(polygon):
+    """
+    Area of a counter clockwise polygon
+    """
+    area = 0
+    for i in range(len(polygon)):
+        point_1 = polygon[i]
+        point_2 = polygon[(i + 1) % len(polygon)]
+        area += point_1.x * point_2.y - point_2.x * point_1.y
+    return area / 2
+
+
+def has_point(polygon, point):
+    for i in range(len(polygon)):
+        if orientation(polygon[i], polygon[(i + 1) % len(polygon)], point) > 1e-9:
+            return False
+    return True
+
+
+class VoronoiTest(TestCase):
+    def setUp(self):
+        self.points = [
+            Point(0, 0),
+            Point(4, 0),
+            Point(0, 4),
+            Point(4, 4),
+            Point(2, 2)
+        ]
+        self.delaunay = Delaunay(self.points, legalize=True)
+
+    def test_voronoi_cells(self):
+        voronoi = Voronoi(self.delaunay, (0, 0, 4, 4))
+        center = self.delaunay.points.index(Point(2, 2))
+        corner = self.delaunay.points.index(Point(0, 0))
+
+        self.assertCountEqual(voronoi.get_cell(center), [
+            Point(2, 0), Point(4, 2), Point(2, 4), Point(0, 2)
+        ])
+        self.assertCountEqual(voronoi.get_cell(corner), [
+            Point(0, 0), Point(2, 0), Point(0, 2)
+        ])
+        self.assertEqual(get_area(voronoi.get_cell(center)), 8)
+        self.assertEqual(get_area(voronoi.get_cell(corner)), 2)
+
+    def test_voronoi_arrays(self):
+        voronoi = Voronoi(self.delaunay, (0, 0, 4, 4))
+        self.assertEqual(len(voronoi.cell_offsets), len(self.points) + 1)
+        self.assertEqual(voronoi.cell_offsets[-1], len(voronoi.cells))
+        # The rays out of the corners only touch the bounding box, leaving
+        # the four edges around the center point
+        self.assertEqual(len(voronoi.edges), 8)
+        self.assertEqual(len(voronoi.edge_sites), 8)
+        # The four circumcenters and the four corners of the bounding box
+        self.assertEqual(len(voronoi.vertices), 16)
+        self.assertEqual(len(voronoi.cells), 16)
+
+    def test_voronoi_cells_cover_bounding_box(self):
+        random = Random(7)
+        points = [Point(random.uniform(0, 10), random.uniform(0, 10))
+                  for i in range(80)]
+        delaunay = Delaunay(points, legalize=True)
+        voronoi = Voronoi(delaunay, (2, 1, 9, 8))
+
+        area = 0
+        for index in range(len(delaunay.points)):
+            area += get_area(voronoi.get_cell(index))
+        self.assertAlmostEqual(area, 49)
+
+        for i in range(100):
+            point = Point(random.uniform(2, 9), random.uniform(1, 8))
+            nearest = min(range(len(delaunay.points)),
+                          key=lambda index: point.distance(delaunay.points[index]))
+            self.assertTrue(has_point(voronoi.get_cell(nearest), point))
+
+    def test_bounding_box_inside_one_cell(self):
+        voronoi = Voronoi(self.delaunay, (5, 5, 6, 6))
+        corner = self.delaunay.points.index(Point(4, 4))
+        for index in range(len(self.points)):
+            if index == corner:
+                self.assertEqual(voronoi.get_cell(index), [
+                    Point(5, 5), Point(6, 5), Point(6, 6), Point(5, 6)
+                ])
+            else:
+                self.assertEqual(voronoi.get_cell(index), [])
+
+    def test_centroids(self):
+        voronoi = Voronoi(self.delaunay, (0, 0, 4, 4))
+        centroids = voronoi.get_centroids()
+        self.assertEqual(len(centroids), 2 * len(self.points))
+        center = self.delaunay.points.index(Point(2, 2))
+        corner = self.delaunay.points.index(Point(0, 0))
+        self.assertEqual(tuple(centroids[2 * center:2 * center + 2]), (2, 2))
+        self.assertAlmostEqual(centroids[2 * corner], 2 / 3.0)
+        self.assertAlmostEqual(centroids[2 * corner + 1], 2 / 3.0)
+
+        # Points without a cell stay where they are
+        voronoi = Voronoi(self.delaunay, (5, 5, 6, 6))
+        centroids = voronoi.get_centroids()
+        self.assertEqual(tuple(centroids[2 * corner:2 * corner + 2]), (0, 0))
+
+    def test_voronoi_needs_delaunay(self):
+        with self.assertRaises(ValueError):
+            Voronoi(Delaunay(self.points), (0, 0, 4, 4))
+
+        # Constrained edges aren't flipped, so the triangulation is no
+        # longer Delaunay
+        random = Random(1)
+        points = [Point(random.random(), random.random()) for _ in range(200)]
+        delaunay = Delaunay(points, legalize=True)
+        delaunay.add_constraints([LineSegment(Point(0.1, 0.1), Point(0.9, 0.9)),
+                                  LineSegment(Point(0.1, 0.9), Point(0.9, 0.1))])
+        with self.assertRaises(ValueError):
+            Voronoi(delaunay, (0, 0, 1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()